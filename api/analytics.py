@@ -0,0 +1,387 @@
+"""
+Cross-run analytics: trends and regressions of a test configuration on a device.
+
+The values of the requested metric series for the last N completed runs are
+read from test_metrics in one query (averaged per run, so sampled series
+count once per run) and pivoted into a runs x series NumPy array. Everything
+after that is computed column-wise over the whole array:
+
+- percentiles of each series over the window
+- a trailing moving average
+- z-scores against a rolling baseline of the preceding runs, flagging runs
+  that moved by ``threshold`` standard deviations in the worse direction
+
+Results are cached per process, keyed by the request and a fingerprint of
+the configuration's runs on the device, so a new or updated run is picked
+up on the next request.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from flask import current_app
+from sqlalchemy import and_, case, func, or_, select
+
+from api.models import db
+from api.models.test_metric import TestMetric
+from api.models.test_run import TestRun
+
+# Series analysed when none are requested, as metric.component
+DEFAULT_SERIES = ('throughput.avg', 'latency.avg', 'latency.p99', 'transactions.failed', 'strikes.allowed')
+
+DEFAULT_RUNS = 100
+MAX_RUNS = 10000
+DEFAULT_MOVING_AVERAGE = 5  # runs
+DEFAULT_BASELINE = 20  # runs
+DEFAULT_THRESHOLD = 3.0  # standard deviations
+PERCENTILES = (50, 90, 95, 99)
+
+# Which way is better, by metric.component or metric; others flag both ways
+BETTER = {
+    'throughput': 'higher',
+    'latency': 'lower',
+    'transactions.successful': 'higher',
+    'transactions.failed': 'lower',
+    'strikes.blocked': 'higher',
+    'strikes.allowed': 'lower'
+}
+
+DEFAULT_CACHE_SIZE = 128
+DEFAULT_CACHE_TTL = 300  # seconds
+
+
+class AnalyticsCache:
+    """
+    Bounded LRU cache of analytics results with a time-to-live.
+
+    Keys include a fingerprint of the runs they were computed from, so the
+    TTL only bounds how long changes the fingerprint misses (e.g. a result
+    re-ingested for an old run) stay invisible.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_CACHE_TTL):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached results
+            ttl: Seconds a cached result stays valid
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Get a cached result, or None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, result: Dict[str, Any]) -> None:
+        """Cache a result, evicting the least recently used ones if full."""
+        with self._lock:
+            self._entries[key] = (result, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """
+        Get cache counters.
+
+        Returns:
+            Dict: Size, hits, misses, hit rate and evictions
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'evictions': self.evictions
+            }
+
+
+def init_analytics_cache(app) -> AnalyticsCache:
+    """
+    Create the analytics cache for an app.
+
+    Args:
+        app: Flask application
+
+    Returns:
+        AnalyticsCache: The app's analytics cache
+    """
+    cache = AnalyticsCache(
+        max_size=int(app.config.get('ANALYTICS_CACHE_SIZE', DEFAULT_CACHE_SIZE)),
+        ttl=float(app.config.get('ANALYTICS_CACHE_TTL', DEFAULT_CACHE_TTL))
+    )
+    app.extensions['analytics_cache'] = cache
+    return cache
+
+
+def get_analytics_cache(app=None) -> AnalyticsCache:
+    """Get the analytics cache of an app (the current app by default)."""
+    app = app or current_app
+    return app.extensions['analytics_cache']
+
+
+def parse_series(names: Sequence[str]) -> List[Tuple[str, str]]:
+    """
+    Split ``metric.component`` names.
+
+    Raises:
+        ValueError: If a name has no component
+    """
+    series = []
+    for name in names:
+        metric, _, component = name.partition('.')
+        if not metric or not component:
+            raise ValueError(f"Invalid series {name}; use metric.component, e.g. latency.p99")
+        series.append((metric, component))
+    return list(dict.fromkeys(series))
+
+
+def _completed_runs(test_config_id: int, device_id: int):
+    return (
+        TestRun.test_config_id == test_config_id,
+        TestRun.device_id == device_id,
+        TestRun.status == 'completed'
+    )
+
+
+def _fingerprint(test_config_id: int, device_id: int) -> Tuple:
+    """Changes whenever a completed run of the configuration on the device is added, removed or updated."""
+    count, last_id, last_update = db.session.execute(
+        select(func.count(TestRun.id), func.max(TestRun.id), func.max(TestRun.updated_at))
+        .where(*_completed_runs(test_config_id, device_id))
+    ).one()
+    return count, last_id, last_update
+
+
+def _load(test_config_id: int, device_id: int, runs: int, series: List[Tuple[str, str]]):
+    """
+    Load the window's runs and their values.
+
+    Returns:
+        Tuple: run IDs, run times (oldest first) and a runs x series float array (NaN where missing)
+    """
+    import numpy as np
+
+    window = (
+        select(
+            TestRun.id.label('id'),
+            func.coalesce(TestRun.end_time, TestRun.start_time, TestRun.created_at).label('time')
+        )
+        .where(*_completed_runs(test_config_id, device_id))
+        .order_by(TestRun.created_at.desc(), TestRun.id.desc())
+        .limit(runs)
+        .subquery()
+    )
+    # Plain column rows: run on the connection, skipping the ORM's row processing
+    connection = db.session.connection()
+    run_rows = connection.execute(select(window.c.id, window.c.time)).all()
+    # Oldest first, so baselines look back in time
+    run_rows.sort(key=lambda row: (row[1] is None, row[1] or 0, row[0]))
+    run_ids = np.array([row[0] for row in run_rows], dtype=np.int64)
+    values = np.full((len(run_ids), len(series)), np.nan)
+    if not len(run_ids):
+        return run_ids, [], values
+
+    # Each row tagged with its series' column; sampled series have several rows per run
+    column = case(
+        *((and_(TestMetric.metric == metric, TestMetric.component == component), index)
+          for index, (metric, component) in enumerate(series))
+    )
+    value_rows = connection.execute(
+        select(TestMetric.test_run_id, column, TestMetric.value)
+        .join(window, window.c.id == TestMetric.test_run_id)
+        .where(or_(*(and_(TestMetric.metric == metric, TestMetric.component == component)
+                     for metric, component in series)))
+    ).all()
+
+    if value_rows:
+        row_ids, columns, data = (np.array(part) for part in zip(*value_rows))
+        order = np.argsort(run_ids)
+        rows = order[np.searchsorted(run_ids, row_ids.astype(np.int64), sorter=order)]
+        # Average per (run, series) cell
+        cells = rows * len(series) + columns.astype(np.int64)
+        size = values.size
+        totals = np.bincount(cells, weights=data.astype(float), minlength=size)
+        counts = np.bincount(cells, minlength=size)
+        filled = counts > 0
+        values.ravel()[filled] = totals[filled] / counts[filled]
+
+    return run_ids, [row[1] for row in run_rows], values
+
+
+def _window_sums(values, window: int, include_current: bool):
+    """Sums, sums of squares and counts of the non-NaN values in a sliding window, per row."""
+    import numpy as np
+
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    zeros = np.zeros((1, values.shape[1]))
+    sums = np.vstack([zeros, np.cumsum(filled, axis=0)])
+    squares = np.vstack([zeros, np.cumsum(filled * filled, axis=0)])
+    counts = np.vstack([zeros, np.cumsum(valid, axis=0)])
+
+    rows = np.arange(values.shape[0])
+    end = rows + 1 if include_current else rows
+    start = np.maximum(end - window, 0)
+    return sums[end] - sums[start], squares[end] - squares[start], counts[end] - counts[start]
+
+
+def compute_trends(values, moving_average: int, baseline: int, threshold: float) -> Dict[str, Any]:
+    """
+    Compute the statistics of every series (column) at once.
+
+    Args:
+        values: runs x series array, oldest run first, NaN where a run has no value
+        moving_average: Trailing window of the moving average, in runs
+        baseline: Preceding runs each run is compared to
+        threshold: Absolute z-score from which a run is flagged
+
+    Returns:
+        Dict[str, Any]: ``percentiles`` (percentile x series), ``moving_average``,
+        ``z_scores`` (runs x series; NaN where undefined) and ``flagged``
+        (runs x series booleans, before the direction is taken into account)
+    """
+    import numpy as np
+
+    valid = ~np.isnan(values)
+    has_values = valid.any(axis=0)
+    percentiles = np.full((len(PERCENTILES), values.shape[1]), np.nan)
+    if has_values.any():
+        percentiles[:, has_values] = np.nanpercentile(values[:, has_values], PERCENTILES, axis=0)
+
+    sums, _, counts = _window_sums(values, moving_average, include_current=True)
+    rows = np.arange(values.shape[0])[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        averages = np.where((rows >= moving_average - 1) & (counts > 0), sums / counts, np.nan)
+
+        # Baseline: the preceding runs only, so a regression does not dilute its own baseline
+        sums, squares, counts = _window_sums(values, baseline, include_current=False)
+        means = sums / counts
+        deviations = np.sqrt(np.maximum(squares / counts - means * means, 0.0))
+        usable = valid & (counts >= max(2, baseline // 2)) & (deviations > 0)
+        z_scores = np.where(usable, (values - means) / deviations, np.nan)
+
+    return {
+        'percentiles': percentiles,
+        'moving_average': averages,
+        'baseline_mean': np.where(usable, means, np.nan),
+        'z_scores': z_scores,
+        'flagged': np.abs(np.nan_to_num(z_scores)) >= threshold
+    }
+
+
+def _floats(array) -> List[Optional[float]]:
+    return [None if value != value else value for value in array.tolist()]
+
+
+def run_trends(test_config_id: int, device_id: int, runs: int = DEFAULT_RUNS,
+               series: Optional[Sequence[str]] = None, moving_average: int = DEFAULT_MOVING_AVERAGE,
+               baseline: int = DEFAULT_BASELINE, threshold: float = DEFAULT_THRESHOLD) -> Dict[str, Any]:
+    """
+    Trends and regressions of a test configuration's completed runs on a device.
+
+    Args:
+        test_config_id: Test configuration ID
+        device_id: Device ID
+        runs: Most recent completed runs to analyse (at most MAX_RUNS)
+        series: ``metric.component`` names (DEFAULT_SERIES if empty)
+        moving_average: Trailing moving average window, in runs
+        baseline: Preceding runs each run's z-score is computed against
+        threshold: Absolute z-score from which a run counts as a regression
+
+    Returns:
+        Dict[str, Any]: ``runs`` (ID and time, oldest first), and per series
+        its ``values``, ``moving_average``, ``z_scores``, ``percentiles``
+        and ``regressions`` (runs that got worse by ``threshold`` or more)
+
+    Raises:
+        ValueError: If an argument is invalid
+    """
+    if not 1 <= runs <= MAX_RUNS:
+        raise ValueError(f"runs must be between 1 and {MAX_RUNS}")
+    if moving_average < 1 or baseline < 2:
+        raise ValueError("moving_average must be at least 1 and baseline at least 2")
+    if threshold <= 0:
+        raise ValueError("threshold must be positive")
+    parsed = parse_series(series or DEFAULT_SERIES)
+
+    cache = get_analytics_cache()
+    key = (test_config_id, device_id, runs, tuple(parsed), moving_average, baseline, threshold,
+           _fingerprint(test_config_id, device_id))
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    run_ids, times, values = _load(test_config_id, device_id, runs, parsed)
+    trends = compute_trends(values, moving_average, baseline, threshold)
+    run_ids = run_ids.tolist()
+    times = [value.isoformat() if value else None for value in times]
+
+    result = {
+        'test_config_id': test_config_id,
+        'device_id': device_id,
+        'runs': [{'id': run_id, 'time': when} for run_id, when in zip(run_ids, times)],
+        'series': {}
+    }
+    for column, (metric, component) in enumerate(parsed):
+        name = f"{metric}.{component}"
+        better = BETTER.get(name, BETTER.get(metric))
+        z_scores = trends['z_scores'][:, column]
+        flagged = trends['flagged'][:, column]
+        if better == 'higher':
+            flagged = flagged & (z_scores < 0)
+        elif better == 'lower':
+            flagged = flagged & (z_scores > 0)
+
+        result['series'][name] = {
+            'better': better,
+            'values': _floats(values[:, column]),
+            'moving_average': _floats(trends['moving_average'][:, column]),
+            'z_scores': _floats(z_scores),
+            'percentiles': {
+                f"p{percentile}": value
+                for percentile, value in zip(PERCENTILES, _floats(trends['percentiles'][:, column]))
+            },
+            'regressions': [
+                {
+                    'run_id': run_ids[index],
+                    'time': times[index],
+                    'value': float(values[index, column]),
+                    'baseline_mean': float(trends['baseline_mean'][index, column]),
+                    'z_score': float(z_scores[index])
+                }
+                for index in flagged.nonzero()[0].tolist()
+            ]
+        }
+
+    cache.put(key, result)
+    return result
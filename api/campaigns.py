@@ -0,0 +1,157 @@
+"""
+Campaigns: a test matrix launched as one batch of scheduled test runs.
+
+A campaign runs every test configuration on every environment and device it
+lists. Launching one writes the campaign row and all of its test runs in a
+single transaction, the runs as one Core ``INSERT`` executed with the list of
+rows (an executemany) rather than as ORM objects, so a matrix of thousands of
+runs skips the per-object unit of work. On PostgreSQL, psycopg2 sends the rows
+as multi-row ``INSERT ... VALUES`` pages of 1000 rows (SQLAlchemy's default
+``executemany_mode``); SQLite runs the statement once per row.
+
+The runs are queued with ``status='scheduled'``; the run scheduler creates the
+Breaking Point test of each configuration that has none (once per
+configuration, however many runs share it) and starts the runs as capacity
+allows, ``SCHEDULER_DISPATCH_CONCURRENCY`` at a time.
+
+Progress is one grouped query over the ``(campaign_id, status)`` index.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from flask import current_app
+from sqlalchemy import func
+
+from api.controllers.run_scheduler import utc_naive
+from api.dashboard_stats import count_inserted_runs
+from api.models import db
+from api.models.campaign import Campaign
+from api.models.device import Device
+from api.models.environment import Environment
+from api.models.test_configuration import TestConfiguration
+from api.models.test_run import TestRun
+
+# Statuses a campaign's runs end in
+DONE_STATUSES = ('completed', 'failed', 'stopped')
+
+
+def _ids(model, ids: Iterable, field: str) -> List[int]:
+    """Validate the list of ``model`` IDs given as ``field``, keeping their order and dropping duplicates."""
+    if not ids or isinstance(ids, (str, bytes)):
+        raise ValueError(f"{field} must be a non-empty list of IDs")
+    try:
+        ids = list(dict.fromkeys(int(model_id) for model_id in ids))
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a list of IDs")
+
+    found = {model_id for (model_id,) in db.session.query(model.id).filter(model.id.in_(ids))}
+    missing = [model_id for model_id in ids if model_id not in found]
+    if missing:
+        raise ValueError(f"Unknown {field}: {', '.join(map(str, missing))}")
+    return ids
+
+
+def launch_campaign(name: str, test_config_ids: Iterable[int], environment_ids: Iterable[int],
+                    device_ids: Iterable[int], created_by: Optional[str] = None, priority: int = 0,
+                    scheduled_at: Optional[datetime] = None, description: Optional[str] = None) -> Campaign:
+    """
+    Queue one test run per test configuration, environment and device.
+
+    Args:
+        name: Campaign name
+        test_config_ids: Test configurations to run
+        environment_ids: Environments to run them on
+        device_ids: Devices to run them against
+        created_by: Username of the user who launched the campaign
+        priority: Scheduler priority of the runs (higher starts first)
+        scheduled_at: Earliest start time of the runs (naive UTC, or aware), or None
+        description: Campaign description
+
+    Returns:
+        Campaign: The committed campaign
+
+    Raises:
+        ValueError: If an ID is unknown or the matrix exceeds ``CAMPAIGN_MAX_RUNS``
+    """
+    if not name:
+        raise ValueError("name is required")
+    test_config_ids = _ids(TestConfiguration, test_config_ids, 'test_config_ids')
+    environment_ids = _ids(Environment, environment_ids, 'environment_ids')
+    device_ids = _ids(Device, device_ids, 'device_ids')
+
+    run_count = len(test_config_ids) * len(environment_ids) * len(device_ids)
+    max_runs = int(current_app.config.get('CAMPAIGN_MAX_RUNS', 10000))
+    if run_count > max_runs:
+        raise ValueError(f"Campaign would launch {run_count} test runs; the limit is {max_runs}")
+
+    campaign = Campaign(name=name, description=description, run_count=run_count, created_by=created_by)
+    db.session.add(campaign)
+    db.session.flush()
+
+    now = datetime.utcnow()
+    scheduled_at = utc_naive(scheduled_at)
+    rows = [
+        {
+            'campaign_id': campaign.id,
+            'test_config_id': test_config_id,
+            'environment_id': environment_id,
+            'device_id': device_id,
+            'status': 'scheduled',
+            'priority': priority,
+            'scheduled_at': scheduled_at,
+            'created_by': created_by,
+            'created_at': now,
+            'updated_at': now
+        }
+        for test_config_id in test_config_ids
+        for environment_id in environment_ids
+        for device_id in device_ids
+    ]
+    try:
+        db.session.execute(TestRun.__table__.insert(), rows)
+        count_inserted_runs(rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return campaign
+
+
+def campaign_progress(campaign_id: int) -> Optional[Dict]:
+    """
+    Progress of a campaign, in one query.
+
+    Args:
+        campaign_id: Campaign ID
+
+    Returns:
+        Optional[Dict]: The campaign with ``progress``: ``total`` runs, runs
+        ``by_status``, ``done`` and ``pending`` runs, ``percent_done`` and
+        ``pass_rate`` (completed share of the finished runs), or None if
+        there is no such campaign
+    """
+    rows = db.session.query(
+        Campaign, TestRun.status, func.count(TestRun.id)
+    ).outerjoin(
+        TestRun, TestRun.campaign_id == Campaign.id
+    ).filter(
+        Campaign.id == campaign_id
+    ).group_by(Campaign.id, TestRun.status).all()
+    if not rows:
+        return None
+
+    by_status = {status: count for _, status, count in rows if status is not None}
+    total = sum(by_status.values())
+    done = sum(by_status.get(status, 0) for status in DONE_STATUSES)
+
+    result = rows[0][0].to_dict()
+    result['progress'] = {
+        'total': total,
+        'by_status': by_status,
+        'done': done,
+        'pending': total - done,
+        'percent_done': round(100.0 * done / total, 1) if total else None,
+        'pass_rate': by_status.get('completed', 0) / done if done else None
+    }
+    return result
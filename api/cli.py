@@ -0,0 +1,180 @@
+"""
+Command-line commands for the CMS.
+
+Commands are registered on the Flask app and run with ``flask <command>``.
+"""
+
+import click
+from flask import current_app
+
+
+@click.command('poll-test-runs')
+@click.option('--no-schedule', is_flag=True, help='Do not start queued test runs.')
+def poll_test_runs_command(no_schedule):
+    """Poll the status of running test runs and start queued ones until interrupted."""
+    from api.controllers.run_poller import RunStatusPoller
+    from api.controllers.run_scheduler import RunScheduler
+    from api.tasks import collect_test_results
+
+    app = current_app._get_current_object()
+    poller = RunStatusPoller(
+        app,
+        on_finished=collect_test_results.delay,
+        scheduler=None if no_schedule else RunScheduler(app)
+    )
+    click.echo("Polling running test runs (Ctrl+C to stop)...")
+    poller.run_forever()
+
+
+@click.command('backfill-content-types')
+@click.option('--prefix', default='', help='Only process files under this path.')
+@click.option('--force', is_flag=True, help='Re-detect files that already have a content type.')
+def backfill_content_types_command(prefix, force):
+    """Detect and store content types of files saved without one."""
+    storage = current_app.storage
+    updated = skipped = failed = 0
+
+    for info in storage.iter_files(prefix):
+        file_path = info.file_path
+        try:
+            content_type = storage.backfill_content_type(file_path, force=force)
+        except Exception as e:
+            failed += 1
+            click.echo(f"{file_path}: {e}", err=True)
+            continue
+
+        if content_type is None:
+            skipped += 1
+        else:
+            updated += 1
+            click.echo(f"{file_path}: {content_type}")
+
+    click.echo(f"Updated {updated}, already set {skipped}, failed {failed}.")
+
+
+@click.command('storage-usage')
+@click.option('--prefix', default='', help='Only count files under this path.')
+@click.option('--depth', default=1, show_default=True, help='Path components to group by (0 for a total only).')
+def storage_usage_command(prefix, depth):
+    """Count stored files and bytes, grouped by directory."""
+    storage = current_app.storage
+    usage = {}
+    files = total = 0
+
+    for info in storage.iter_files(prefix):
+        files += 1
+        total += info.size or 0
+        if depth:
+            directory = '/'.join(info.file_path.split('/')[:-1][:depth]) or '.'
+            count, size = usage.get(directory, (0, 0))
+            usage[directory] = (count + 1, size + (info.size or 0))
+
+    for directory, (count, size) in sorted(usage.items()):
+        click.echo(f"{size:>16,} bytes {count:>10,} files  {directory}")
+    click.echo(f"{total:>16,} bytes {files:>10,} files  total")
+
+
+@click.command('explain-queries')
+@click.option('--prefer-indexes', is_flag=True,
+              help='PostgreSQL: disable sequential scans so small databases show which indexes exist.')
+@click.option('--verbose', is_flag=True, help='Print every plan, not just flagged ones.')
+def explain_queries_command(prefer_indexes, verbose):
+    """EXPLAIN the app's hot queries and flag sequential scans."""
+    from api.models import db
+    from database.advisor import advise
+
+    with db.engine.connect() as connection:
+        results = advise(connection, prefer_indexes=prefer_indexes)
+
+    flagged = 0
+    for result in results:
+        if result['seq_scans']:
+            flagged += 1
+            click.echo(f"SEQ SCAN  {result['name']}: {', '.join(result['seq_scans'])}")
+        else:
+            click.echo(f"ok        {result['name']}")
+        if verbose or result['seq_scans']:
+            for line in result['plan']:
+                click.echo(f"          {line}")
+
+    click.echo(f"{flagged} of {len(results)} queries scan a whole table.")
+    if flagged:
+        raise SystemExit(1)
+
+
+@click.command('rebuild-dashboard-stats')
+def rebuild_dashboard_stats_command():
+    """Recompute the dashboard's summary counts from the test runs."""
+    from api.dashboard_stats import rebuild_test_run_stats
+    from api.models import db
+
+    rows = rebuild_test_run_stats()
+    db.session.commit()
+    click.echo(f"Wrote {rows} summary rows.")
+
+
+@click.command('backfill-test-metrics')
+@click.option('--batch-size', default=500, show_default=True, help='Test results per transaction.')
+@click.option('--force', is_flag=True, help='Re-ingest results that already have metrics.')
+def backfill_test_metrics_command(batch_size, force):
+    """Extract metrics from stored test results into the test_metrics table."""
+    from api.test_metrics import backfill_test_metrics
+
+    def progress(results, rows):
+        click.echo(f"{results} results, {rows} metric values...")
+
+    results, rows = backfill_test_metrics(batch_size=batch_size, force=force, progress=progress)
+    click.echo(f"Ingested {results} test results into {rows} metric values.")
+
+
+@click.command('cleanup-orphaned-files')
+@click.option('--prefix', default='', help='Only process files under this path.')
+@click.option('--dry-run', is_flag=True, help='List orphaned files without deleting them.')
+@click.option('--min-age', type=int, default=None,
+              help='Keep files modified less than this many seconds ago [default: ORPHAN_MIN_AGE].')
+@click.option('--batch-size', type=int, default=None,
+              help='Files reconciled at a time [default: ORPHAN_BATCH_SIZE].')
+@click.option('--restart', is_flag=True, help='Ignore the checkpoint of an interrupted run.')
+def cleanup_orphaned_files_command(prefix, dry_run, min_age, batch_size, restart):
+    """Delete stored files that no report or media row references."""
+    from api.orphans import reconcile_orphaned_files
+
+    config = current_app.config
+
+    def progress(stats, orphans):
+        if dry_run:
+            for file_path in orphans:
+                click.echo(file_path)
+        else:
+            click.echo(f"{stats['scanned']} files, {stats['deleted']} deleted...")
+
+    stats = reconcile_orphaned_files(
+        prefix=prefix,
+        min_age=config['ORPHAN_MIN_AGE'] if min_age is None else min_age,
+        dry_run=dry_run,
+        batch_size=batch_size or config['ORPHAN_BATCH_SIZE'],
+        checkpoint=config['ORPHAN_CHECKPOINT_FILE'],
+        restart=restart,
+        progress=progress
+    )
+    if stats['resumed_after']:
+        click.echo(f"Resumed after {stats['resumed_after']}.")
+    click.echo(
+        f"Scanned {stats['scanned']}: {stats['referenced']} referenced, "
+        f"{stats['recent']} too recent, {stats['orphaned']} orphaned."
+    )
+    if not dry_run:
+        click.echo(f"Deleted {stats['deleted']}, failed {stats['failed']}.")
+    if stats['failed']:
+        raise SystemExit(1)
+
+
+def register_commands(app):
+    """Register the CMS commands on a Flask app."""
+    app.cli.add_command(poll_test_runs_command)
+    app.cli.add_command(backfill_content_types_command)
+    app.cli.add_command(storage_usage_command)
+    app.cli.add_command(explain_queries_command)
+    app.cli.add_command(rebuild_dashboard_stats_command)
+    app.cli.add_command(backfill_test_metrics_command)
+    app.cli.add_command(cleanup_orphaned_files_command)
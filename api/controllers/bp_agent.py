@@ -3,7 +3,6 @@ Breaking Point MCP Agent controller for interacting with the BP MCP Agent.
 """
 
 import os
-import sys
 import tempfile
 from datetime import datetime
 import logging
@@ -13,6 +12,9 @@ from api.models.test_run import TestRun
 from api.models.test_result import TestResult
 from api.models.environment import Environment
 from api.models.device import Device
+from integration.agent_adapter import get_agent
+from integration.bp_agent import DEFAULT_CHART_CONCURRENCY
+from integration.session_pool import get_session_pool
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -32,54 +34,29 @@ class BPAgentController:
         self.bp_mcp_agent_port = app.config.get('BP_MCP_AGENT_PORT')
         self.bp_mcp_agent_username = app.config.get('BP_MCP_AGENT_USERNAME')
         self.bp_mcp_agent_password = app.config.get('BP_MCP_AGENT_PASSWORD')
-        
-        # Add BP MCP Agent to Python path if needed
-        bp_mcp_agent_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../BP_MCP_Agent'))
-        if os.path.exists(bp_mcp_agent_path) and bp_mcp_agent_path not in sys.path:
-            sys.path.append(bp_mcp_agent_path)
-        
-        # Import BP MCP Agent modules
-        try:
-            from src.api import BreakingPointAPI
-            from src.analyzer import (
-                get_test_result_summary,
-                generate_report,
-                generate_charts,
-                get_raw_test_results
-            )
-            self.BreakingPointAPI = BreakingPointAPI
-            self.get_test_result_summary = get_test_result_summary
-            self.generate_report_func = generate_report
-            self.generate_charts_func = generate_charts
-            self.get_raw_test_results = get_raw_test_results
-            self.import_success = True
-        except ImportError as e:
-            logger.error(f"Failed to import BP MCP Agent modules: {e}")
-            self.import_success = False
     
-    def get_bp_api(self):
+    @property
+    def agent(self):
+        """Breaking Point entry points (agent package or HTTP API), resolved once per process."""
+        return get_agent(self.app.config)
+    
+    def bp_session(self):
         """
-        Get a BreakingPointAPI instance.
+        Lease a pooled BreakingPointAPI session.
         
         Returns:
-            BreakingPointAPI: Authenticated BP API instance
+            ContextManager[BreakingPointAPI]: Authenticated BP API instance,
+            returned to the shared session pool when the block exits
         
         Raises:
-            Exception: If BP MCP Agent modules are not imported or login fails
+            Exception: If login fails
         """
-        if not self.import_success:
-            raise Exception("BP MCP Agent modules not imported")
-        
-        bp_api = self.BreakingPointAPI(
+        return get_session_pool(self.app.config).session(
+            self.agent.BreakingPointAPI,
             host=self.bp_mcp_agent_host,
             username=self.bp_mcp_agent_username,
             password=self.bp_mcp_agent_password
         )
-        
-        if not bp_api.login():
-            raise Exception("Failed to log in to Breaking Point")
-        
-        return bp_api
     
     def run_test(self, test_config, environment_id, device_id, created_by=None):
         """
@@ -107,23 +84,25 @@ class BPAgentController:
         if not device:
             raise Exception(f"Device with ID {device_id} not found")
         
-        bp_api = None
-        try:
-            bp_api = self.get_bp_api()
-            
+        with self.bp_session() as bp_api:
             # Create test if needed
             bp_test_id = test_config.bp_test_id
-            if not bp_test_id:
-                # Create the test in BP
-                test_result = bp_api.create_test(test_config.config_data)
-                bp_test_id = test_result.get('id')
+            if not self.agent.in_process:
+                # The agent HTTP API creates the test from its configuration on every run
+                run_result = bp_api.run_config(test_config.config_data)
+                bp_test_id = run_result.get('testId') or bp_test_id
+            else:
+                if not bp_test_id:
+                    # Create the test in BP
+                    test_result = bp_api.create_test(test_config.config_data)
+                    bp_test_id = test_result.get('id')
+                    
+                    # Update the test config with the BP test ID
+                    test_config.bp_test_id = bp_test_id
+                    db.session.commit()
                 
-                # Update the test config with the BP test ID
-                test_config.bp_test_id = bp_test_id
-                db.session.commit()
-            
-            # Run the test
-            run_result = bp_api.run_test(bp_test_id)
+                # Run the test
+                run_result = bp_api.run_test(bp_test_id)
             bp_run_id = run_result.get('runId')
             
             # Create the test run
@@ -142,10 +121,6 @@ class BPAgentController:
             db.session.commit()
             
             return test_run
-            
-        finally:
-            if bp_api:
-                bp_api.logout()
     
     def get_test_status(self, test_run):
         """
@@ -160,9 +135,7 @@ class BPAgentController:
         Raises:
             Exception: If status check fails
         """
-        bp_api = None
-        try:
-            bp_api = self.get_bp_api()
+        with self.bp_session() as bp_api:
             status = bp_api.get_test_status(test_run.bp_test_id, test_run.bp_run_id)
             
             # Update test run if completed
@@ -178,10 +151,6 @@ class BPAgentController:
                 db.session.commit()
             
             return status
-            
-        finally:
-            if bp_api:
-                bp_api.logout()
     
     def stop_test(self, test_run):
         """
@@ -193,10 +162,8 @@ class BPAgentController:
         Raises:
             Exception: If test stop fails
         """
-        bp_api = None
-        try:
-            bp_api = self.get_bp_api()
-            bp_api.stop_test(test_run.bp_test_id)
+        with self.bp_session() as bp_api:
+            bp_api.stop_test(test_run.bp_test_id, test_run.bp_run_id)
             
             # Update test run
             test_run.status = 'stopped'
@@ -208,10 +175,6 @@ class BPAgentController:
                 test_run.duration = int(duration)
             
             db.session.commit()
-            
-        finally:
-            if bp_api:
-                bp_api.logout()
     
     def get_test_results(self, test_run):
         """
@@ -226,15 +189,9 @@ class BPAgentController:
         Raises:
             Exception: If results retrieval fails
         """
-        bp_api = None
-        try:
-            bp_api = self.get_bp_api()
-            results = self.get_raw_test_results(bp_api, test_run.bp_test_id, test_run.bp_run_id)
+        with self.bp_session() as bp_api:
+            results = self.agent.get_raw_test_results(bp_api, test_run.bp_test_id, test_run.bp_run_id)
             return results
-            
-        finally:
-            if bp_api:
-                bp_api.logout()
     
     def extract_result_summary(self, results):
         """
@@ -274,14 +231,11 @@ class BPAgentController:
         Raises:
             Exception: If report generation fails
         """
-        bp_api = None
-        try:
-            bp_api = self.get_bp_api()
-            
+        with self.bp_session() as bp_api:
             # Create a temporary directory for the report
             with tempfile.TemporaryDirectory() as temp_dir:
                 # Generate the report
-                report_path = self.generate_report_func(
+                report_path = self.agent.generate_report(
                     bp_api,
                     test_run.bp_test_id,
                     test_run.bp_run_id,
@@ -304,15 +258,53 @@ class BPAgentController:
                     stored_path = storage.save_file(f, storage_path)
                 
                 return stored_path, report_filename
-                
-        finally:
-            if bp_api:
-                bp_api.logout()
+    
+    def _iter_chart_files(self, chart_paths):
+        """
+        Open generated chart files one at a time.
+        
+        Args:
+            chart_paths: Paths to chart files
+        
+        Yields:
+            tuple: (chart_filename, file object)
+        """
+        for chart_path in chart_paths:
+            with open(chart_path, 'rb') as f:
+                yield os.path.basename(chart_path), f
+    
+    def _store_charts(self, test_run, charts):
+        """
+        Store charts as they are produced.
+        
+        Args:
+            test_run: TestRun object
+            charts: Iterable of (chart_filename, stream) pairs
+        
+        Returns:
+            list: Storage paths of the stored charts
+        """
+        # Get the storage
+        storage = self.app.storage
+        
+        stored_paths = []
+        for chart_filename, stream in charts:
+            # Create the storage path
+            storage_path = f"charts/{test_run.id}/{chart_filename}"
+            
+            # Store the chart
+            stored_paths.append(storage.save_file(stream, storage_path))
+        
+        return stored_paths
     
     def generate_charts(self, test_run, output_dir=None):
         """
         Generate charts for a test run.
         
+        Charts are written to storage one at a time as they are produced.
+        Without the in-process BP MCP Agent modules, charts are fetched
+        concurrently from the agent's HTTP API instead.
+        
         Args:
             test_run: TestRun object
             output_dir: Output directory
@@ -323,40 +315,25 @@ class BPAgentController:
         Raises:
             Exception: If chart generation fails
         """
-        bp_api = None
-        try:
-            bp_api = self.get_bp_api()
-            
+        if not self.agent.in_process:
+            return self._store_charts(
+                test_run,
+                self.agent.client.iter_charts(
+                    test_run.bp_test_id,
+                    test_run.bp_run_id,
+                    max_concurrency=self.app.config.get('BP_CHART_FETCH_CONCURRENCY', DEFAULT_CHART_CONCURRENCY)
+                )
+            )
+        
+        with self.bp_session() as bp_api:
             # Create a temporary directory for the charts
             with tempfile.TemporaryDirectory() as temp_dir:
                 # Generate the charts
-                chart_paths = self.generate_charts_func(
+                chart_paths = self.agent.generate_charts(
                     bp_api,
                     test_run.bp_test_id,
                     test_run.bp_run_id,
                     temp_dir
                 )
                 
-                # Get the storage
-                storage = self.app.storage
-                
-                # Store the charts
-                stored_paths = []
-                for chart_path in chart_paths:
-                    # Get the chart filename
-                    chart_filename = os.path.basename(chart_path)
-                    
-                    # Create the storage path
-                    storage_path = f"charts/{test_run.id}/{chart_filename}"
-                    
-                    # Store the chart
-                    with open(chart_path, 'rb') as f:
-                        stored_path = storage.save_file(f, storage_path)
-                    
-                    stored_paths.append(stored_path)
-                
-                return stored_paths
-                
-        finally:
-            if bp_api:
-                bp_api.logout()
+                return self._store_charts(test_run, self._iter_chart_files(chart_paths))
@@ -3,21 +3,14 @@ Report controller for generating Breaking Point reports.
 """
 
 import os
-import sys
 from datetime import datetime
 from flask import current_app
 import json
 import uuid
 
-# Add BP_MCP_Agent to the Python path
-sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), '..', 'BP_MCP_Agent'))
-
-# Import BP_MCP_Agent modules
-from src.api import BreakingPointAPI
-from src.analyzer import generate_report as bp_generate_report
-from src.exceptions import APIError, AuthenticationError, ResourceNotFoundError, ReportError
-
 from api.models import db
+from integration.agent_adapter import get_agent
+from integration.session_pool import get_session_pool
 from api.models.test_run import TestRun
 from api.models.report import Report
 
@@ -32,17 +25,28 @@ class ReportController:
         self.password = current_app.config['BP_MCP_AGENT_PASSWORD']
         self.bp_api = None
     
+    @property
+    def agent(self):
+        """Breaking Point entry points (agent package or HTTP API), resolved once per process."""
+        return get_agent(current_app.config)
+    
     def _connect(self):
-        """Connect to Breaking Point API."""
+        """Lease a Breaking Point API session from the shared pool."""
         if not self.bp_api:
-            self.bp_api = BreakingPointAPI(self.host, self.username, self.password)
-            self.bp_api.login()
+            self.bp_api = get_session_pool(current_app.config).acquire(
+                self.agent.BreakingPointAPI, self.host, self.username, self.password
+            )
     
-    def _disconnect(self):
-        """Disconnect from Breaking Point API."""
+    def _disconnect(self, failed=False):
+        """Return the Breaking Point API session to the shared pool.
+        
+        Args:
+            failed: Whether the operation using the session failed; the
+                session is then dropped, since it may no longer be usable
+        """
         if self.bp_api:
-            self.bp_api.logout()
-            self.bp_api = None
+            bp_api, self.bp_api = self.bp_api, None
+            get_session_pool(current_app.config).release(bp_api, discard=failed)
     
     def generate_report(self, test_run, report_type, file_format, name=None, description=None, created_by=None):
         """Generate a report for a test run.
@@ -91,7 +95,7 @@ class ReportController:
         
         try:
             # Generate the report
-            report_path = bp_generate_report(
+            report_path = self.agent.generate_report(
                 self.bp_api,
                 test_run.bp_test_id,
                 test_run.bp_run_id,
@@ -118,7 +122,11 @@ class ReportController:
             db.session.commit()
             
             return report
-        except ReportError as e:
+        except self.agent.ReportError as e:
+            self._disconnect(failed=True)
             raise ValueError(f"Failed to generate report: {str(e)}")
+        except Exception:
+            self._disconnect(failed=True)
+            raise
         finally:
             self._disconnect()
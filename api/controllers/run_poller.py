@@ -0,0 +1,186 @@
+"""
+Batched status poller for running Breaking Point tests.
+"""
+
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from api.models import db
+from api.models.test_run import TestRun
+from api.controllers.test_controller import TestController
+from api.run_events import expected_durations, get_run_events, run_event
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Statuses reported by Breaking Point that end a run
+TERMINAL_STATUSES = ('completed', 'failed')
+
+
+class RunStatusPoller:
+    """
+    Poll every running test run from a single loop.
+
+    Each tick loads all ``TestRun`` rows with ``status='running'``, checks the
+    ones that are due over one Breaking Point session per environment, writes
+    every status change in one transaction and hands finished runs to result
+    collection. Runs are checked more often as they approach their expected
+    end (the average duration of earlier completed runs of the same test
+    configuration) and less often early on.
+    """
+
+    def __init__(self, app, on_finished=None, scheduler=None):
+        """
+        Initialize the poller.
+
+        Args:
+            app: Flask application with configuration
+            on_finished: Callable taking a test run ID, invoked for every run
+                that reaches a terminal status
+            scheduler: RunScheduler ticked after every poll, so queued runs
+                start as soon as running ones free their slots
+        """
+        self.app = app
+        self.on_finished = on_finished
+        self.scheduler = scheduler
+        self.min_interval = float(app.config.get('RUN_POLL_MIN_INTERVAL', 2))
+        self.max_interval = float(app.config.get('RUN_POLL_MAX_INTERVAL', 60))
+        self.default_interval = float(app.config.get('RUN_POLL_DEFAULT_INTERVAL', 10))
+        # test run ID -> monotonic time of the next status check
+        self._next_due: Dict[int, float] = {}
+
+    def _expected_durations(self, test_config_ids: Iterable[int]) -> Dict[int, float]:
+        """Average duration in seconds of completed runs, per test configuration."""
+        return expected_durations(test_config_ids)
+
+    def next_interval(self, test_run: TestRun, expected_duration: Optional[float], now: datetime) -> float:
+        """
+        Work out how long to wait before checking a run again.
+
+        Args:
+            test_run: TestRun object
+            expected_duration: Expected run duration in seconds, if known
+            now: Current UTC time
+
+        Returns:
+            float: Seconds until the next status check
+        """
+        if not expected_duration or not test_run.start_time:
+            return self.default_interval
+
+        elapsed = (now - test_run.start_time).total_seconds()
+        remaining = expected_duration - elapsed
+
+        # Check a quarter of the remaining time from now, so the interval
+        # shrinks geometrically as the expected end approaches; overdue runs
+        # are checked as often as allowed.
+        return min(self.max_interval, max(self.min_interval, remaining / 4))
+
+    def tick(self) -> List[int]:
+        """
+        Check all due running test runs once.
+
+        Returns:
+            List[int]: IDs of test runs that finished during this tick
+        """
+        now = time.monotonic()
+        running = TestRun.query.filter(TestRun.status == 'running').all()
+
+        # Forget runs that stopped running through some other path
+        running_ids = {test_run.id for test_run in running}
+        for run_id in list(self._next_due):
+            if run_id not in running_ids:
+                del self._next_due[run_id]
+
+        due = [test_run for test_run in running if self._next_due.get(test_run.id, 0) <= now]
+        if not due:
+            return []
+
+        groups = defaultdict(list)
+        for test_run in due:
+            groups[test_run.environment_id].append(test_run)
+
+        expected = self._expected_durations(test_run.test_config_id for test_run in due)
+        utcnow = datetime.utcnow()
+        controller = TestController()
+        finished = []
+        progress = []
+
+        for environment_id, test_runs in groups.items():
+            try:
+                statuses = controller.get_test_statuses(test_runs)
+            except Exception as e:
+                logger.error(f"Failed to poll test runs for environment {environment_id}: {e}")
+                for test_run in test_runs:
+                    self._next_due[test_run.id] = now + self.min_interval
+                continue
+
+            for test_run in test_runs:
+                status = statuses.get(test_run.id)
+
+                if status in TERMINAL_STATUSES:
+                    test_run.status = status
+                    test_run.end_time = utcnow
+
+                    if test_run.start_time:
+                        # Calculate duration in seconds
+                        duration = (test_run.end_time - test_run.start_time).total_seconds()
+                        test_run.duration = int(duration)
+
+                    finished.append(test_run.id)
+                    self._next_due.pop(test_run.id, None)
+                else:
+                    interval = self.next_interval(test_run, expected.get(test_run.test_config_id), utcnow)
+                    self._next_due[test_run.id] = now + interval
+                    progress.append(run_event(test_run, expected.get(test_run.test_config_id), utcnow))
+
+        # Status changes are published on commit; runs still running report progress
+        get_run_events(self.app).publish(progress)
+        
+        if finished:
+            try:
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+            for run_id in finished:
+                logger.info(f"Test run {run_id} finished")
+                if self.on_finished:
+                    try:
+                        self.on_finished(run_id)
+                    except Exception as e:
+                        logger.error(f"Failed to queue result collection for test run {run_id}: {e}")
+
+        return finished
+
+    def run_forever(self, tick_interval: Optional[float] = None):
+        """
+        Poll until interrupted.
+
+        Args:
+            tick_interval: Seconds between ticks (defaults to RUN_POLL_TICK)
+        """
+        tick_interval = tick_interval or float(self.app.config.get('RUN_POLL_TICK', 1))
+
+        while True:
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Error polling test runs: {e}")
+            finally:
+                # Release the connection and drop the identity map between ticks
+                db.session.remove()
+
+            if self.scheduler:
+                try:
+                    self.scheduler.tick()
+                except Exception as e:
+                    logger.error(f"Error scheduling test runs: {e}")
+                finally:
+                    db.session.remove()
+
+            time.sleep(tick_interval)
@@ -0,0 +1,329 @@
+"""
+Capacity-aware scheduler for queued Breaking Point test runs.
+"""
+
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import case, func, or_
+
+from api.models import db
+from api.models.device import Device
+from api.models.environment import Environment
+from api.models.test_configuration import TestConfiguration
+from api.models.test_run import TestRun
+from api.controllers.test_controller import TestController
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Statuses that occupy an environment and device slot
+ACTIVE_STATUSES = ('starting', 'running')
+
+# Window over which /api/metrics reports how long started runs waited (seconds)
+WAIT_WINDOW = 3600
+
+
+def utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to the naive UTC the database stores; naive ones are taken as UTC."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def schedule_test_run(test_config, environment, device, created_by=None, priority=0, scheduled_at=None):
+    """
+    Queue a test run for the scheduler.
+
+    Args:
+        test_config: TestConfiguration object
+        environment: Environment object
+        device: Device object
+        created_by: Username of the user who queued the run
+        priority: Higher priorities start first
+        scheduled_at: Earliest start time (naive UTC, or aware in any time
+            zone), or None for as soon as there is capacity
+
+    Returns:
+        TestRun: The queued test run (added to the session, not committed)
+    """
+    test_run = TestRun(
+        test_config_id=test_config.id,
+        environment_id=environment.id,
+        device_id=device.id,
+        status='scheduled',
+        priority=priority,
+        scheduled_at=utc_naive(scheduled_at),
+        created_by=created_by
+    )
+    db.session.add(test_run)
+    return test_run
+
+
+def _due(now: datetime):
+    """Condition for scheduled runs whose start time has come."""
+    return or_(TestRun.scheduled_at.is_(None), TestRun.scheduled_at <= now)
+
+
+def _slot_usage():
+    """Active runs per environment and per device."""
+    rows = db.session.query(
+        TestRun.environment_id, TestRun.device_id, func.count()
+    ).filter(
+        TestRun.status.in_(ACTIVE_STATUSES)
+    ).group_by(TestRun.environment_id, TestRun.device_id).all()
+
+    environments, devices = Counter(), Counter()
+    for environment_id, device_id, count in rows:
+        environments[environment_id] += count
+        devices[device_id] += count
+    return environments, devices
+
+
+def _limits(model, ids: Iterable[int], default: int) -> Dict[int, int]:
+    """Concurrent run limit per ID, from max_concurrent_runs or the default."""
+    ids = set(ids)
+    if not ids:
+        return {}
+    rows = db.session.query(model.id, model.max_concurrent_runs).filter(model.id.in_(ids)).all()
+    return {row_id: default if limit is None else limit for row_id, limit in rows}
+
+
+class RunScheduler:
+    """
+    Start queued test runs as environment and device capacity allows.
+
+    Each tick takes the due ``TestRun`` rows with ``status='scheduled'`` in
+    priority order (highest first, oldest first within a priority) and
+    starts every run whose environment (chassis) and device still have a
+    free slot, through :meth:`TestController.run_test`. A run that cannot
+    start yet does not hold up runs behind it on other environments or
+    devices. Runs with a ``scheduled_at`` in the future stay queued until
+    then.
+
+    The status poller ticks the scheduler right after each poll, so a slot
+    freed by a finished run is reused within the same tick.
+    """
+
+    def __init__(self, app):
+        """
+        Initialize the scheduler.
+
+        Args:
+            app: Flask application with configuration
+        """
+        self.app = app
+        self.environment_slots = int(app.config.get('SCHEDULER_ENVIRONMENT_SLOTS', 1))
+        self.device_slots = int(app.config.get('SCHEDULER_DEVICE_SLOTS', 1))
+        self.start_timeout = float(app.config.get('SCHEDULER_START_TIMEOUT', 300))
+        self.dispatch_concurrency = max(1, int(app.config.get('SCHEDULER_DISPATCH_CONCURRENCY', 4)))
+
+    def _fail_stale_starts(self, now: datetime) -> None:
+        """Fail runs left 'starting' by a scheduler that died while starting them."""
+        stale = TestRun.query.filter(
+            TestRun.status == 'starting',
+            TestRun.updated_at < now - timedelta(seconds=self.start_timeout)
+        ).all()
+        for test_run in stale:
+            logger.error(f"Test run {test_run.id} did not start within {self.start_timeout:.0f}s")
+            test_run.status = 'failed'
+            test_run.end_time = now
+        if stale:
+            db.session.commit()
+
+    def _claim(self, run_id: int) -> Optional[TestRun]:
+        """Mark a queued run as starting, unless another scheduler got to it first."""
+        test_run = TestRun.query.filter(
+            TestRun.id == run_id, TestRun.status == 'scheduled'
+        ).with_for_update(skip_locked=True).first()
+        if test_run is None:
+            db.session.rollback()
+            return None
+        test_run.status = 'starting'
+        db.session.commit()
+        return test_run
+
+    def _fail(self, run_ids: Iterable[int], reason: str) -> None:
+        """Mark claimed runs failed."""
+        now = datetime.utcnow()
+        for test_run in TestRun.query.filter(TestRun.id.in_(list(run_ids))).all():
+            logger.error(f"Failed to start test run {test_run.id}: {reason}")
+            test_run.status = 'failed'
+            test_run.end_time = now
+        db.session.commit()
+
+    def _create_missing_tests(self, run_ids: List[int]) -> List[int]:
+        """
+        Create the Breaking Point tests of the claimed runs' configurations
+        that have none, once per configuration, before the runs start in
+        parallel.
+
+        Returns:
+            List[int]: The runs that can start; runs of configurations whose
+            test could not be created are failed
+        """
+        controller = TestController()
+        if not controller.agent.in_process:
+            # Over HTTP the agent creates the test from its configuration on every run
+            return run_ids
+
+        configs = TestConfiguration.query.join(
+            TestRun, TestRun.test_config_id == TestConfiguration.id
+        ).filter(
+            TestRun.id.in_(run_ids), TestConfiguration.bp_test_id.is_(None)
+        ).distinct().all()
+
+        failed_configs = set()
+        for test_config in configs:
+            try:
+                test_config.bp_test_id = controller.create_test(test_config)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Failed to create the test of configuration {test_config.id}: {e}")
+                failed_configs.add(test_config.id)
+        if not failed_configs:
+            return run_ids
+
+        failed = {
+            run_id for (run_id,) in db.session.query(TestRun.id).filter(
+                TestRun.id.in_(run_ids), TestRun.test_config_id.in_(failed_configs)
+            )
+        }
+        self._fail(failed, "its test could not be created")
+        return [run_id for run_id in run_ids if run_id not in failed]
+
+    def _start(self, run_id: int) -> bool:
+        """Start a claimed run in Breaking Point, in a worker thread; mark it failed if that fails."""
+        with self.app.app_context():
+            test_run = TestRun.query.get(run_id)
+            try:
+                TestController().run_test(
+                    test_run.test_configuration,
+                    test_run.environment_id,
+                    test_run.device_id,
+                    created_by=test_run.created_by,
+                    test_run=test_run
+                )
+                return True
+            except Exception as e:
+                db.session.rollback()
+                self._fail([run_id], str(e))
+                return False
+
+    def tick(self) -> List[int]:
+        """
+        Start as many due queued runs as capacity allows.
+
+        Runs are claimed one by one in queue order, then started together,
+        ``SCHEDULER_DISPATCH_CONCURRENCY`` at a time over pooled Breaking
+        Point sessions.
+
+        Returns:
+            List[int]: IDs of test runs started during this tick
+        """
+        now = datetime.utcnow()
+        self._fail_stale_starts(now)
+
+        queued = db.session.query(
+            TestRun.id, TestRun.environment_id, TestRun.device_id
+        ).filter(
+            TestRun.status == 'scheduled', _due(now)
+        ).order_by(
+            TestRun.priority.desc(), TestRun.created_at, TestRun.id
+        ).all()
+        if not queued:
+            return []
+
+        environments, devices = _slot_usage()
+        environment_limits = _limits(Environment, (row.environment_id for row in queued), self.environment_slots)
+        device_limits = _limits(Device, (row.device_id for row in queued), self.device_slots)
+
+        claimed = []
+        for run_id, environment_id, device_id in queued:
+            if environments[environment_id] >= environment_limits.get(environment_id, self.environment_slots):
+                continue
+            if devices[device_id] >= device_limits.get(device_id, self.device_slots):
+                continue
+
+            if self._claim(run_id) is None:
+                continue
+            environments[environment_id] += 1
+            devices[device_id] += 1
+            claimed.append(run_id)
+
+        if not claimed:
+            return []
+        claimed = self._create_missing_tests(claimed)
+
+        with ThreadPoolExecutor(max_workers=self.dispatch_concurrency) as executor:
+            results = list(executor.map(self._start, claimed))
+
+        started = [run_id for run_id, ok in zip(claimed, results) if ok]
+        for run_id in started:
+            logger.info(f"Started scheduled test run {run_id}")
+        return started
+
+
+def scheduler_stats(app) -> Dict:
+    """
+    Queue depth, waiting times and slot usage of the scheduler.
+
+    Read from the database, so any process can report them.
+
+    Args:
+        app: Flask application with configuration
+
+    Returns:
+        Dict: ``queued`` (due runs), ``deferred`` (runs whose start time has
+        not come), ``oldest_wait_seconds`` (of the due runs), ``wait`` (count,
+        average and maximum seconds waited by runs started in the last hour)
+        and ``slots`` (active runs and limit per environment and device in use)
+    """
+    now = datetime.utcnow()
+    queued_since = func.coalesce(TestRun.scheduled_at, TestRun.created_at)
+
+    due, queued, oldest = db.session.query(
+        func.sum(case((_due(now), 1), else_=0)),
+        func.count(TestRun.id),
+        func.min(case((_due(now), queued_since)))
+    ).filter(TestRun.status == 'scheduled').one()
+    due = int(due or 0)
+
+    waits = [
+        max(0.0, (start_time - since).total_seconds())
+        for start_time, since in db.session.query(TestRun.start_time, queued_since).filter(
+            TestRun.start_time >= now - timedelta(seconds=WAIT_WINDOW)
+        )
+        if since is not None
+    ]
+
+    environments, devices = _slot_usage()
+    environment_slots = int(app.config.get('SCHEDULER_ENVIRONMENT_SLOTS', 1))
+    device_slots = int(app.config.get('SCHEDULER_DEVICE_SLOTS', 1))
+    environment_limits = _limits(Environment, environments, environment_slots)
+    device_limits = _limits(Device, devices, device_slots)
+
+    return {
+        'queued': due,
+        'deferred': queued - due,
+        'oldest_wait_seconds': (now - oldest).total_seconds() if oldest else None,
+        'wait': {
+            'runs': len(waits),
+            'avg_seconds': sum(waits) / len(waits) if waits else None,
+            'max_seconds': max(waits) if waits else None
+        },
+        'slots': {
+            'environments': {
+                str(environment_id): {'active': count, 'limit': environment_limits.get(environment_id, environment_slots)}
+                for environment_id, count in sorted(environments.items())
+            },
+            'devices': {
+                str(device_id): {'active': count, 'limit': device_limits.get(device_id, device_slots)}
+                for device_id, count in sorted(devices.items())
+            }
+        }
+    }
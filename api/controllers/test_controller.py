@@ -2,26 +2,19 @@
 Test controller for Managing Breaking Point tests.
 """
 
-import os
-import sys
 from datetime import datetime
 from flask import current_app
 import json
 
-# Add BP_MCP_Agent to the Python path
-sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), '..', 'BP_MCP_Agent'))
-
-# Import BP_MCP_Agent modules
-from src.api import BreakingPointAPI
-from src.analyzer import get_test_result_summary
-from src.exceptions import APIError, AuthenticationError, ResourceNotFoundError
-
 from api.models import db
+from integration.agent_adapter import get_agent
+from integration.session_pool import get_session_pool
 from api.models.test_run import TestRun
 from api.models.test_result import TestResult
 from api.models.test_configuration import TestConfiguration
 from api.models.environment import Environment
 from api.models.device import Device
+from api.test_metrics import ingest_test_result
 
 
 class TestController:
@@ -34,17 +27,28 @@ class TestController:
         self.password = current_app.config['BP_MCP_AGENT_PASSWORD']
         self.bp_api = None
     
+    @property
+    def agent(self):
+        """Breaking Point entry points (agent package or HTTP API), resolved once per process."""
+        return get_agent(current_app.config)
+    
     def _connect(self):
-        """Connect to Breaking Point API."""
+        """Lease a Breaking Point API session from the shared pool."""
         if not self.bp_api:
-            self.bp_api = BreakingPointAPI(self.host, self.username, self.password)
-            self.bp_api.login()
+            self.bp_api = get_session_pool(current_app.config).acquire(
+                self.agent.BreakingPointAPI, self.host, self.username, self.password
+            )
     
-    def _disconnect(self):
-        """Disconnect from Breaking Point API."""
+    def _disconnect(self, failed=False):
+        """Return the Breaking Point API session to the shared pool.
+        
+        Args:
+            failed: Whether the operation using the session failed; the
+                session is then dropped, since it may no longer be usable
+        """
         if self.bp_api:
-            self.bp_api.logout()
-            self.bp_api = None
+            bp_api, self.bp_api = self.bp_api, None
+            get_session_pool(current_app.config).release(bp_api, discard=failed)
     
     def create_test(self, test_config):
         """Create a test in Breaking Point.
@@ -63,6 +67,9 @@ class TestController:
             
             # Return the test ID
             return result.get('id')
+        except Exception:
+            self._disconnect(failed=True)
+            raise
         finally:
             self._disconnect()
     
@@ -82,11 +89,16 @@ class TestController:
             self.bp_api.update_test(test_config.bp_test_id, test_config.config_data)
             
             return True
-        except ResourceNotFoundError:
-            # If the test doesn't exist, try to create it
-            test_config.bp_test_id = self.create_test(test_config)
-            db.session.commit()
+        except self.agent.ResourceNotFoundError:
+            # If the test doesn't exist, try to create it (over HTTP the
+            # agent creates it from its configuration on the next run)
+            if self.agent.in_process:
+                test_config.bp_test_id = self.create_test(test_config)
+                db.session.commit()
             return True
+        except Exception:
+            self._disconnect(failed=True)
+            raise
         finally:
             self._disconnect()
     
@@ -106,13 +118,16 @@ class TestController:
             self.bp_api.delete_test(bp_test_id)
             
             return True
-        except ResourceNotFoundError:
+        except self.agent.ResourceNotFoundError:
             # If the test doesn't exist, just return success
             return True
+        except Exception:
+            self._disconnect(failed=True)
+            raise
         finally:
             self._disconnect()
     
-    def run_test(self, test_config, environment_id, device_id, created_by=None):
+    def run_test(self, test_config, environment_id, device_id, created_by=None, test_run=None):
         """Run a test in Breaking Point.
         
         Args:
@@ -120,9 +135,11 @@ class TestController:
             environment_id: Environment ID
             device_id: Device ID
             created_by: Username of the user who created the test run
+            test_run: Scheduled TestRun to start (see api.controllers.run_scheduler)
+                instead of creating a new one
         
         Returns:
-            TestRun: Created test run object
+            TestRun: Created (or started) test run object
         """
         # Check if the test configuration exists
         if not isinstance(test_config, TestConfiguration):
@@ -140,8 +157,9 @@ class TestController:
         if not device:
             raise ValueError("Device not found")
         
-        # Ensure the test has a BP test ID
-        if not test_config.bp_test_id:
+        # Ensure the test has a BP test ID (over HTTP the agent creates the
+        # test from its configuration on every run instead)
+        if self.agent.in_process and not test_config.bp_test_id:
             test_config.bp_test_id = self.create_test(test_config)
             db.session.commit()
         
@@ -150,7 +168,10 @@ class TestController:
         
         try:
             # Run the test
-            result = self.bp_api.run_test(test_config.bp_test_id)
+            if self.agent.in_process:
+                result = self.bp_api.run_test(test_config.bp_test_id)
+            else:
+                result = self.bp_api.run_config(test_config.config_data)
             
             # Get the run ID
             bp_run_id = result.get('runId')
@@ -158,26 +179,27 @@ class TestController:
             if not bp_run_id:
                 raise ValueError("Failed to start test: No run ID returned")
             
-            # Create the test run
-            test_run = TestRun(
-                test_config_id=test_config.id,
-                environment_id=environment_id,
-                device_id=device_id,
-                bp_test_id=test_config.bp_test_id,
-                bp_run_id=bp_run_id,
-                status='running',
-                start_time=datetime.utcnow(),
-                created_by=created_by
-            )
+            # Create the test run, or record the start of the scheduled one
+            if test_run is None:
+                test_run = TestRun(
+                    test_config_id=test_config.id,
+                    environment_id=environment_id,
+                    device_id=device_id,
+                    created_by=created_by
+                )
+                db.session.add(test_run)
             
-            db.session.add(test_run)
+            test_run.bp_test_id = result.get('testId') or test_config.bp_test_id
+            test_run.bp_run_id = bp_run_id
+            test_run.status = 'running'
+            test_run.start_time = datetime.utcnow()
             db.session.commit()
             
-            # Start a background task to monitor the test
-            from api.tasks import monitor_test_run
-            monitor_test_run.delay(test_run.id)
-            
+            # The run is picked up by the batched status poller (api.controllers.run_poller)
             return test_run
+        except Exception:
+            self._disconnect(failed=True)
+            raise
         finally:
             self._disconnect()
     
@@ -205,7 +227,7 @@ class TestController:
         
         try:
             # Stop the test
-            self.bp_api.stop_test(test_run.bp_test_id)
+            self.bp_api.stop_test(test_run.bp_test_id, test_run.bp_run_id)
             
             # Update the test run
             test_run.status = 'stopped'
@@ -219,6 +241,9 @@ class TestController:
             db.session.commit()
             
             return True
+        except Exception:
+            self._disconnect(failed=True)
+            raise
         finally:
             self._disconnect()
     
@@ -243,6 +268,39 @@ class TestController:
         try:
             # Get the test status
             return self.bp_api.get_test_status(test_run.bp_test_id, test_run.bp_run_id)
+        except Exception:
+            self._disconnect(failed=True)
+            raise
+        finally:
+            self._disconnect()
+    
+    def get_test_statuses(self, test_runs):
+        """Get the status of several test runs over one session.
+        
+        Args:
+            test_runs: Iterable of TestRun objects
+        
+        Returns:
+            dict: Mapping of test run ID to test status; runs whose status
+            could not be read are left out
+        """
+        statuses = {}
+        
+        # Connect to Breaking Point
+        self._connect()
+        
+        try:
+            for test_run in test_runs:
+                try:
+                    statuses[test_run.id] = self.bp_api.get_test_status(test_run.bp_test_id, test_run.bp_run_id)
+                except self.agent.ResourceNotFoundError:
+                    # Leave it for the next poll rather than failing the batch
+                    continue
+            
+            return statuses
+        except Exception:
+            self._disconnect(failed=True)
+            raise
         finally:
             self._disconnect()
     
@@ -266,7 +324,7 @@ class TestController:
         
         try:
             # Get the test results
-            summary = get_test_result_summary(self.bp_api, test_run.bp_test_id, test_run.bp_run_id)
+            summary = self.agent.get_test_result_summary(self.bp_api, test_run.bp_test_id, test_run.bp_run_id)
             
             # Update the test run if needed
             if test_run.status in ['running', 'pending']:
@@ -306,8 +364,14 @@ class TestController:
                 )
                 db.session.add(test_result)
             
+            # Typed, queryable copies of the metrics
+            ingest_test_result(test_result, test_run)
+            
             db.session.commit()
             
             return summary
+        except Exception:
+            self._disconnect(failed=True)
+            raise
         finally:
             self._disconnect()
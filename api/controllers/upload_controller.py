@@ -0,0 +1,117 @@
+"""
+Upload controller for direct-to-storage (presigned) file transfers.
+"""
+
+import os
+import logging
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+
+class UploadController:
+    """
+    Hand out presigned upload URLs and finish direct uploads.
+
+    Clients upload file bytes straight to the storage backend, so large
+    captures and reports never pass through the application server. Every
+    upload is confined to a key prefix (e.g. ``media/<test_run_id>/``) that
+    the caller derives from objects the user is allowed to write to.
+    """
+
+    def __init__(self, storage):
+        """
+        Initialize the controller.
+
+        Args:
+            storage: Storage backend
+        """
+        self.storage = storage
+
+    def _check_supported(self):
+        if not self.storage.supports_direct_transfer:
+            raise NotImplementedError("Direct uploads require S3 storage")
+
+    def _check_path(self, prefix, file_path):
+        if not file_path or not file_path.lstrip('/').startswith(prefix) or '..' in file_path.split('/'):
+            raise ValueError(f"file_path must be inside {prefix}")
+        return file_path.lstrip('/')
+
+    def start_upload(self, prefix, filename, content_type=None, size=None):
+        """
+        Start a direct upload.
+
+        Args:
+            prefix: Storage key prefix the file is uploaded under
+            filename: Original file name
+            content_type: Content type the client will send
+            size: File size in bytes
+
+        Returns:
+            dict: Upload instructions from the storage backend
+
+        Raises:
+            ValueError: If the request is invalid
+            NotImplementedError: If the storage backend does not support direct uploads
+        """
+        self._check_supported()
+
+        filename = os.path.basename(filename or '')
+        if not filename:
+            raise ValueError("filename is required")
+
+        if size is not None:
+            try:
+                size = int(size)
+            except (TypeError, ValueError):
+                raise ValueError("size must be an integer")
+            if size < 0:
+                raise ValueError("size must not be negative")
+
+        upload = self.storage.create_upload(f"{prefix}{filename}", content_type, size)
+        logger.info(f"Started direct upload to {upload['file_path']}")
+        return upload
+
+    def complete_upload(self, prefix, file_path, upload_id=None):
+        """
+        Finish a direct upload.
+
+        Args:
+            prefix: Storage key prefix the file must be under
+            file_path: Path the file was uploaded to
+            upload_id: Multipart upload ID, if the upload was split into parts
+
+        Returns:
+            dict: ``file_path``, ``size`` and ``content_type`` of the stored file
+
+        Raises:
+            ValueError: If the request is invalid
+            FileNotFoundError: If nothing was uploaded
+            NotImplementedError: If the storage backend does not support direct uploads
+        """
+        self._check_supported()
+        file_path = self._check_path(prefix, file_path)
+
+        info = self.storage.complete_upload(file_path, upload_id)
+        logger.info(f"Completed direct upload to {file_path} ({info['size']} bytes)")
+        return dict(info, file_path=file_path)
+
+    def abort_upload(self, prefix, file_path, upload_id):
+        """
+        Abandon a multipart direct upload.
+
+        Args:
+            prefix: Storage key prefix the file must be under
+            file_path: Path the file was being uploaded to
+            upload_id: Multipart upload ID
+
+        Raises:
+            ValueError: If the request is invalid
+            NotImplementedError: If the storage backend does not support direct uploads
+        """
+        self._check_supported()
+        file_path = self._check_path(prefix, file_path)
+        if not upload_id:
+            raise ValueError("upload_id is required")
+
+        self.storage.abort_upload(file_path, upload_id)
@@ -0,0 +1,267 @@
+"""
+Dashboard aggregates kept in summary tables.
+
+Every flush that creates, deletes or changes the status, device or creation
+time of a TestRun also adjusts the matching counts in the same transaction:
+runs per device and status (test_run_status_counts) and runs created per day
+(test_run_daily_counts). The dashboard then reads a few rows per device and
+per day, however many test runs there are.
+
+Bulk ``Query.update()``/``Query.delete()`` calls and raw SQL bypass the ORM
+and therefore the counts; bulk inserts report their rows with
+:func:`count_inserted_runs`, and ``flask rebuild-dashboard-stats`` recomputes
+the counts from ``test_runs``.
+"""
+
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import Date, cast, event, func, inspect as sa_inspect, literal_column, select
+
+from api.models import db
+from api.models.device import Device
+from api.models.test_run import TestRun
+from api.models.test_run_count import TestRunDailyCount, TestRunStatusCount
+
+# Statuses counted as a pass or a fail in per-device rates
+PASSED = 'completed'
+FAILED = 'failed'
+
+# Days of history shown in the runs-per-day chart
+DEFAULT_DAYS = 14
+
+# TestRun attributes that place a run in a summary row
+TRACKED = ('created_at', 'device_id', 'status')
+
+
+def _day(created_at) -> date:
+    return (created_at or datetime.utcnow()).date()
+
+
+def _old_value(state, attr: str):
+    """The committed value of an attribute before this flush."""
+    history = state.attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(state.object, attr)
+
+
+def _collect_deltas(session):
+    """Count changes per (device, status) and per day in a flush."""
+    by_status: Counter = Counter()
+    by_day: Counter = Counter()
+
+    def count(created_at, device_id, status, delta):
+        by_status[device_id, status] += delta
+        by_day[_day(created_at)] += delta
+
+    for obj in session.new:
+        if isinstance(obj, TestRun):
+            count(obj.created_at, obj.device_id, obj.status, 1)
+
+    for obj in session.deleted:
+        if isinstance(obj, TestRun):
+            state = sa_inspect(obj)
+            count(*(_old_value(state, attr) for attr in TRACKED), -1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, TestRun) or obj in session.deleted:
+            continue
+        state = sa_inspect(obj)
+        if any(state.attrs[attr].history.has_changes() for attr in TRACKED):
+            count(*(_old_value(state, attr) for attr in TRACKED), -1)
+            count(*(getattr(obj, attr) for attr in TRACKED), 1)
+
+    return (
+        {key: delta for key, delta in by_status.items() if delta},
+        {key: delta for key, delta in by_day.items() if delta}
+    )
+
+
+def _add_counts(connection, model, rows: List[Dict[str, Any]]) -> None:
+    """Add each row's run_count to the stored count, creating missing rows."""
+    table = model.__table__
+    keys = [column.name for column in table.primary_key.columns]
+    dialect = connection.dialect.name
+
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=keys,
+            set_={'run_count': table.c.run_count + statement.excluded.run_count}
+        )
+        connection.execute(statement, rows)
+    elif dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        statement = insert(table)
+        statement = statement.on_duplicate_key_update(
+            run_count=table.c.run_count + statement.inserted.run_count
+        )
+        connection.execute(statement, rows)
+    else:
+        for row in rows:
+            result = connection.execute(
+                table.update()
+                .where(*(table.c[key] == row[key] for key in keys))
+                .values(run_count=table.c.run_count + row['run_count'])
+            )
+            if not result.rowcount:
+                connection.execute(table.insert().values(**row))
+
+
+def _drop_empty(connection, column, keys) -> None:
+    """Delete the rows of ``column``'s table among ``keys`` whose count dropped to 0."""
+    table = column.table
+    connection.execute(table.delete().where(column.in_(keys), table.c.run_count <= 0))
+
+
+def _apply_deltas(connection, by_status, by_day) -> None:
+    if by_status:
+        _add_counts(connection, TestRunStatusCount, [
+            {'device_id': device_id, 'status': status, 'run_count': delta}
+            for (device_id, status), delta in by_status.items()
+        ])
+        decreased = {device_id for (device_id, _), delta in by_status.items() if delta < 0}
+        if decreased:
+            _drop_empty(connection, TestRunStatusCount.__table__.c.device_id, decreased)
+    if by_day:
+        _add_counts(connection, TestRunDailyCount, [
+            {'day': day, 'run_count': delta} for day, delta in by_day.items()
+        ])
+        decreased = {day for day, delta in by_day.items() if delta < 0}
+        if decreased:
+            _drop_empty(connection, TestRunDailyCount.__table__.c.day, decreased)
+
+
+def _update_counts(session, flush_context) -> None:
+    _apply_deltas(session.connection(), *_collect_deltas(session))
+
+
+def count_inserted_runs(rows: List[Dict[str, Any]]) -> None:
+    """
+    Add test runs inserted without the ORM (e.g. one bulk INSERT) to the
+    summary counts, in the current transaction.
+
+    Args:
+        rows: The inserted rows, with created_at, device_id and status
+    """
+    by_status: Counter = Counter()
+    by_day: Counter = Counter()
+    for row in rows:
+        by_status[row['device_id'], row['status']] += 1
+        by_day[_day(row.get('created_at'))] += 1
+    _apply_deltas(db.session.connection(), by_status, by_day)
+
+
+def _keep_old_value(target, value, oldvalue, initiator):
+    return value
+
+
+def init_dashboard_stats() -> None:
+    """Keep the summary tables up to date on every flush of ``db.session`` (once per process)."""
+    if event.contains(db.session, 'after_flush', _update_counts):
+        return
+
+    # With active history, setting an attribute of an expired run (e.g. after
+    # a commit) loads the stored value first, so the flush knows which counts
+    # the run moves out of
+    for attr in TRACKED:
+        event.listen(getattr(TestRun, attr), 'set', _keep_old_value, active_history=True, retval=True)
+    event.listen(db.session, 'after_flush', _update_counts)
+
+
+def rebuild_test_run_stats() -> int:
+    """
+    Recompute the summary tables from test_runs, in the current transaction.
+
+    Only (device, status) pairs and days that have runs get a row.
+
+    Returns:
+        int: Number of summary rows written
+    """
+    if db.session.get_bind().dialect.name == 'sqlite':
+        # CAST(... AS DATE) yields a number on SQLite
+        day = func.date(TestRun.created_at)
+    else:
+        day = cast(TestRun.created_at, Date)
+
+    status_table = TestRunStatusCount.__table__
+    daily_table = TestRunDailyCount.__table__
+    db.session.execute(status_table.delete())
+    db.session.execute(daily_table.delete())
+
+    written = db.session.execute(status_table.insert().from_select(
+        ['device_id', 'status', 'run_count'],
+        select(TestRun.device_id, TestRun.status, func.count(literal_column('*')))
+        .group_by(TestRun.device_id, TestRun.status)
+    )).rowcount
+    written += db.session.execute(daily_table.insert().from_select(
+        ['day', 'run_count'],
+        select(day, func.count(literal_column('*')))
+        .where(TestRun.created_at.isnot(None))
+        .group_by(day)
+    )).rowcount
+    return written
+
+
+def dashboard_summary(days: int = DEFAULT_DAYS, today: date = None) -> Dict[str, Any]:
+    """
+    Get the dashboard's aggregates from the summary tables.
+
+    Args:
+        days: Days of history for ``runs_per_day`` (including today)
+        today: Last day of ``runs_per_day`` (defaults to the current UTC date)
+
+    Returns:
+        Dict[str, Any]: ``total``, ``by_status`` (status to count), ``devices``
+        (per device: ``passed``, ``failed``, ``total`` and ``pass_rate``, the
+        share of finished runs that completed, or None) and ``runs_per_day``
+        (``date``/``count`` pairs, oldest first, including days without runs)
+    """
+    today = today or datetime.utcnow().date()
+    since = today - timedelta(days=days - 1)
+
+    status_counts = db.session.execute(
+        select(TestRunStatusCount.device_id, Device.name, TestRunStatusCount.status, TestRunStatusCount.run_count)
+        .outerjoin(Device, Device.id == TestRunStatusCount.device_id)
+        .where(TestRunStatusCount.run_count != 0)
+    ).all()
+
+    per_day = dict(db.session.execute(
+        select(TestRunDailyCount.day, TestRunDailyCount.run_count)
+        .where(TestRunDailyCount.day >= since, TestRunDailyCount.day <= today)
+    ).all())
+
+    by_status: Counter = Counter()
+    devices: Dict[int, Dict[str, Any]] = {}
+    for device_id, name, status, count in status_counts:
+        by_status[status] += count
+        device = devices.setdefault(device_id, {
+            'device_id': device_id, 'name': name, 'passed': 0, 'failed': 0, 'total': 0
+        })
+        device['total'] += count
+        if status == PASSED:
+            device['passed'] += count
+        elif status == FAILED:
+            device['failed'] += count
+
+    for device in devices.values():
+        finished = device['passed'] + device['failed']
+        device['pass_rate'] = device['passed'] / finished if finished else None
+
+    return {
+        'total': sum(by_status.values()),
+        'by_status': dict(by_status),
+        'devices': sorted(devices.values(), key=lambda device: device['name'] or ''),
+        'runs_per_day': [
+            {'date': day.isoformat(), 'count': per_day.get(day, 0)}
+            for day in (since + timedelta(days=offset) for offset in range(days))
+        ]
+    }
@@ -0,0 +1,242 @@
+"""
+Keyset-paginated, filterable list queries for the REST API.
+
+Every list endpoint returns the same envelope::
+
+    {
+        "items": [...],
+        "next_cursor": "eyJ2Ijog...",   # null on the last page
+        "limit": 50
+    }
+
+and accepts the same query parameters:
+
+- ``limit``: page size (capped at ``API_MAX_PAGE_SIZE``)
+- ``cursor``: ``next_cursor`` of the previous page
+- ``sort``: a sort key, prefixed with ``-`` for descending order
+- ``fields``: comma-separated fields to return (``id`` is always included);
+  only those columns are selected
+- any of the endpoint's filter fields, e.g. ``status=running,completed``
+- ``<date>_after`` / ``<date>_before`` for the endpoint's date ranges (ISO 8601)
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Sequence
+
+from flask import current_app, jsonify
+from sqlalchemy import and_, inspect, or_
+from sqlalchemy.types import Boolean, Date, DateTime, Integer
+
+from api.models import db
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class Listing:
+    """
+    List query definition for one model.
+
+    Items are built from the selected columns directly, formatted the way
+    the model's ``to_dict`` formats them (datetimes as ISO 8601 strings),
+    so no ORM objects are loaded.
+    """
+
+    def __init__(self, model, filters: Sequence[str] = (), date_ranges: Optional[Dict[str, str]] = None,
+                 sort_keys: Sequence[str] = ('id',), default_sort: str = '-id',
+                 default_fields: Optional[Sequence[str]] = None, hidden: Sequence[str] = (),
+                 masked: Optional[Dict[str, object]] = None):
+        """
+        Initialize the listing.
+
+        Args:
+            model: SQLAlchemy model
+            filters: Fields that can be filtered on by (comma-separated) value
+            date_ranges: Date range parameter prefix -> field, e.g.
+                ``{'created': 'created_at'}`` for ``created_after``/``created_before``
+            sort_keys: Fields that can be sorted on
+            default_sort: Sort used when none is requested
+            default_fields: Fields returned when ``fields`` is not given
+                (all visible fields if None)
+            hidden: Fields that are never returned
+            masked: Fields returned with a fixed value instead of the stored one
+        """
+        self.model = model
+        self.columns = {
+            attr.key: getattr(model, attr.key)
+            for attr in inspect(model).column_attrs
+            if attr.key not in hidden
+        }
+        self.filters = tuple(filters)
+        self.date_ranges = dict(date_ranges or {})
+        self.sort_keys = tuple(sort_keys)
+        self.default_sort = default_sort
+        self.default_fields = tuple(default_fields) if default_fields else tuple(self.columns)
+        self.masked = dict(masked or {})
+
+    def _parse_value(self, field: str, value: str):
+        column_type = self.columns[field].type
+        try:
+            if isinstance(column_type, Boolean):
+                return value.lower() in ('true', '1', 't')
+            if isinstance(column_type, Integer):
+                return int(value)
+            if isinstance(column_type, (DateTime, Date)):
+                return datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"Invalid value for {field}: {value}")
+        return value
+
+    def _fields(self, fields_arg: Optional[str]) -> Sequence[str]:
+        if not fields_arg:
+            return self.default_fields
+        fields = [field.strip() for field in fields_arg.split(',') if field.strip()]
+        unknown = [field for field in fields if field not in self.columns]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        # Items are always identifiable
+        return list(dict.fromkeys(['id', *fields]))
+
+    def _sort(self, sort_arg: Optional[str]):
+        sort = sort_arg or self.default_sort
+        descending = sort.startswith('-')
+        key = sort.lstrip('-')
+        if key not in self.sort_keys:
+            raise ValueError(f"Cannot sort by {key}; use one of: {', '.join(self.sort_keys)}")
+        return key, descending
+
+    def _filter_clauses(self, args) -> list:
+        clauses = []
+        for field in self.filters:
+            value = args.get(field)
+            if value is None or value == '':
+                continue
+            values = [self._parse_value(field, item) for item in value.split(',')]
+            column = self.columns[field]
+            clauses.append(column == values[0] if len(values) == 1 else column.in_(values))
+
+        for prefix, field in self.date_ranges.items():
+            column = self.columns[field]
+            after = args.get(f'{prefix}_after')
+            before = args.get(f'{prefix}_before')
+            if after:
+                clauses.append(column >= self._parse_value(field, after))
+            if before:
+                clauses.append(column < self._parse_value(field, before))
+        return clauses
+
+    def _keyset_clause(self, sort_key: str, descending: bool, cursor: str):
+        """Rows after the cursor position, with NULL sort values last in either direction."""
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            last_value, last_id = position['v'], int(position['id'])
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("Invalid cursor")
+
+        id_column = self.columns['id']
+        id_after = id_column < last_id if descending else id_column > last_id
+        if sort_key == 'id':
+            return id_after
+
+        column = self.columns[sort_key]
+        if last_value is None:
+            return and_(column.is_(None), id_after)
+
+        last_value = self._parse_value(sort_key, last_value) if isinstance(last_value, str) else last_value
+        return or_(
+            column < last_value if descending else column > last_value,
+            and_(column == last_value, id_after),
+            column.is_(None)
+        )
+
+    def _cursor(self, sort_key: str, row) -> str:
+        value = getattr(row, sort_key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        position = {'v': value, 'id': row.id}
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def _serialize(self, row, fields: Iterable[str]) -> Dict:
+        item = {}
+        for field in fields:
+            if field in self.masked:
+                item[field] = self.masked[field]
+                continue
+            value = getattr(row, field)
+            item[field] = value.isoformat() if isinstance(value, datetime) else value
+        return item
+
+    def page(self, args, query=None) -> Dict:
+        """
+        Load one page.
+
+        Args:
+            args: Request query parameters
+            query: Base query to filter further (defaults to all rows of the model)
+
+        Returns:
+            Dict: Response envelope
+
+        Raises:
+            ValueError: If a parameter is invalid
+        """
+        fields = self._fields(args.get('fields'))
+        sort_key, descending = self._sort(args.get('sort'))
+
+        default_limit = current_app.config.get('API_PAGE_SIZE', DEFAULT_PAGE_SIZE)
+        max_limit = current_app.config.get('API_MAX_PAGE_SIZE', MAX_PAGE_SIZE)
+        try:
+            limit = int(args.get('limit', default_limit))
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        limit = max(1, min(limit, max_limit))
+
+        # Select only the requested columns, plus what the cursor needs
+        selected = list(dict.fromkeys([*fields, 'id', sort_key]))
+        if query is None:
+            query = db.session.query(self.model)
+        query = query.with_entities(*[self.columns[field].label(field) for field in selected])
+
+        clauses = self._filter_clauses(args)
+        if args.get('cursor'):
+            clauses.append(self._keyset_clause(sort_key, descending, args['cursor']))
+        if clauses:
+            query = query.filter(*clauses)
+
+        id_column = self.columns['id']
+        if sort_key == 'id':
+            order = [id_column.desc() if descending else id_column.asc()]
+        else:
+            column = self.columns[sort_key]
+            order = [
+                (column.desc() if descending else column.asc()).nullslast(),
+                id_column.desc() if descending else id_column.asc()
+            ]
+
+        rows = query.order_by(*order).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return {
+            'items': [self._serialize(row, fields) for row in rows],
+            'next_cursor': self._cursor(sort_key, rows[-1]) if has_more else None,
+            'limit': limit
+        }
+
+    def respond(self, args, query=None):
+        """
+        Build the JSON response for a list request.
+
+        Args:
+            args: Request query parameters
+            query: Base query to filter further
+
+        Returns:
+            Flask response; 400 with an error message for invalid parameters
+        """
+        try:
+            return jsonify(self.page(args, query))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
@@ -15,3 +15,6 @@ from .test_result import TestResult
 from .report import Report
 from .media import Media
 from .user import User
+from .test_run_count import TestRunStatusCount, TestRunDailyCount
+from .test_metric import TestMetric
+from .campaign import Campaign
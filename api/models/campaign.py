@@ -0,0 +1,38 @@
+"""
+Campaign model: a batch of test runs launched together from a test matrix.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.orm import relationship
+
+from . import db
+
+class Campaign(db.Model):
+    """A test matrix (configurations x environments x devices) launched as one batch of runs."""
+    
+    __tablename__ = 'campaigns'
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    description = Column(Text, nullable=True)
+    run_count = Column(Integer, nullable=False, default=0)  # Test runs launched
+    created_by = Column(String(100), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    test_runs = relationship("TestRun", back_populates="campaign")
+    
+    def __repr__(self):
+        return f"<Campaign(id={self.id}, name='{self.name}', run_count={self.run_count})>"
+    
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'description': self.description,
+            'run_count': self.run_count,
+            'created_by': self.created_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
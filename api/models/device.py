@@ -20,6 +20,7 @@ class Device(db.Model):
     ip_address = Column(String(50), nullable=True)
     credentials = Column(JSON, nullable=True)  # Encrypted credentials
     attributes = Column(JSON, nullable=True)
+    max_concurrent_runs = Column(Integer, nullable=True)  # Scheduler slots (None: SCHEDULER_*_SLOTS)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -44,6 +45,7 @@ class Device(db.Model):
             'ip_address': self.ip_address,
             'credentials': self.credentials,  # Note: Be careful with sensitive data
             'attributes': self.attributes,
+            'max_concurrent_runs': self.max_concurrent_runs,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
@@ -22,6 +22,7 @@ class Environment(db.Model):
     password = Column(String(100), nullable=False)
     is_active = Column(Boolean, default=True)
     attributes = Column(JSON, nullable=True)
+    max_concurrent_runs = Column(Integer, nullable=True)  # Scheduler slots (None: SCHEDULER_*_SLOTS)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     created_by = Column(String(100), nullable=True)
@@ -50,6 +51,7 @@ class Environment(db.Model):
             'password': '********',  # Don't return actual password
             'is_active': self.is_active,
             'attributes': self.attributes,
+            'max_concurrent_runs': self.max_concurrent_runs,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'created_by': self.created_by,
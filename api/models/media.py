@@ -3,7 +3,7 @@ Media model for storing information about media files (videos, screenshots, etc.
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from . import db
@@ -12,6 +12,10 @@ class Media(db.Model):
     """Media model for storing information about media files."""
     
     __tablename__ = 'media'
+    __table_args__ = (
+        Index('ix_media_test_run_id_created_at', 'test_run_id', 'created_at'),
+        Index('ix_media_file_path', 'file_path'),
+    )
     
     id = Column(Integer, primary_key=True)
     test_run_id = Column(Integer, db.ForeignKey('test_runs.id'), nullable=False)
@@ -3,7 +3,7 @@ Report model for storing information about generated reports.
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from . import db
@@ -12,6 +12,10 @@ class Report(db.Model):
     """Report model for storing information about generated reports."""
     
     __tablename__ = 'reports'
+    __table_args__ = (
+        Index('ix_reports_test_run_id_created_at', 'test_run_id', 'created_at'),
+        Index('ix_reports_file_path', 'file_path'),
+    )
     
     id = Column(Integer, primary_key=True)
     test_run_id = Column(Integer, db.ForeignKey('test_runs.id'), nullable=False)
@@ -0,0 +1,47 @@
+"""
+TestMetric model: one typed metric value of a test run.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Float, Index
+from sqlalchemy.orm import relationship
+
+from . import db
+
+class TestMetric(db.Model):
+    """
+    One value extracted from a test result, e.g. metric 'latency', component 'p99'.
+
+    Rows are written by api.test_metrics from TestResult.result_data so that
+    cross-run questions can be filtered and aggregated in SQL.
+    """
+
+    __tablename__ = 'test_metrics'
+    __table_args__ = (
+        # One metric over time, across runs
+        Index('ix_test_metrics_metric_component_timestamp', 'metric', 'component', 'timestamp'),
+        Index('ix_test_metrics_test_run_id', 'test_run_id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    test_run_id = Column(Integer, db.ForeignKey('test_runs.id'), nullable=False)
+    metric = Column(String(50), nullable=False)  # e.g., throughput, latency, strikes, transactions
+    component = Column(String(100), nullable=False)  # e.g., avg, p99, blocked
+    timestamp = Column(DateTime, nullable=False)  # sample time, or the run's end time for run totals
+    value = Column(Float, nullable=False)
+
+    # Relationships
+    test_run = relationship("TestRun")
+
+    def __repr__(self):
+        return f"<TestMetric(test_run_id={self.test_run_id}, metric='{self.metric}', component='{self.component}', value={self.value})>"
+
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            'id': self.id,
+            'test_run_id': self.test_run_id,
+            'metric': self.metric,
+            'component': self.component,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'value': self.value
+        }
@@ -3,7 +3,7 @@ TestResult model for storing test result data.
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from . import db
@@ -12,6 +12,9 @@ class TestResult(db.Model):
     """TestResult model for storing test result data."""
     
     __tablename__ = 'test_results'
+    __table_args__ = (
+        Index('ix_test_results_test_run_id', 'test_run_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     test_run_id = Column(Integer, db.ForeignKey('test_runs.id'), nullable=False)
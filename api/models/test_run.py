@@ -3,7 +3,7 @@ TestRun model for storing test run information.
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 
 from . import db
@@ -12,14 +12,33 @@ class TestRun(db.Model):
     """TestRun model for storing test run information."""
     
     __tablename__ = 'test_runs'
+    __table_args__ = (
+        # Newest-first listings, overall and per status/configuration/environment/device
+        Index('ix_test_runs_created_at', 'created_at'),
+        Index('ix_test_runs_status_created_at', 'status', 'created_at'),
+        Index('ix_test_runs_test_config_id_created_at', 'test_config_id', 'created_at'),
+        Index('ix_test_runs_environment_id_created_at', 'environment_id', 'created_at'),
+        Index('ix_test_runs_device_id_created_at', 'device_id', 'created_at'),
+        # The status poller's running runs (a small fraction of all runs)
+        Index('ix_test_runs_running', 'id',
+              postgresql_where=text("status = 'running'"), sqlite_where=text("status = 'running'")),
+        # Progress of a campaign: its runs per status
+        Index('ix_test_runs_campaign_id_status', 'campaign_id', 'status'),
+        # The scheduler's queue, in dispatch order
+        Index('ix_test_runs_scheduled', 'priority', 'created_at',
+              postgresql_where=text("status = 'scheduled'"), sqlite_where=text("status = 'scheduled'")),
+    )
     
     id = Column(Integer, primary_key=True)
     test_config_id = Column(Integer, db.ForeignKey('test_configurations.id'), nullable=False)
     environment_id = Column(Integer, db.ForeignKey('environments.id'), nullable=False)
     device_id = Column(Integer, db.ForeignKey('devices.id'), nullable=False)
-    bp_test_id = Column(String(50), nullable=False)  # Breaking Point test ID
-    bp_run_id = Column(String(50), nullable=False)   # Breaking Point run ID
-    status = Column(String(20), nullable=False)  # e.g., pending, running, completed, failed
+    campaign_id = Column(Integer, db.ForeignKey('campaigns.id'), nullable=True)
+    bp_test_id = Column(String(50), nullable=True)  # Breaking Point test ID (set when started)
+    bp_run_id = Column(String(50), nullable=True)   # Breaking Point run ID (set when started)
+    status = Column(String(20), nullable=False)  # e.g., scheduled, starting, running, completed, failed
+    priority = Column(Integer, nullable=False, default=0)  # Scheduled runs: higher starts first
+    scheduled_at = Column(DateTime, nullable=True)  # Scheduled runs: earliest start (UTC)
     start_time = Column(DateTime, nullable=True)
     end_time = Column(DateTime, nullable=True)
     duration = Column(Integer, nullable=True)  # in seconds
@@ -31,6 +50,7 @@ class TestRun(db.Model):
     test_configuration = relationship("TestConfiguration", back_populates="test_runs")
     environment = relationship("Environment", back_populates="test_runs")
     device = relationship("Device", back_populates="test_runs")
+    campaign = relationship("Campaign", back_populates="test_runs")
     test_result = relationship("TestResult", back_populates="test_run", uselist=False)
     reports = relationship("Report", back_populates="test_run")
     media = relationship("Media", back_populates="test_run")
@@ -38,28 +58,47 @@ class TestRun(db.Model):
     def __repr__(self):
         return f"<TestRun(id={self.id}, bp_test_id='{self.bp_test_id}', bp_run_id='{self.bp_run_id}', status='{self.status}')>"
     
-    def to_dict(self):
-        """Convert to dictionary."""
-        return {
+    # Related objects to_dict can embed
+    INCLUDABLE = ('test_configuration', 'environment', 'device')
+    
+    def to_dict(self, include=()):
+        """
+        Convert to dictionary.
+        
+        Args:
+            include: Related objects to embed (any of INCLUDABLE); load them
+                eagerly (see api.queries) when converting many runs
+        
+        Raises:
+            ValueError: If an unknown relationship is requested
+        """
+        unknown = set(include) - set(self.INCLUDABLE)
+        if unknown:
+            raise ValueError(f"Cannot include: {', '.join(sorted(unknown))}")
+        
+        data = {
             'id': self.id,
             'test_config_id': self.test_config_id,
             'environment_id': self.environment_id, 
             'device_id': self.device_id,
+            'campaign_id': self.campaign_id,
             'bp_test_id': self.bp_test_id,
             'bp_run_id': self.bp_run_id,
             'status': self.status,
+            'priority': self.priority,
+            'scheduled_at': self.scheduled_at.isoformat() if self.scheduled_at else None,
             'start_time': self.start_time.isoformat() if self.start_time else None,
             'end_time': self.end_time.isoformat() if self.end_time else None,
             'duration': self.duration,
             'created_by': self.created_by,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            # Only include relationships if explicitly requested to reduce data size
-            # To prevent redundancy and circular references
-            **({'test_configuration': self.test_configuration.to_dict()} 
-               if hasattr(self, '_include_test_configuration') and self.test_configuration else {}),
-            **({'environment': self.environment.to_dict()} 
-               if hasattr(self, '_include_environment') and self.environment else {}),
-            **({'device': self.device.to_dict()} 
-               if hasattr(self, '_include_device') and self.device else {})
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+        
+        # Relationships are only included on request, to keep responses small
+        # and avoid circular references
+        for name in include:
+            related = getattr(self, name)
+            data[name] = related.to_dict() if related else None
+        
+        return data
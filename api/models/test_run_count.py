@@ -0,0 +1,51 @@
+"""
+Summary tables of test run counts, read by the dashboard.
+
+Both are maintained incrementally as test runs are written (see
+api.dashboard_stats), so the dashboard reads a few rows instead of
+aggregating every test run.
+"""
+
+from sqlalchemy import Column, Integer, String, Date
+
+from . import db
+
+class TestRunStatusCount(db.Model):
+    """Number of test runs on a device that are currently in a status."""
+
+    __tablename__ = 'test_run_status_counts'
+
+    # Rows go with their device, so they never keep a device from being deleted
+    device_id = Column(Integer, db.ForeignKey('devices.id', ondelete='CASCADE'), primary_key=True)
+    status = Column(String(20), primary_key=True)
+    run_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TestRunStatusCount(device_id={self.device_id}, status='{self.status}', run_count={self.run_count})>"
+
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            'device_id': self.device_id,
+            'status': self.status,
+            'run_count': self.run_count
+        }
+
+
+class TestRunDailyCount(db.Model):
+    """Number of test runs created on a (UTC) day."""
+
+    __tablename__ = 'test_run_daily_counts'
+
+    day = Column(Date, primary_key=True)
+    run_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TestRunDailyCount(day={self.day}, run_count={self.run_count})>"
+
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            'day': self.day.isoformat() if self.day else None,
+            'run_count': self.run_count
+        }
@@ -0,0 +1,201 @@
+"""
+Reconciliation of stored files against the reports and media that use them.
+
+A file is orphaned when no ``Report`` or ``Media`` row has its path. The
+reconciler streams the storage listing in path order and, a batch at a time,
+asks the database which of the batch's paths are referenced::
+
+    SELECT file_path FROM reports WHERE file_path IN (<batch>)   -- indexed
+    SELECT file_path FROM media WHERE file_path IN (<batch>)
+
+so each stored file costs one index lookup and memory stays bounded by the
+batch size, however many files and rows there are. Orphans are deleted with
+the backend's bulk delete (S3 ``DeleteObjects``).
+
+Files modified less than ``min_age`` seconds ago are never deleted: they may
+belong to an upload whose row is not committed yet. After each batch the
+last path is written to a checkpoint file, so an interrupted run resumes
+after it instead of listing the whole store again.
+"""
+
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from flask import current_app
+from sqlalchemy import select
+
+from api.models import db
+from api.models.media import Media
+from api.models.report import Report
+from storage import FileInfo, StorageInterface
+
+# Listed files reconciled (looked up and deleted) at a time
+DEFAULT_BATCH_SIZE = 1000
+
+# Files younger than this (seconds) are left alone
+DEFAULT_MIN_AGE = 24 * 3600
+
+# Models whose rows reference stored files through file_path
+FILE_MODELS = (Report, Media)
+
+
+def referenced_paths(file_paths: List[str]) -> Set[str]:
+    """
+    Return the paths of ``file_paths`` that a report or media row references.
+
+    Rows may store a path with a leading ``/``; backends strip it, so both
+    spellings count.
+
+    Args:
+        file_paths: Storage paths
+
+    Returns:
+        Set[str]: The referenced paths, as given
+    """
+    if not file_paths:
+        return set()
+    candidates = list(file_paths) + ['/' + file_path for file_path in file_paths]
+
+    referenced = set()
+    for model in FILE_MODELS:
+        query = select(model.file_path).where(model.file_path.in_(candidates))
+        referenced.update(path.lstrip('/') for path in db.session.execute(query).scalars())
+    return {file_path for file_path in file_paths if file_path.lstrip('/') in referenced}
+
+
+def read_checkpoint(checkpoint: str, prefix: str) -> Optional[str]:
+    """
+    Read the last reconciled path of an interrupted run over ``prefix``.
+
+    Args:
+        checkpoint: Path of the checkpoint file
+        prefix: Storage directory being reconciled
+
+    Returns:
+        Optional[str]: The path to resume after, or None to start over
+    """
+    try:
+        with open(checkpoint) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('prefix') != prefix:
+        return None
+    return state.get('after')
+
+
+def write_checkpoint(checkpoint: str, prefix: str, after: str) -> None:
+    """
+    Record ``after`` as the last reconciled path of a run over ``prefix``.
+
+    The file is replaced atomically, so a crash leaves the previous checkpoint.
+
+    Args:
+        checkpoint: Path of the checkpoint file
+        prefix: Storage directory being reconciled
+        after: Last path reconciled
+    """
+    directory = os.path.dirname(os.path.abspath(checkpoint))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'prefix': prefix, 'after': after, 'updated_at': datetime.utcnow().isoformat()}, f)
+        os.replace(temp_path, checkpoint)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def clear_checkpoint(checkpoint: str) -> None:
+    """Remove the checkpoint file of a finished run."""
+    try:
+        os.remove(checkpoint)
+    except FileNotFoundError:
+        pass
+
+
+def reconcile_orphaned_files(storage: Optional[StorageInterface] = None, prefix: str = '',
+                             min_age: float = DEFAULT_MIN_AGE, dry_run: bool = False,
+                             batch_size: int = DEFAULT_BATCH_SIZE, checkpoint: Optional[str] = None,
+                             restart: bool = False, progress=None) -> Dict:
+    """
+    Find and delete stored files that no report or media row references.
+
+    Args:
+        storage: Storage backend (defaults to the app's)
+        prefix: Only reconcile files under this directory
+        min_age: Seconds since a file's last modification before it may be
+            deleted; files whose age the backend does not know are kept
+        dry_run: Only report orphans, deleting nothing and leaving the
+            checkpoint alone
+        batch_size: Files looked up and deleted at a time
+        checkpoint: Path of the checkpoint file (None for no checkpoint)
+        restart: Ignore an existing checkpoint and scan from the start
+        progress: Optional callback ``(stats, orphans)`` called after each
+            batch with the running totals and the batch's orphaned paths
+
+    Returns:
+        Dict: Totals: ``scanned``, ``recent`` (too young to delete),
+        ``referenced``, ``orphaned``, ``deleted`` and ``failed`` files, and
+        ``resumed_after`` (the checkpointed path the scan started after, if any)
+    """
+    storage = storage or current_app.storage
+    start_after = None
+    if checkpoint and not restart:
+        start_after = read_checkpoint(checkpoint, prefix)
+
+    stats = {
+        'scanned': 0,
+        'recent': 0,
+        'referenced': 0,
+        'orphaned': 0,
+        'deleted': 0,
+        'failed': 0,
+        'resumed_after': start_after,
+        'dry_run': dry_run
+    }
+    cutoff = time.time() - min_age
+
+    def reconcile(batch: List[FileInfo]):
+        old = [info.file_path for info in batch if info.modified is not None and info.modified <= cutoff]
+        referenced = referenced_paths(old)
+        orphans = [file_path for file_path in old if file_path not in referenced]
+        # Close the read transaction before the (slow) deletes
+        db.session.rollback()
+
+        stats['scanned'] += len(batch)
+        stats['recent'] += len(batch) - len(old)
+        stats['referenced'] += len(referenced)
+        stats['orphaned'] += len(orphans)
+
+        if orphans and not dry_run:
+            failed = storage.delete_files(orphans)
+            for file_path in failed:
+                current_app.logger.error(f"Failed to delete orphaned file: {file_path}")
+            stats['failed'] += len(failed)
+            stats['deleted'] += len(orphans) - len(failed)
+        if checkpoint and not dry_run:
+            write_checkpoint(checkpoint, prefix, batch[-1].file_path)
+        if progress:
+            progress(stats, orphans)
+
+    batch = []
+    for info in storage.iter_files(prefix, start_after=start_after):
+        batch.append(info)
+        if len(batch) >= batch_size:
+            reconcile(batch)
+            batch = []
+    if batch:
+        reconcile(batch)
+
+    if checkpoint and not dry_run:
+        clear_checkpoint(checkpoint)
+    return stats
@@ -0,0 +1,70 @@
+"""
+Queries with the related objects each view needs loaded up front.
+
+Relationships are lazy by default, so a page listing N objects that shows a
+related object per row issues N extra queries. These helpers load what the
+view uses in a fixed number of queries instead: many-to-one relationships
+are joined into the main query (``joinedload``) and collections are loaded
+with one extra ``IN`` query per relationship (``selectinload``).
+"""
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from api.models.media import Media
+from api.models.report import Report
+from api.models.test_run import TestRun
+
+# Loader options per relationship that can be embedded in TestRun.to_dict
+TEST_RUN_INCLUDES = {
+    'test_configuration': joinedload(TestRun.test_configuration),
+    'environment': joinedload(TestRun.environment),
+    'device': joinedload(TestRun.device),
+}
+
+
+def test_runs_with(include=(), query=None):
+    """
+    Test runs with the given relationships loaded.
+
+    Args:
+        include: Relationship names (see TestRun.INCLUDABLE)
+        query: Query to add the options to (defaults to all test runs)
+
+    Returns:
+        Query: The query with eager loading options
+
+    Raises:
+        ValueError: If an unknown relationship is requested
+    """
+    unknown = set(include) - set(TEST_RUN_INCLUDES)
+    if unknown:
+        raise ValueError(f"Cannot include: {', '.join(sorted(unknown))}")
+    query = query if query is not None else TestRun.query
+    return query.options(*[TEST_RUN_INCLUDES[name] for name in include])
+
+
+def test_runs_with_details(query=None):
+    """Test runs with their configuration, environment and device (test run lists)."""
+    return test_runs_with(TEST_RUN_INCLUDES, query)
+
+
+def test_run_detail_query():
+    """A test run with everything its detail page shows."""
+    return test_runs_with_details().options(
+        selectinload(TestRun.reports),
+        selectinload(TestRun.media)
+    )
+
+
+def reports_with_test_run():
+    """Reports with their test run and its configuration (report lists)."""
+    return Report.query.options(
+        joinedload(Report.test_run).joinedload(TestRun.test_configuration)
+    )
+
+
+def media_with_test_run():
+    """Media with their test run and its configuration (media lists)."""
+    return Media.query.options(
+        joinedload(Media.test_run).joinedload(TestRun.test_configuration)
+    )
@@ -0,0 +1,54 @@
+"""
+Per-request SQL statement counting, to catch N+1 query regressions.
+
+With ``SQL_QUERY_LIMIT`` set (the testing configuration sets it), every
+response carries an ``X-SQL-Queries`` header and a request that issues more
+statements than the limit fails with :class:`QueryLimitExceeded`, which the
+test client propagates.
+"""
+
+import logging
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from api.models import db
+
+logger = logging.getLogger(__name__)
+
+
+class QueryLimitExceeded(AssertionError):
+    """A request issued more SQL statements than SQL_QUERY_LIMIT allows."""
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.sql_queries = g.get('sql_queries', 0) + 1
+
+
+def init_query_guard(app) -> None:
+    """
+    Count SQL statements per request if SQL_QUERY_LIMIT is set.
+
+    Args:
+        app: Flask application (after ``db.init_app``)
+    """
+    limit = int(app.config.get('SQL_QUERY_LIMIT') or 0)
+    if not limit:
+        return
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if not event.contains(engine, 'before_cursor_execute', _count_statement):
+                event.listen(engine, 'before_cursor_execute', _count_statement)
+
+    @app.after_request
+    def check_query_count(response):
+        count = g.get('sql_queries', 0)
+        response.headers['X-SQL-Queries'] = str(count)
+        if count > limit:
+            message = f"{request.method} {request.path} issued {count} SQL statements (limit {limit})"
+            if app.testing:
+                raise QueryLimitExceeded(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,57 @@
+"""
+Analytics API routes.
+"""
+
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+
+from api.models.device import Device
+from api.models.test_configuration import TestConfiguration
+from api.analytics import (
+    DEFAULT_BASELINE, DEFAULT_MOVING_AVERAGE, DEFAULT_RUNS, DEFAULT_THRESHOLD, run_trends
+)
+
+analytics_blueprint = Blueprint('analytics', __name__)
+
+
+@analytics_blueprint.route('/trends', methods=['GET'])
+@jwt_required()
+def get_trends():
+    """
+    Trends and regressions of a test configuration's runs on a device.
+
+    Query parameters: test_config_id and device_id (required), runs (most
+    recent completed runs, default 100, at most 10000), series
+    (comma-separated metric.component names, e.g. latency.p99),
+    moving_average (runs), baseline (runs) and threshold (z-score).
+    """
+    try:
+        test_config_id = int(request.args['test_config_id'])
+        device_id = int(request.args['device_id'])
+        runs = int(request.args.get('runs', DEFAULT_RUNS))
+        moving_average = int(request.args.get('moving_average', DEFAULT_MOVING_AVERAGE))
+        baseline = int(request.args.get('baseline', DEFAULT_BASELINE))
+        threshold = float(request.args.get('threshold', DEFAULT_THRESHOLD))
+    except KeyError as e:
+        return jsonify({'error': f"{e.args[0]} is required"}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    TestConfiguration.query.get_or_404(test_config_id)
+    Device.query.get_or_404(device_id)
+
+    series = [name for name in request.args.get('series', '').split(',') if name]
+    try:
+        result = run_trends(
+            test_config_id,
+            device_id,
+            runs=runs,
+            series=series,
+            moving_average=moving_average,
+            baseline=baseline,
+            threshold=threshold
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify(result)
@@ -8,11 +8,13 @@ from flask_jwt_extended import (
     create_refresh_token,
     jwt_required,
     get_jwt_identity,
-    get_jwt
+    get_jwt,
+    current_user
 )
 
 from api.models import db
 from api.models.user import User
+from api.user_cache import invalidate_user
 
 auth_blueprint = Blueprint('auth', __name__)
 
@@ -80,8 +82,8 @@ def logout():
 @jwt_required()
 def get_current_user():
     """Get current user info."""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    # Resolved by the JWT user loader through the user cache
+    user = current_user
     
     if not user:
         return jsonify({'error': 'User not found'}), 404
@@ -117,6 +119,7 @@ def change_password():
     
     try:
         db.session.commit()
+        invalidate_user(user.id)
         return jsonify({'message': 'Password changed successfully'})
     except Exception as e:
         db.session.rollback()
@@ -0,0 +1,82 @@
+"""
+Campaign API routes.
+"""
+
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from api.models.campaign import Campaign
+from api.listing import Listing
+from api.campaigns import launch_campaign, campaign_progress
+
+campaign_blueprint = Blueprint('campaign', __name__)
+
+
+campaign_listing = Listing(
+    Campaign,
+    filters=('created_by',),
+    date_ranges={'created': 'created_at'},
+    sort_keys=('id', 'created_at', 'name')
+)
+
+
+@campaign_blueprint.route('', methods=['GET'])
+@jwt_required()
+def get_campaigns():
+    """List campaigns (paginated, see api.listing)."""
+    return campaign_listing.respond(request.args)
+
+
+@campaign_blueprint.route('/<int:id>', methods=['GET'])
+@jwt_required()
+def get_campaign(id):
+    """Get a campaign with the progress of its test runs."""
+    result = campaign_progress(id)
+    if result is None:
+        return jsonify({'error': 'Campaign not found'}), 404
+    return jsonify(result)
+
+
+@campaign_blueprint.route('', methods=['POST'])
+@jwt_required()
+def create_campaign():
+    """
+    Launch a campaign: queue a test run for every combination of
+    ``test_config_ids``, ``environment_ids`` and ``device_ids``.
+    
+    ``priority`` and ``scheduled_at`` (ISO 8601, UTC) apply to every run.
+    The runs are started by the scheduler (202).
+    """
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    required_fields = ['name', 'test_config_ids', 'environment_ids', 'device_ids']
+    for field in required_fields:
+        if field not in data:
+            return jsonify({'error': f'{field} is required'}), 400
+    
+    try:
+        priority = int(data.get('priority') or 0)
+        scheduled_at = datetime.fromisoformat(data['scheduled_at']) if data.get('scheduled_at') else None
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        campaign = launch_campaign(
+            name=data['name'],
+            description=data.get('description'),
+            test_config_ids=data['test_config_ids'],
+            environment_ids=data['environment_ids'],
+            device_ids=data['device_ids'],
+            created_by=get_jwt_identity(),
+            priority=priority,
+            scheduled_at=scheduled_at
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(campaign.to_dict()), 202
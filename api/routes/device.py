@@ -8,16 +8,24 @@ from sqlalchemy.exc import IntegrityError
 
 from api.models import db
 from api.models.device import Device
+from api.listing import Listing
 
 device_blueprint = Blueprint('device', __name__)
 
 
+device_listing = Listing(
+    Device,
+    filters=('type',),
+    date_ranges={'created': 'created_at', 'updated': 'updated_at'},
+    sort_keys=('id', 'created_at', 'updated_at', 'name', 'type')
+)
+
+
 @device_blueprint.route('', methods=['GET'])
 @jwt_required()
 def get_devices():
-    """Get all devices."""
-    devices = Device.query.all()
-    return jsonify([device.to_dict() for device in devices])
+    """List devices (paginated, see api.listing)."""
+    return device_listing.respond(request.args)
 
 
 @device_blueprint.route('/<int:id>', methods=['GET'])
@@ -48,7 +56,8 @@ def create_device():
         type=data['type'],
         ip_address=data.get('ip_address'),
         credentials=data.get('credentials'),
-        attributes=data.get('attributes')
+        attributes=data.get('attributes'),
+        max_concurrent_runs=data.get('max_concurrent_runs')
     )
     
     try:
@@ -91,6 +100,9 @@ def update_device(id):
     if 'attributes' in data:
         device.attributes = data['attributes']
     
+    if 'max_concurrent_runs' in data:
+        device.max_concurrent_runs = data['max_concurrent_runs']
+    
     try:
         db.session.commit()
         return jsonify(device.to_dict())
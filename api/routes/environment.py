@@ -8,16 +8,25 @@ from sqlalchemy.exc import IntegrityError
 
 from api.models import db
 from api.models.environment import Environment
+from api.listing import Listing
 
 environment_blueprint = Blueprint('environment', __name__)
 
 
+environment_listing = Listing(
+    Environment,
+    filters=('is_active', 'created_by'),
+    date_ranges={'created': 'created_at', 'updated': 'updated_at'},
+    sort_keys=('id', 'created_at', 'updated_at', 'name'),
+    masked={'password': '********'}  # Don't return actual password
+)
+
+
 @environment_blueprint.route('', methods=['GET'])
 @jwt_required()
 def get_environments():
-    """Get all environments."""
-    environments = Environment.query.all()
-    return jsonify([env.to_dict() for env in environments])
+    """List environments (paginated, see api.listing)."""
+    return environment_listing.respond(request.args)
 
 
 @environment_blueprint.route('/<int:id>', methods=['GET'])
@@ -49,6 +58,7 @@ def create_environment():
         password=data.get('password'),
         is_active=data.get('is_active', True),
         attributes=data.get('attributes'),
+        max_concurrent_runs=data.get('max_concurrent_runs'),
         created_by=data.get('created_by')
     )
     
@@ -97,6 +107,9 @@ def update_environment(id):
     
     if 'attributes' in data:
         environment.attributes = data['attributes']
+    
+    if 'max_concurrent_runs' in data:
+        environment.max_concurrent_runs = data['max_concurrent_runs']
         
     if 'updated_by' in data:
         environment.updated_by = data['updated_by']
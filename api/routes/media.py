@@ -2,25 +2,42 @@
 Media API routes.
 """
 
-from flask import Blueprint, jsonify, request, current_app, send_file
+from flask import Blueprint, jsonify, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import os
-import tempfile
-import magic
 
 from api.models import db
 from api.models.test_run import TestRun
 from api.models.media import Media
+from api.listing import Listing
+from api.controllers.upload_controller import UploadController
+from storage.transfer import SNIFF_SIZE, detect_content_type
 
 media_blueprint = Blueprint('media', __name__)
 
 
+def _media_type(content_type):
+    """Classify a MIME type as image, video or other."""
+    if content_type.startswith('image/'):
+        return 'image'
+    elif content_type.startswith('video/'):
+        return 'video'
+    return 'other'
+
+
+media_listing = Listing(
+    Media,
+    filters=('test_run_id', 'media_type', 'content_type', 'created_by'),
+    date_ranges={'created': 'created_at'},
+    sort_keys=('id', 'created_at', 'name')
+)
+
+
 @media_blueprint.route('', methods=['GET'])
 @jwt_required()
 def get_media_files():
-    """Get all media files."""
-    media_files = Media.query.all()
-    return jsonify([media.to_dict() for media in media_files])
+    """List media files (paginated, see api.listing)."""
+    return media_listing.respond(request.args)
 
 
 @media_blueprint.route('/<int:id>', methods=['GET'])
@@ -62,14 +79,10 @@ def upload_media():
     # Detect media type
     content_type = file.content_type
     if not content_type:
-        content_type = magic.from_buffer(file.read(1024), mime=True)
+        content_type = detect_content_type(file.read(SNIFF_SIZE), filename)
         file.seek(0)  # Reset file pointer
     
-    media_type = 'other'
-    if content_type.startswith('image/'):
-        media_type = 'image'
-    elif content_type.startswith('video/'):
-        media_type = 'video'
+    media_type = _media_type(content_type)
     
     # Save the file
     storage = current_app.storage
@@ -77,7 +90,7 @@ def upload_media():
     
     try:
         # Save the file to storage
-        stored_path = storage.save_file(file, file_path)
+        stored_path = storage.save_file(file, file_path, content_type=content_type)
         
         # Create the media record
         media = Media(
@@ -98,6 +111,136 @@ def upload_media():
         return jsonify({'error': str(e)}), 500
 
 
+@media_blueprint.route('/uploads', methods=['POST'])
+@jwt_required()
+def start_media_upload():
+    """Get presigned URLs for uploading a media file directly to storage."""
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    if 'test_run_id' not in data:
+        return jsonify({'error': 'test_run_id is required'}), 400
+    
+    # Get the test run
+    test_run = TestRun.query.get_or_404(data['test_run_id'])
+    
+    try:
+        upload = UploadController(current_app.storage).start_upload(
+            prefix=f"media/{test_run.id}/",
+            filename=data.get('filename'),
+            content_type=data.get('content_type'),
+            size=data.get('size')
+        )
+        return jsonify(upload), 201
+    except (ValueError, NotImplementedError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@media_blueprint.route('/uploads/complete', methods=['POST'])
+@jwt_required()
+def complete_media_upload():
+    """Finish a direct media upload and create the media record."""
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    for field in ['test_run_id', 'file_path']:
+        if field not in data:
+            return jsonify({'error': f'{field} is required'}), 400
+    
+    # Get the test run
+    test_run = TestRun.query.get_or_404(data['test_run_id'])
+    
+    # Get current user
+    user = get_jwt_identity()
+    
+    try:
+        info = UploadController(current_app.storage).complete_upload(
+            prefix=f"media/{test_run.id}/",
+            file_path=data['file_path'],
+            upload_id=data.get('upload_id')
+        )
+        
+        content_type = info['content_type']
+        
+        # Create the media record
+        media = Media(
+            test_run_id=test_run.id,
+            name=data.get('name', os.path.basename(info['file_path'])),
+            description=data.get('description', ''),
+            media_type=_media_type(content_type),
+            content_type=content_type,
+            file_path=info['file_path'],
+            created_by=user
+        )
+        
+        db.session.add(media)
+        db.session.commit()
+        
+        return jsonify(media.to_dict()), 201
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    except (ValueError, NotImplementedError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@media_blueprint.route('/uploads/abort', methods=['POST'])
+@jwt_required()
+def abort_media_upload():
+    """Abandon a multipart direct media upload."""
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    for field in ['test_run_id', 'file_path', 'upload_id']:
+        if field not in data:
+            return jsonify({'error': f'{field} is required'}), 400
+    
+    # Get the test run
+    test_run = TestRun.query.get_or_404(data['test_run_id'])
+    
+    try:
+        UploadController(current_app.storage).abort_upload(
+            prefix=f"media/{test_run.id}/",
+            file_path=data['file_path'],
+            upload_id=data['upload_id']
+        )
+        return jsonify({'message': 'Upload aborted'})
+    except (ValueError, NotImplementedError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@media_blueprint.route('/<int:id>/download-url', methods=['GET'])
+@jwt_required()
+def get_media_download_url(id):
+    """Get a presigned URL for downloading a media file directly from storage."""
+    media = Media.query.get_or_404(id)
+    
+    storage = current_app.storage
+    url = storage.download_url(
+        media.file_path,
+        download_name=os.path.basename(media.file_path),
+        as_attachment=request.args.get('inline') is None,
+        mimetype=media.content_type
+    )
+    
+    if url is None:
+        return jsonify({'error': 'Direct downloads require S3 storage'}), 400
+    
+    return jsonify({'url': url, 'expires_in': storage.presign_expires})
+
+
 @media_blueprint.route('/<int:id>/download', methods=['GET'])
 @jwt_required()
 def download_media(id):
@@ -105,28 +248,18 @@ def download_media(id):
     media = Media.query.get_or_404(id)
     
     try:
-        # Get the file from storage
+        # Stream the file straight from storage
         storage = current_app.storage
-        file_data, content_type = storage.get_file(media.file_path)
-        
-        # Create a temporary file for download
-        temp_file = tempfile.NamedTemporaryFile(delete=False)
-        temp_file.write(file_data.read())
-        temp_file.close()
-        
-        # Return the file for download
-        return send_file(
-            temp_file.name,
-            mimetype=content_type,
+        return storage.send(
+            media.file_path,
+            download_name=os.path.basename(media.file_path),
             as_attachment=True,
-            download_name=os.path.basename(media.file_path)
+            mimetype=media.content_type
         )
+    except FileNotFoundError:
+        return jsonify({'error': 'Media file not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        # Clean up the temporary file
-        if 'temp_file' in locals():
-            os.unlink(temp_file.name)
 
 
 @media_blueprint.route('/<int:id>', methods=['DELETE'])
@@ -2,25 +2,33 @@
 Report API routes.
 """
 
-from flask import Blueprint, jsonify, request, current_app, send_file
+from flask import Blueprint, jsonify, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import os
-import tempfile
 
 from api.models import db
 from api.models.test_run import TestRun
 from api.models.report import Report
+from api.listing import Listing
 from api.controllers.bp_agent import BPAgentController
+from api.controllers.upload_controller import UploadController
 
 report_blueprint = Blueprint('report', __name__)
 
 
+report_listing = Listing(
+    Report,
+    filters=('test_run_id', 'report_type', 'file_format', 'created_by'),
+    date_ranges={'created': 'created_at'},
+    sort_keys=('id', 'created_at', 'name')
+)
+
+
 @report_blueprint.route('', methods=['GET'])
 @jwt_required()
 def get_reports():
-    """Get all reports."""
-    reports = Report.query.all()
-    return jsonify([report.to_dict() for report in reports])
+    """List reports (paginated, see api.listing)."""
+    return report_listing.respond(request.args)
 
 
 @report_blueprint.route('/<int:id>', methods=['GET'])
@@ -81,6 +89,134 @@ def create_report():
         return jsonify({'error': str(e)}), 500
 
 
+@report_blueprint.route('/uploads', methods=['POST'])
+@jwt_required()
+def start_report_upload():
+    """Get presigned URLs for uploading a report file directly to storage."""
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    if 'test_run_id' not in data:
+        return jsonify({'error': 'test_run_id is required'}), 400
+    
+    # Get the test run
+    test_run = TestRun.query.get_or_404(data['test_run_id'])
+    
+    try:
+        upload = UploadController(current_app.storage).start_upload(
+            prefix=f"reports/{test_run.id}/",
+            filename=data.get('filename'),
+            content_type=data.get('content_type'),
+            size=data.get('size')
+        )
+        return jsonify(upload), 201
+    except (ValueError, NotImplementedError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@report_blueprint.route('/uploads/complete', methods=['POST'])
+@jwt_required()
+def complete_report_upload():
+    """Finish a direct report upload and create the report record."""
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    required_fields = ['test_run_id', 'file_path', 'report_type', 'file_format']
+    for field in required_fields:
+        if field not in data:
+            return jsonify({'error': f'{field} is required'}), 400
+    
+    # Get the test run
+    test_run = TestRun.query.get_or_404(data['test_run_id'])
+    
+    # Get current user
+    user = get_jwt_identity()
+    
+    try:
+        info = UploadController(current_app.storage).complete_upload(
+            prefix=f"reports/{test_run.id}/",
+            file_path=data['file_path'],
+            upload_id=data.get('upload_id')
+        )
+        
+        # Create the report record
+        report = Report(
+            test_run_id=test_run.id,
+            name=data.get('name', f"{test_run.test_configuration.name} - {data['report_type']} Report"),
+            description=data.get('description'),
+            report_type=data['report_type'],
+            file_format=data['file_format'],
+            file_path=info['file_path'],
+            created_by=user
+        )
+        
+        db.session.add(report)
+        db.session.commit()
+        
+        return jsonify(report.to_dict()), 201
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    except (ValueError, NotImplementedError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+@report_blueprint.route('/uploads/abort', methods=['POST'])
+@jwt_required()
+def abort_report_upload():
+    """Abandon a multipart direct report upload."""
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    for field in ['test_run_id', 'file_path', 'upload_id']:
+        if field not in data:
+            return jsonify({'error': f'{field} is required'}), 400
+    
+    # Get the test run
+    test_run = TestRun.query.get_or_404(data['test_run_id'])
+    
+    try:
+        UploadController(current_app.storage).abort_upload(
+            prefix=f"reports/{test_run.id}/",
+            file_path=data['file_path'],
+            upload_id=data['upload_id']
+        )
+        return jsonify({'message': 'Upload aborted'})
+    except (ValueError, NotImplementedError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@report_blueprint.route('/<int:id>/download-url', methods=['GET'])
+@jwt_required()
+def get_report_download_url(id):
+    """Get a presigned URL for downloading a report directly from storage."""
+    report = Report.query.get_or_404(id)
+    
+    storage = current_app.storage
+    url = storage.download_url(
+        report.file_path,
+        download_name=os.path.basename(report.file_path),
+        as_attachment=True
+    )
+    
+    if url is None:
+        return jsonify({'error': 'Direct downloads require S3 storage'}), 400
+    
+    return jsonify({'url': url, 'expires_in': storage.presign_expires})
+
+
 @report_blueprint.route('/<int:id>/download', methods=['GET'])
 @jwt_required()
 def download_report(id):
@@ -88,28 +224,17 @@ def download_report(id):
     report = Report.query.get_or_404(id)
     
     try:
-        # Get the file from storage
+        # Stream the file straight from storage
         storage = current_app.storage
-        file_data, content_type = storage.get_file(report.file_path)
-        
-        # Create a temporary file for download
-        temp_file = tempfile.NamedTemporaryFile(delete=False)
-        temp_file.write(file_data.read())
-        temp_file.close()
-        
-        # Return the file for download
-        return send_file(
-            temp_file.name,
-            mimetype=content_type,
-            as_attachment=True,
-            download_name=os.path.basename(report.file_path)
+        return storage.send(
+            report.file_path,
+            download_name=os.path.basename(report.file_path),
+            as_attachment=True
         )
+    except FileNotFoundError:
+        return jsonify({'error': 'Report file not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
-    finally:
-        # Clean up the temporary file
-        if 'temp_file' in locals():
-            os.unlink(temp_file.name)
 
 
 @report_blueprint.route('/<int:id>', methods=['DELETE'])
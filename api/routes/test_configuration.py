@@ -2,23 +2,39 @@
 Test Configuration API routes.
 """
 
+from datetime import datetime
+
 from flask import Blueprint, jsonify, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy.exc import IntegrityError
 
 from api.models import db
+from api.models.device import Device
+from api.models.environment import Environment
 from api.models.test_configuration import TestConfiguration
+from api.listing import Listing
 from api.controllers.bp_agent import BPAgentController
+from api.controllers.run_scheduler import schedule_test_run
 
 test_configuration_blueprint = Blueprint('test_configuration', __name__)
 
 
+test_configuration_listing = Listing(
+    TestConfiguration,
+    filters=('test_type', 'created_by'),
+    date_ranges={'created': 'created_at', 'updated': 'updated_at'},
+    sort_keys=('id', 'created_at', 'updated_at', 'name'),
+    # config_data can be large: list it only when asked for with fields=
+    default_fields=('id', 'name', 'description', 'test_type', 'bp_test_id',
+                    'created_by', 'created_at', 'updated_at')
+)
+
+
 @test_configuration_blueprint.route('', methods=['GET'])
 @jwt_required()
 def get_test_configurations():
-    """Get all test configurations."""
-    test_configs = TestConfiguration.query.all()
-    return jsonify([config.to_dict() for config in test_configs])
+    """List test configurations (paginated, see api.listing)."""
+    return test_configuration_listing.respond(request.args)
 
 
 @test_configuration_blueprint.route('/<int:id>', methods=['GET'])
@@ -114,7 +130,12 @@ def delete_test_configuration(id):
 @test_configuration_blueprint.route('/<int:id>/run', methods=['POST'])
 @jwt_required()
 def run_test_configuration(id):
-    """Run a test configuration."""
+    """
+    Run a test configuration.
+    
+    With ``queue``, ``priority`` or ``scheduled_at`` (ISO 8601, UTC) in the
+    body, the run is queued for the scheduler (202) instead of started now.
+    """
     test_config = TestConfiguration.query.get_or_404(id)
     data = request.get_json() or {}
     
@@ -131,6 +152,24 @@ def run_test_configuration(id):
     # Get current user
     user = get_jwt_identity()
     
+    if data.get('queue') or 'priority' in data or 'scheduled_at' in data:
+        try:
+            priority = int(data.get('priority') or 0)
+            scheduled_at = datetime.fromisoformat(data['scheduled_at']) if data.get('scheduled_at') else None
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': str(e)}), 400
+        
+        test_run = schedule_test_run(
+            test_config,
+            Environment.query.get_or_404(environment_id),
+            Device.query.get_or_404(device_id),
+            created_by=user,
+            priority=priority,
+            scheduled_at=scheduled_at
+        )
+        db.session.commit()
+        return jsonify(test_run.to_dict()), 202
+    
     # Create BP Agent controller
     bp_agent = BPAgentController(current_app)
     
@@ -0,0 +1,73 @@
+"""
+Test Metric API routes.
+"""
+
+from datetime import datetime
+
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+
+from api.models.test_metric import TestMetric
+from api.listing import Listing
+from api.test_metrics import aggregate_metric, metric_query
+
+test_metric_blueprint = Blueprint('test_metric', __name__)
+
+
+test_metric_listing = Listing(
+    TestMetric,
+    filters=('test_run_id', 'metric', 'component'),
+    date_ranges={'timestamp': 'timestamp'},
+    sort_keys=('id', 'timestamp', 'value'),
+    default_sort='timestamp'
+)
+
+
+@test_metric_blueprint.route('', methods=['GET'])
+@jwt_required()
+def get_test_metrics():
+    """
+    List metric values (paginated, see api.listing).
+
+    Also filters by test run: device_id, environment_id, test_config_id.
+    """
+    try:
+        query = metric_query(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return test_metric_listing.respond(request.args, query)
+
+
+@test_metric_blueprint.route('/aggregate', methods=['GET'])
+@jwt_required()
+def aggregate_test_metrics():
+    """
+    Aggregate one metric component across test runs.
+
+    Query parameters: metric and component (required), aggregate (avg, min,
+    max, sum, count; default avg), group_by (device, environment,
+    test_config, run, day; default device), timestamp_after/timestamp_before
+    (ISO 8601) and the test run filters device_id, environment_id and
+    test_config_id.
+    """
+    metric = request.args.get('metric')
+    component = request.args.get('component')
+    if not metric or not component:
+        return jsonify({'error': 'metric and component are required'}), 400
+
+    try:
+        since = request.args.get('timestamp_after')
+        until = request.args.get('timestamp_before')
+        items = aggregate_metric(
+            metric,
+            component,
+            aggregate=request.args.get('aggregate', 'avg'),
+            group_by=request.args.get('group_by', 'device'),
+            since=datetime.fromisoformat(since) if since else None,
+            until=datetime.fromisoformat(until) if until else None,
+            filters=request.args
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'items': items})
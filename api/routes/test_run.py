@@ -8,50 +8,85 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from api.models import db
 from api.models.test_run import TestRun
 from api.models.test_result import TestResult
+from api.models.test_metric import TestMetric
+from api.listing import Listing
+from api.queries import test_runs_with
+from api.run_events import StreamLimitError, run_snapshot, stream_run_events
+from api.test_metrics import ingest_test_result
 from api.controllers.bp_agent import BPAgentController
 
 test_run_blueprint = Blueprint('test_run', __name__)
 
 
+test_run_listing = Listing(
+    TestRun,
+    filters=('status', 'environment_id', 'device_id', 'test_config_id', 'campaign_id', 'created_by'),
+    date_ranges={'created': 'created_at', 'started': 'start_time', 'ended': 'end_time'},
+    sort_keys=('id', 'created_at', 'start_time', 'end_time', 'duration', 'status')
+)
+
+
 @test_run_blueprint.route('', methods=['GET'])
 @jwt_required()
 def get_test_runs():
-    """Get all test runs."""
-    test_runs = TestRun.query.all()
-    return jsonify([run.to_dict() for run in test_runs])
+    """List test runs (paginated, see api.listing)."""
+    return test_run_listing.respond(request.args)
 
 
 @test_run_blueprint.route('/<int:id>', methods=['GET'])
 @jwt_required()
 def get_test_run(id):
-    """Get test run by ID."""
-    test_run = TestRun.query.get_or_404(id)
-    return jsonify(test_run.to_dict())
+    """Get test run by ID, with ?include=test_configuration,environment,device embedded."""
+    include = [name for name in request.args.get('include', '').split(',') if name]
+    try:
+        test_run = test_runs_with(include).get_or_404(id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(test_run.to_dict(include=include))
 
 
 @test_run_blueprint.route('/<int:id>/status', methods=['GET'])
 @jwt_required()
 def get_test_run_status(id):
-    """Get test run status."""
-    test_run = TestRun.query.get_or_404(id)
+    """
+    Get test run status and progress.
     
-    # If the test run is already completed or failed, return the current status
-    if test_run.status in ['completed', 'failed']:
-        return jsonify({'status': test_run.status})
+    Read from the database, where the status poller keeps it current; to
+    follow changes, use the event stream instead of polling this.
+    """
+    snapshot = run_snapshot([id])
+    if not snapshot:
+        return jsonify({'error': 'Not found'}), 404
+    return jsonify(snapshot[0])
+
+
+@test_run_blueprint.route('/events', methods=['GET'])
+@jwt_required()
+def stream_test_run_events():
+    """
+    Stream status events of ?ids=1,2,3 as Server-Sent Events (see api.run_events).
     
-    # Otherwise, check the current status from the BP Agent
-    bp_agent = BPAgentController(current_app)
+    When the server already streams to ``RUN_EVENTS_MAX_STREAMS`` clients the
+    request is refused (503); poll ``/<id>/status`` instead.
+    """
     try:
-        status = bp_agent.get_test_status(test_run)
-        
-        # Update the test run status if it has changed
-        if status != test_run.status:
-            test_run.status = status
-            db.session.commit()
-        
-        return jsonify({'status': status})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        run_ids = [int(run_id) for run_id in request.args.get('ids', '').split(',') if run_id]
+        return stream_run_events(run_ids)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except StreamLimitError as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '30'}
+
+
+@test_run_blueprint.route('/<int:id>/events', methods=['GET'])
+@jwt_required()
+def stream_test_run_events_by_id(id):
+    """Stream status events of a test run as Server-Sent Events (503 when at capacity)."""
+    TestRun.query.get_or_404(id)
+    try:
+        return stream_run_events([id])
+    except StreamLimitError as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '30'}
 
 
 @test_run_blueprint.route('/<int:id>/stop', methods=['POST'])
@@ -101,6 +136,7 @@ def get_test_run_result(id):
             )
             
             db.session.add(test_result)
+            ingest_test_result(test_result, test_run)
             db.session.commit()
             
             return jsonify(test_result.to_dict())
@@ -111,6 +147,19 @@ def get_test_run_result(id):
     return jsonify({'error': 'Test is not completed yet'}), 400
 
 
+@test_run_blueprint.route('/<int:id>/metrics', methods=['GET'])
+@jwt_required()
+def get_test_run_metrics(id):
+    """Get the metric values extracted from a test run's result."""
+    test_run = TestRun.query.get_or_404(id)
+    
+    metrics = TestMetric.query.filter_by(test_run_id=test_run.id).order_by(
+        TestMetric.metric, TestMetric.component, TestMetric.timestamp
+    ).all()
+    
+    return jsonify([metric.to_dict() for metric in metrics])
+
+
 @test_run_blueprint.route('/<int:id>/reports', methods=['GET'])
 @jwt_required()
 def get_test_run_reports(id):
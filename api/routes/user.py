@@ -3,39 +3,43 @@ User API routes.
 """
 
 from flask import Blueprint, jsonify, request, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from sqlalchemy.exc import IntegrityError
 
 from api.models import db
 from api.models.user import User
+from api.listing import Listing
+from api.user_cache import current_user_id, current_user_is_admin, invalidate_user
 
 user_blueprint = Blueprint('user', __name__)
 
+user_listing = Listing(
+    User,
+    filters=('is_admin',),
+    date_ranges={'created': 'created_at'},
+    sort_keys=('id', 'created_at', 'username'),
+    hidden=('password_hash',)
+)
+
 
 @user_blueprint.route('', methods=['GET'])
 @jwt_required()
 def get_users():
-    """Get all users."""
-    # Get current user to check if admin
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not current_user.is_admin:
+    """List users (paginated, see api.listing)."""
+    # Check if admin (from the token claim or the cached user)
+    if not current_user_is_admin():
         return jsonify({'error': 'Unauthorized - Admin access required'}), 403
     
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    return user_listing.respond(request.args)
 
 
 @user_blueprint.route('/<int:id>', methods=['GET'])
 @jwt_required()
 def get_user(id):
     """Get user by ID."""
-    # Get current user to check if admin or self
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or (not current_user.is_admin and current_user.id != id):
+    # Check if admin or self (from the token claim or the cached user)
+    is_admin = current_user_is_admin()
+    if not is_admin and current_user_id() != id:
         return jsonify({'error': 'Unauthorized - Admin access or self required'}), 403
     
     user = User.query.get_or_404(id)
@@ -46,11 +50,8 @@ def get_user(id):
 @jwt_required()
 def create_user():
     """Create a new user."""
-    # Get current user to check if admin
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not current_user.is_admin:
+    # Check if admin (from the token claim or the cached user)
+    if not current_user_is_admin():
         return jsonify({'error': 'Unauthorized - Admin access required'}), 403
     
     data = request.get_json()
@@ -90,11 +91,9 @@ def create_user():
 @jwt_required()
 def update_user(id):
     """Update a user."""
-    # Get current user to check if admin or self
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or (not current_user.is_admin and current_user.id != id):
+    # Check if admin or self (from the token claim or the cached user)
+    is_admin = current_user_is_admin()
+    if not is_admin and current_user_id() != id:
         return jsonify({'error': 'Unauthorized - Admin access or self required'}), 403
     
     user = User.query.get_or_404(id)
@@ -104,7 +103,7 @@ def update_user(id):
         return jsonify({'error': 'No data provided'}), 400
     
     # Only allow admin to change is_admin
-    if 'is_admin' in data and not current_user.is_admin:
+    if 'is_admin' in data and not is_admin:
         return jsonify({'error': 'Unauthorized - Admin access required to change admin status'}), 403
     
     if 'username' in data:
@@ -119,7 +118,7 @@ def update_user(id):
     if 'last_name' in data:
         user.last_name = data['last_name']
     
-    if 'is_admin' in data and current_user.is_admin:
+    if 'is_admin' in data and is_admin:
         user.is_admin = data['is_admin']
     
     if 'password' in data:
@@ -127,6 +126,7 @@ def update_user(id):
     
     try:
         db.session.commit()
+        invalidate_user(id)
         return jsonify(user.to_dict())
     except IntegrityError:
         db.session.rollback()
@@ -140,15 +140,12 @@ def update_user(id):
 @jwt_required()
 def delete_user(id):
     """Delete a user."""
-    # Get current user to check if admin
-    current_user_id = get_jwt_identity()
-    current_user = User.query.get(current_user_id)
-    
-    if not current_user or not current_user.is_admin:
+    # Check if admin (from the token claim or the cached user)
+    if not current_user_is_admin():
         return jsonify({'error': 'Unauthorized - Admin access required'}), 403
     
     # Prevent deleting self
-    if current_user.id == id:
+    if current_user_id() == id:
         return jsonify({'error': 'Cannot delete self'}), 400
     
     user = User.query.get_or_404(id)
@@ -156,6 +153,7 @@ def delete_user(id):
     try:
         db.session.delete(user)
         db.session.commit()
+        invalidate_user(id)
         return jsonify({'message': 'User deleted successfully'})
     except Exception as e:
         db.session.rollback()
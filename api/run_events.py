@@ -0,0 +1,526 @@
+"""
+Live test run status, pushed to clients as Server-Sent Events.
+
+Every committed change of a test run's status becomes a status event, and the
+status poller adds progress events for the running runs it checks. Events
+reach streams through one fan-out hub per process:
+
+- with ``RUN_EVENTS_REDIS_URL`` set, events are published on a Redis pub/sub
+  channel, and each web process holds a single subscription to it, whatever
+  the number of open streams;
+- otherwise a single watcher thread per process reads the status of the runs
+  being watched from the database every ``RUN_EVENTS_WATCH_INTERVAL`` seconds,
+  in one query.
+
+Either way a stream costs no Breaking Point session and no database write:
+the status poller is the only process that talks to the chassis.
+
+A stream starts with the current status of each of its runs, sends a
+keepalive comment every ``RUN_EVENTS_KEEPALIVE`` seconds, ends with an
+``end`` event once all of its runs are finished, and is closed after
+``RUN_EVENTS_MAX_STREAM`` seconds so that the client reconnects.
+
+An open stream occupies a server thread, so a process serves at most
+``RUN_EVENTS_MAX_STREAMS`` streams at once and refuses more with
+:class:`StreamLimitError`, leaving its other threads to ordinary requests;
+refused clients fall back to polling the stored status.
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from flask import Response, current_app, has_app_context
+from sqlalchemy import event, func, inspect as sa_inspect
+
+from api.models import db
+from api.models.test_run import TestRun
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Statuses after which a run does not change any more
+FINAL_STATUSES = ('completed', 'failed', 'stopped')
+
+# Most test runs one stream may follow
+MAX_STREAM_RUNS = 100
+
+# Events buffered per stream; the oldest are dropped for slow clients
+DEFAULT_QUEUE_SIZE = 100
+
+# Milliseconds a client waits before reconnecting a closed stream
+RECONNECT_DELAY = 3000
+
+# Session.info key of the events of a transaction, published on commit
+_PENDING = 'run_events'
+
+
+class StreamLimitError(Exception):
+    """The process already serves as many streams as it may."""
+
+
+def expected_durations(test_config_ids: Iterable[int]) -> Dict[int, float]:
+    """Average duration in seconds of completed runs, per test configuration."""
+    test_config_ids = set(test_config_ids)
+    if not test_config_ids:
+        return {}
+    rows = db.session.query(
+        TestRun.test_config_id, func.avg(TestRun.duration)
+    ).filter(
+        TestRun.test_config_id.in_(test_config_ids),
+        TestRun.status == 'completed',
+        TestRun.duration.isnot(None)
+    ).group_by(TestRun.test_config_id).all()
+
+    return {config_id: float(avg) for config_id, avg in rows if avg}
+
+
+def run_event(test_run: TestRun, expected_duration: Optional[float] = None,
+              now: Optional[datetime] = None) -> Dict:
+    """
+    Build the status event of a test run.
+
+    Args:
+        test_run: TestRun object
+        expected_duration: Expected run duration in seconds, if known
+        now: Current UTC time
+
+    Returns:
+        Dict: ``run_id``, ``status``, ``start_time``, ``end_time``,
+        ``elapsed_seconds``, ``expected_seconds`` and ``progress`` (0 to 1,
+        estimated from the expected duration while running; None if unknown)
+    """
+    elapsed = None
+    if test_run.start_time:
+        end = test_run.end_time or now or datetime.utcnow()
+        elapsed = max(0.0, (end - test_run.start_time).total_seconds())
+
+    progress = None
+    if test_run.status == 'completed':
+        progress = 1.0
+    elif test_run.status == 'running' and expected_duration and elapsed is not None:
+        # An overdue run is not done until Breaking Point says so
+        progress = round(min(0.99, elapsed / expected_duration), 3)
+
+    return {
+        'run_id': test_run.id,
+        'status': test_run.status,
+        'start_time': test_run.start_time.isoformat() if test_run.start_time else None,
+        'end_time': test_run.end_time.isoformat() if test_run.end_time else None,
+        'elapsed_seconds': round(elapsed, 1) if elapsed is not None else None,
+        'expected_seconds': expected_duration,
+        'progress': progress
+    }
+
+
+def run_snapshot(run_ids: Iterable[int]) -> List[Dict]:
+    """
+    Current status events of test runs, read from the database.
+
+    Args:
+        run_ids: Test run IDs
+
+    Returns:
+        List[Dict]: One event per existing run, in ID order
+    """
+    run_ids = set(run_ids)
+    if not run_ids:
+        return []
+    test_runs = TestRun.query.filter(TestRun.id.in_(run_ids)).order_by(TestRun.id).all()
+    expected = expected_durations(
+        test_run.test_config_id for test_run in test_runs if test_run.status == 'running'
+    )
+    now = datetime.utcnow()
+    return [run_event(test_run, expected.get(test_run.test_config_id), now) for test_run in test_runs]
+
+
+class RunSubscription:
+    """Events of some test runs, queued for one stream."""
+
+    def __init__(self, hub: 'RunEventHub', run_ids: Iterable[int], queue_size: int):
+        self.hub = hub
+        self.run_ids = frozenset(run_ids)
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+
+    def put(self, status_event: Dict) -> int:
+        """Queue an event, dropping the oldest ones if the queue is full; returns the number dropped."""
+        dropped = 0
+        while True:
+            try:
+                self._queue.put_nowait(status_event)
+                return dropped
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: float) -> Optional[Dict]:
+        """Wait up to ``timeout`` seconds for the next event."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        """Stop receiving events."""
+        self.hub.unsubscribe(self)
+
+
+class RunEventHub:
+    """In-process fan-out of run events to the subscriptions following each run."""
+
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE):
+        """
+        Initialize the hub.
+
+        Args:
+            queue_size: Events buffered per subscription
+        """
+        self.queue_size = queue_size
+        self._subscriptions: Dict[int, set] = {}
+        self._last_status: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, run_ids: Iterable[int]) -> RunSubscription:
+        """Subscribe to the events of some test runs."""
+        subscription = RunSubscription(self, run_ids, self.queue_size)
+        with self._lock:
+            for run_id in subscription.run_ids:
+                self._subscriptions.setdefault(run_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: RunSubscription) -> None:
+        """Remove a subscription (idempotent)."""
+        with self._lock:
+            for run_id in subscription.run_ids:
+                subscriptions = self._subscriptions.get(run_id)
+                if not subscriptions or subscription not in subscriptions:
+                    continue
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[run_id]
+                    self._last_status.pop(run_id, None)
+
+    def publish(self, status_event: Dict) -> int:
+        """
+        Deliver an event to the subscriptions following its run.
+
+        Returns:
+            int: Number of subscriptions it was delivered to
+        """
+        run_id = status_event.get('run_id')
+        with self._lock:
+            self.received += 1
+            subscriptions = list(self._subscriptions.get(run_id, ()))
+            if subscriptions:
+                self._last_status[run_id] = status_event.get('status')
+        dropped = sum(subscription.put(status_event) for subscription in subscriptions)
+        with self._lock:
+            self.delivered += len(subscriptions)
+            self.dropped += dropped
+        return len(subscriptions)
+
+    def watched_run_ids(self) -> set:
+        """IDs of the runs some subscription follows."""
+        with self._lock:
+            return set(self._subscriptions)
+
+    def last_status(self, run_id: int) -> Optional[str]:
+        """Status of the last event delivered for a watched run."""
+        with self._lock:
+            return self._last_status.get(run_id)
+
+    def stats(self) -> Dict:
+        """Subscription and delivery counters."""
+        with self._lock:
+            return {
+                'subscriptions': len({s for subs in self._subscriptions.values() for s in subs}),
+                'watched_runs': len(self._subscriptions),
+                'received': self.received,
+                'delivered': self.delivered,
+                'dropped': self.dropped
+            }
+
+
+class RunEvents:
+    """
+    Publisher and per-process subscriber of run events.
+
+    Events are published to Redis when ``RUN_EVENTS_REDIS_URL`` is set and
+    straight to this process's hub otherwise. The hub is fed by one
+    background thread, started with the first subscription: a Redis
+    subscriber, or a database watcher without Redis.
+    """
+
+    def __init__(self, app):
+        """
+        Initialize run events.
+
+        Args:
+            app: Flask application with configuration
+        """
+        self.app = app
+        self.hub = RunEventHub()
+        self.redis_url = app.config.get('RUN_EVENTS_REDIS_URL')
+        self.channel = app.config.get('RUN_EVENTS_CHANNEL', 'bp_cms:run_events')
+        self.watch_interval = float(app.config.get('RUN_EVENTS_WATCH_INTERVAL', 2))
+        self.max_streams = int(app.config.get('RUN_EVENTS_MAX_STREAMS', 8))
+        self._redis = None
+        self._feeder: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.streams = 0
+        self.rejected_streams = 0
+        self.published = 0
+        self.publish_errors = 0
+
+    @property
+    def backend(self) -> str:
+        return 'redis' if self.redis_url else 'local'
+
+    def _client(self):
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self.redis_url)
+        return self._redis
+
+    def publish(self, events: List[Dict]) -> None:
+        """
+        Publish run events; failures are logged, never raised.
+
+        Args:
+            events: Events built with :func:`run_event`
+        """
+        if not events:
+            return
+        try:
+            if self.redis_url:
+                pipeline = self._client().pipeline(transaction=False)
+                for status_event in events:
+                    pipeline.publish(self.channel, json.dumps(status_event))
+                pipeline.execute()
+            else:
+                for status_event in events:
+                    self.hub.publish(status_event)
+            self.published += len(events)
+        except Exception as e:
+            self.publish_errors += len(events)
+            logger.error(f"Failed to publish {len(events)} run events: {e}")
+
+    def open_stream(self) -> bool:
+        """Take a stream slot; False if all ``RUN_EVENTS_MAX_STREAMS`` are in use."""
+        with self._lock:
+            if self.streams >= self.max_streams:
+                self.rejected_streams += 1
+                return False
+            self.streams += 1
+            return True
+
+    def close_stream(self) -> None:
+        """Give back a stream slot taken with :meth:`open_stream`."""
+        with self._lock:
+            self.streams -= 1
+
+    def subscribe(self, run_ids: Iterable[int]) -> RunSubscription:
+        """Subscribe to the events of some test runs, starting the feeder thread if needed."""
+        with self._lock:
+            if self._feeder is None or not self._feeder.is_alive():
+                target = self._listen if self.redis_url else self._watch
+                self._feeder = threading.Thread(target=target, name='run-events', daemon=True)
+                self._feeder.start()
+        return self.hub.subscribe(run_ids)
+
+    def _listen(self) -> None:
+        """Relay the Redis channel to the hub, reconnecting after errors."""
+        while True:
+            try:
+                pubsub = self._client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    self.hub.publish(json.loads(message['data']))
+            except Exception as e:
+                logger.error(f"Run event subscription failed: {e}")
+                time.sleep(self.watch_interval)
+
+    def _watch(self) -> None:
+        """Publish status changes (and progress) of the watched runs, read from the database."""
+        while True:
+            time.sleep(self.watch_interval)
+            run_ids = self.hub.watched_run_ids()
+            if not run_ids:
+                continue
+            try:
+                with self.app.app_context():
+                    events = run_snapshot(run_ids)
+            except Exception as e:
+                logger.error(f"Failed to read the status of watched test runs: {e}")
+                continue
+            for status_event in events:
+                if status_event['status'] == 'running' or status_event['status'] != self.hub.last_status(status_event['run_id']):
+                    self.hub.publish(status_event)
+
+    def stats(self) -> Dict:
+        """Backend, publishing and fan-out counters."""
+        return {
+            'backend': self.backend,
+            'streams': self.streams,
+            'max_streams': self.max_streams,
+            'rejected_streams': self.rejected_streams,
+            'published': self.published,
+            'publish_errors': self.publish_errors,
+            **self.hub.stats()
+        }
+
+
+def _format(name: str, data: Dict) -> str:
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream_run_events(run_ids: Iterable[int]) -> Response:
+    """
+    Server-Sent Events response following some test runs.
+
+    Must be called in a request; the stream itself does not use the database.
+
+    Args:
+        run_ids: Test run IDs (at most ``MAX_STREAM_RUNS``)
+
+    Returns:
+        Response: ``text/event-stream`` of ``status`` events (see
+        :func:`run_event`), then an ``end`` event once every run is finished
+
+    Raises:
+        ValueError: If no or too many IDs are given, or a run does not exist
+        StreamLimitError: If the process already serves ``RUN_EVENTS_MAX_STREAMS`` streams
+    """
+    run_ids = sorted(set(run_ids))
+    if not run_ids:
+        raise ValueError("No test runs given")
+    if len(run_ids) > MAX_STREAM_RUNS:
+        raise ValueError(f"At most {MAX_STREAM_RUNS} test runs can be followed at once")
+
+    events = get_run_events()
+    keepalive = float(current_app.config.get('RUN_EVENTS_KEEPALIVE', 15))
+    max_stream = float(current_app.config.get('RUN_EVENTS_MAX_STREAM', 3600))
+
+    if not events.open_stream():
+        raise StreamLimitError(f"This server already streams to {events.max_streams} clients")
+
+    # Subscribe before reading the snapshot so no change falls in between
+    try:
+        subscription = events.subscribe(run_ids)
+    except Exception:
+        events.close_stream()
+        raise
+    state = {'open': True}
+
+    def close():
+        # From the generator or the response, whichever ends first (a
+        # response closed before it is iterated never runs the generator)
+        if state['open']:
+            state['open'] = False
+            subscription.close()
+            events.close_stream()
+
+    try:
+        snapshot = run_snapshot(run_ids)
+    except Exception:
+        close()
+        raise
+    missing = set(run_ids) - {status_event['run_id'] for status_event in snapshot}
+    if missing:
+        close()
+        raise ValueError(f"Unknown test runs: {', '.join(map(str, sorted(missing)))}")
+
+    def generate():
+        deadline = time.monotonic() + max_stream
+        pending = set()
+        try:
+            yield f"retry: {RECONNECT_DELAY}\n\n"
+            for status_event in snapshot:
+                yield _format('status', status_event)
+                if status_event['status'] not in FINAL_STATUSES:
+                    pending.add(status_event['run_id'])
+
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    # Let the client reconnect (and resynchronize)
+                    return
+                status_event = subscription.get(timeout=min(keepalive, remaining))
+                if status_event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                if status_event['run_id'] not in pending:
+                    continue
+                yield _format('status', status_event)
+                if status_event['status'] in FINAL_STATUSES:
+                    pending.discard(status_event['run_id'])
+
+            yield _format('end', {'run_ids': run_ids})
+        finally:
+            close()
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.call_on_close(close)
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _collect_events(session, flush_context) -> None:
+    """Build the events of test runs created or changing status in a flush."""
+    pending = None
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, TestRun):
+            continue
+        if obj in session.new or sa_inspect(obj).attrs.status.history.has_changes():
+            if pending is None:
+                pending = session.info.setdefault(_PENDING, {})
+            pending[obj.id] = run_event(obj)
+
+
+def _publish_committed(session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if pending and has_app_context() and 'run_events' in current_app.extensions:
+        current_app.extensions['run_events'].publish(list(pending.values()))
+
+
+def _discard(session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+def init_run_events(app) -> RunEvents:
+    """
+    Create the app's run events and publish test run status changes on
+    every commit of ``db.session`` (listeners registered once per process).
+
+    Args:
+        app: Flask application
+
+    Returns:
+        RunEvents: The app's run events
+    """
+    run_events = RunEvents(app)
+    app.extensions['run_events'] = run_events
+
+    if not event.contains(db.session, 'after_flush', _collect_events):
+        event.listen(db.session, 'after_flush', _collect_events)
+        event.listen(db.session, 'after_commit', _publish_committed)
+        event.listen(db.session, 'after_rollback', _discard)
+    return run_events
+
+
+def get_run_events(app=None) -> RunEvents:
+    """Get the run events of an app (the current app by default)."""
+    app = app or current_app
+    return app.extensions['run_events']
@@ -2,133 +2,174 @@
 Background tasks for the CMS.
 """
 
-import time
 import logging
+import os
+import threading
 from celery import Celery
-from flask import current_app
-from datetime import datetime
+from celery.signals import worker_process_init, worker_process_shutdown
+from flask import current_app, has_app_context
 
 from api.models import db
 from api.models.test_run import TestRun
 from api.controllers.test_controller import TestController
+from config import config
+
+# Configure logger
+logger = logging.getLogger(__name__)
+
+# Flask app of the current worker process, built once by get_worker_app()
+_worker_app = None
+_worker_app_lock = threading.Lock()
+
+
+def get_worker_app():
+    """
+    Get the Flask app of the current worker process, creating it on first use.
+    
+    The app (and with it the database engine, storage client and
+    configuration) is built once per process and shared by every task the
+    process runs.
+    
+    Returns:
+        Flask: The worker's Flask application
+    """
+    global _worker_app
+    if _worker_app is None:
+        with _worker_app_lock:
+            if _worker_app is None:
+                from app import create_app
+                _worker_app = create_app()
+    return _worker_app
+
 
 # Configure Celery
-def make_celery(app):
-    """Create a Celery instance for background tasks."""
+def make_celery(app=None):
+    """Create a Celery instance for background tasks.
+    
+    Tasks run inside an app context: of ``app`` if given, otherwise of the
+    per-process worker app from :func:`get_worker_app`. Tasks called
+    directly inside an existing app context (e.g. eagerly from a request)
+    reuse that context.
+    
+    Args:
+        app: Flask application (optional)
+    
+    Returns:
+        Celery: The Celery application
+    """
+    if app is not None:
+        settings = app.config
+    else:
+        # Read settings from the config class; the app itself is built lazily
+        config_class = config[os.getenv('FLASK_ENV', 'default')]
+        settings = {key: getattr(config_class, key) for key in dir(config_class) if key.isupper()}
     celery = Celery(
-        app.import_name,
-        backend=app.config.get('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0'),
-        broker=app.config.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+        app.import_name if app is not None else 'bp_mcp_agent_cms',
+        backend=settings.get('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0'),
+        broker=settings.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
     )
-    celery.conf.update(app.config)
+    if app is not None:
+        celery.conf.update(app.config)
 
     class ContextTask(celery.Task):
         def __call__(self, *args, **kwargs):
-            with app.app_context():
+            if has_app_context():
+                return self.run(*args, **kwargs)
+            with (app or get_worker_app()).app_context():
                 return self.run(*args, **kwargs)
 
     celery.Task = ContextTask
     return celery
 
 # Create a Celery instance
-celery = Celery('bp_mcp_agent_cms')
+celery = make_celery()
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Build the worker app when a worker process starts, before its first task."""
+    app = get_worker_app()
+    with app.app_context():
+        # Connections inherited from a parent process must not be shared
+        db.engine.dispose()
+
 
-# Initialize Celery with the Flask app at runtime
-@celery.on_after_configure.connect
-def setup_celery(sender, **kwargs):
-    from app import create_app
-    app = create_app()
-    celery.conf.update(app.config)
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """Close the worker's database connections."""
+    if _worker_app is not None:
+        with _worker_app.app_context():
+            db.engine.dispose()
 
 
 @celery.task
 def monitor_test_run(test_run_id):
     """Monitor the status of a test run.
     
+    Deprecated: running test runs are now checked by the batched status
+    poller (``flask poll-test-runs``). This task is kept so messages queued
+    by older versions still drain, and does nothing.
+    
     Args:
         test_run_id: ID of the test run to monitor
     """
-    from app import create_app
-    app = create_app()
+    logger.info(
+        f"Ignoring monitor_test_run({test_run_id}); test runs are monitored by the status poller"
+    )
+
+
+@celery.task
+def collect_test_results(test_run_id):
+    """Fetch and store the results of a finished test run.
+    
+    Args:
+        test_run_id: ID of the test run
+    """
+    # Get the test run
+    test_run = TestRun.query.get(test_run_id)
+    if not test_run:
+        current_app.logger.error(f"Test run {test_run_id} not found")
+        return
     
-    with app.app_context():
-        # Get the test run
-        test_run = TestRun.query.get(test_run_id)
-        if not test_run:
-            app.logger.error(f"Test run {test_run_id} not found")
-            return
-        
-        # Get test controller
-        test_controller = TestController()
-        
-        # Monitor the test until it completes or fails
-        while test_run.status == 'running':
-            try:
-                # Get the current status from Breaking Point
-                status = test_controller.get_test_status(test_run)
-                
-                # If the test has completed or failed, update the status and get results
-                if status in ['completed', 'failed']:
-                    test_run.status = status
-                    test_run.end_time = datetime.utcnow()
-                    
-                    if test_run.start_time:
-                        # Calculate duration in seconds
-                        duration = (test_run.end_time - test_run.start_time).total_seconds()
-                        test_run.duration = int(duration)
-                    
-                    db.session.commit()
-                    
-                    # Get test results
-                    try:
-                        test_controller.get_test_results(test_run)
-                    except Exception as e:
-                        app.logger.error(f"Failed to get test results for test run {test_run_id}: {str(e)}")
-                    
-                    break
-            except Exception as e:
-                app.logger.error(f"Error monitoring test run {test_run_id}: {str(e)}")
-                
-                # If there's an error, wait before retrying
-                time.sleep(5)
-            
-            # Wait before checking again
-            time.sleep(10)
-        
-        app.logger.info(f"Test run {test_run_id} monitoring completed with status {test_run.status}")
+    try:
+        TestController().get_test_results(test_run)
+    except Exception as e:
+        current_app.logger.error(f"Failed to get test results for test run {test_run_id}: {str(e)}")
 
 
 @celery.task
-def cleanup_orphaned_files():
-    """Clean up orphaned files in storage."""
-    from app import create_app
-    app = create_app()
+def cleanup_orphaned_files(dry_run=False):
+    """Delete stored files that no report or media row references.
     
-    with app.app_context():
-        # Get storage
-        storage = app.storage
-        
-        # Get all files in storage
-        all_files = storage.list_files("")
-        
-        # Get all report file paths from the database
-        from api.models.report import Report
-        report_files = [report.file_path for report in Report.query.all()]
-        
-        # Get all media file paths from the database
-        from api.models.media import Media
-        media_files = [media.file_path for media in Media.query.all()]
-        
-        # Combine all files that should exist
-        known_files = report_files + media_files
-        
-        # Find orphaned files
-        orphaned_files = [f for f in all_files if f not in known_files]
-        
-        # Delete orphaned files
-        for file_path in orphaned_files:
-            try:
-                storage.delete_file(file_path)
-                app.logger.info(f"Deleted orphaned file: {file_path}")
-            except Exception as e:
-                app.logger.error(f"Failed to delete orphaned file {file_path}: {str(e)}")
+    See :mod:`api.orphans`; the grace period, batch size and checkpoint file
+    come from the ORPHAN_* settings.
+    
+    Args:
+        dry_run: Only count and log orphans, deleting nothing
+    
+    Returns:
+        dict: Totals of the run
+    """
+    from api.orphans import reconcile_orphaned_files
+    
+    settings = current_app.config
+    
+    def log_orphans(stats, orphans):
+        for file_path in orphans:
+            if dry_run:
+                current_app.logger.info(f"Orphaned file (dry run): {file_path}")
+            else:
+                current_app.logger.info(f"Deleting orphaned file: {file_path}")
+    
+    stats = reconcile_orphaned_files(
+        min_age=settings['ORPHAN_MIN_AGE'],
+        dry_run=dry_run,
+        batch_size=settings['ORPHAN_BATCH_SIZE'],
+        checkpoint=settings['ORPHAN_CHECKPOINT_FILE'],
+        progress=log_orphans
+    )
+    current_app.logger.info(
+        f"Orphan cleanup: scanned {stats['scanned']}, orphaned {stats['orphaned']}, "
+        f"deleted {stats['deleted']}, failed {stats['failed']}"
+    )
+    return stats
@@ -0,0 +1,313 @@
+"""
+Ingestion and queries for the test_metrics table.
+
+Test results arrive from the BP agent as a JSON blob, stored whole in
+``TestResult.result_data``. The ingestion stage breaks its ``metrics``
+section into one typed row per value::
+
+    {'metrics': {'latency': {'avg': 0.42, 'p99': 1.3}, ...}}
+    -> (run, 'latency', 'avg', <end of run>, 0.42), (run, 'latency', 'p99', <end of run>, 1.3), ...
+
+Nested objects become dotted components (``{'tcp': {'avg': 1}}`` ->
+``tcp.avg``), and a list of samples (``[{'timestamp': ..., 'value': ...}]``
+or ``[[timestamp, value], ...]``) becomes one row per sample at its own time.
+Cross-run questions are then answered by filtering and aggregating in SQL.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Date, cast, exists, func, select
+
+from api.models import db
+from api.models.test_metric import TestMetric
+from api.models.test_result import TestResult
+from api.models.test_run import TestRun
+
+# Sections of result_data['metrics'] that are ingested
+METRICS = ('throughput', 'latency', 'strikes', 'transactions')
+
+# Test results ingested per transaction by the backfill
+DEFAULT_BATCH_SIZE = 500
+
+# Aggregates the query API computes in SQL
+AGGREGATES = {
+    'avg': func.avg,
+    'min': func.min,
+    'max': func.max,
+    'sum': func.sum,
+    'count': func.count
+}
+
+# Test run filters accepted alongside the metric filters
+RUN_FILTERS = ('device_id', 'environment_id', 'test_config_id')
+
+
+def _number(value) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _timestamp(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # Epoch seconds or milliseconds (1e12 seconds is tens of millennia away)
+        seconds = value / 1000 if value > 1e12 else value
+        return datetime.utcfromtimestamp(seconds)
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        if parsed.tzinfo is not None:
+            parsed = parsed.replace(tzinfo=None) - parsed.utcoffset()
+        return parsed
+    return None
+
+
+def _sample(point) -> Optional[Tuple[datetime, float]]:
+    if isinstance(point, dict):
+        when = next((point[key] for key in ('timestamp', 'time', 't') if key in point), None)
+        value = next((point[key] for key in ('value', 'v') if key in point), None)
+    elif isinstance(point, (list, tuple)) and len(point) == 2:
+        when, value = point
+    else:
+        return None
+    when, value = _timestamp(when), _number(value)
+    if when is None or value is None:
+        return None
+    return when, value
+
+
+def _values(data, component: str, default_time: datetime) -> Iterator[Tuple[str, datetime, float]]:
+    if isinstance(data, dict):
+        for key, value in data.items():
+            yield from _values(value, f"{component}.{key}" if component else str(key), default_time)
+    elif isinstance(data, list):
+        for point in data:
+            sample = _sample(point)
+            if sample:
+                yield (component, *sample)
+    else:
+        value = _number(data)
+        if value is not None and component:
+            yield component, default_time, value
+
+
+def extract_metrics(result_data: Optional[Dict[str, Any]], test_run_id: int,
+                    default_time: datetime) -> List[Dict[str, Any]]:
+    """
+    Break a test result into test_metrics rows.
+
+    Args:
+        result_data: Test result summary from the BP agent
+        test_run_id: ID of the test run the result belongs to
+        default_time: Timestamp for values that are not time series (run totals)
+
+    Returns:
+        List[Dict[str, Any]]: Column values for each row; non-numeric values are skipped
+    """
+    metrics = (result_data or {}).get('metrics') or {}
+    return [
+        {
+            'test_run_id': test_run_id,
+            'metric': metric,
+            'component': component[:100],
+            'timestamp': timestamp,
+            'value': value
+        }
+        for metric in METRICS
+        for component, timestamp, value in _values(metrics.get(metric), '', default_time)
+    ]
+
+
+def _run_time(test_run: Optional[TestRun], test_result: Optional[TestResult] = None) -> datetime:
+    """When a run's totals were measured: its end, else its start, else when the result was stored."""
+    for value in (getattr(test_run, 'end_time', None), getattr(test_run, 'start_time', None),
+                  getattr(test_result, 'created_at', None)):
+        if value:
+            return value
+    return datetime.utcnow()
+
+
+def ingest_test_result(test_result: TestResult, test_run: Optional[TestRun] = None) -> int:
+    """
+    Replace the test run's metric rows with those in its result (without committing).
+
+    Args:
+        test_result: TestResult with ``result_data`` set
+        test_run: The result's test run (loaded if not given)
+
+    Returns:
+        int: Number of rows written
+    """
+    test_run = test_run or TestRun.query.get(test_result.test_run_id)
+    rows = extract_metrics(test_result.result_data, test_result.test_run_id, _run_time(test_run, test_result))
+
+    db.session.execute(TestMetric.__table__.delete().where(TestMetric.test_run_id == test_result.test_run_id))
+    if rows:
+        db.session.execute(TestMetric.__table__.insert(), rows)
+    return len(rows)
+
+
+def backfill_test_metrics(batch_size: int = DEFAULT_BATCH_SIZE, force: bool = False,
+                          progress=None) -> Tuple[int, int]:
+    """
+    Ingest stored test results in batches, committing after each batch.
+
+    Results are read in ID order, ``batch_size`` at a time, so memory use is
+    bounded and an interrupted backfill resumes where it stopped (runs that
+    already have metrics are skipped unless ``force`` is set).
+
+    Args:
+        batch_size: Test results per batch/transaction
+        force: Re-ingest results whose runs already have metrics
+        progress: Optional callback ``(results, rows)`` called after each batch
+
+    Returns:
+        Tuple[int, int]: Test results ingested and metric rows written
+    """
+    columns = (TestResult.id, TestResult.test_run_id, TestResult.result_data, TestResult.created_at,
+               TestRun.start_time, TestRun.end_time)
+    last_id = 0
+    results = rows_written = 0
+
+    while True:
+        query = (
+            select(*columns)
+            .join(TestRun, TestRun.id == TestResult.test_run_id)
+            .where(TestResult.id > last_id)
+            .order_by(TestResult.id)
+            .limit(batch_size)
+        )
+        if not force:
+            query = query.where(~exists().where(TestMetric.test_run_id == TestResult.test_run_id))
+        batch = db.session.execute(query).all()
+        if not batch:
+            break
+
+        run_ids = [row.test_run_id for row in batch]
+        rows = []
+        for row in batch:
+            measured = row.end_time or row.start_time or row.created_at or datetime.utcnow()
+            rows.extend(extract_metrics(row.result_data, row.test_run_id, measured))
+
+        db.session.execute(TestMetric.__table__.delete().where(TestMetric.test_run_id.in_(run_ids)))
+        if rows:
+            db.session.execute(TestMetric.__table__.insert(), rows)
+        db.session.commit()
+
+        last_id = batch[-1].id
+        results += len(batch)
+        rows_written += len(rows)
+        if progress:
+            progress(results, rows_written)
+
+    return results, rows_written
+
+
+def _day(column):
+    if db.session.get_bind().dialect.name == 'sqlite':
+        # CAST(... AS DATE) yields a number on SQLite
+        return func.date(column)
+    return cast(column, Date)
+
+
+def metric_query(args, query=None):
+    """
+    Test metrics filtered by the test run fields in ``args``.
+
+    Args:
+        args: Request query parameters; any of RUN_FILTERS (comma-separated IDs)
+        query: Query to filter (defaults to all test metrics)
+
+    Returns:
+        Query: Test metrics of the matching test runs
+
+    Raises:
+        ValueError: If a filter value is not an integer
+    """
+    query = query if query is not None else db.session.query(TestMetric)
+    run_clauses = []
+    for field in RUN_FILTERS:
+        value = args.get(field)
+        if not value:
+            continue
+        try:
+            ids = [int(item) for item in value.split(',')]
+        except ValueError:
+            raise ValueError(f"Invalid value for {field}: {value}")
+        run_clauses.append(getattr(TestRun, field).in_(ids))
+    if run_clauses:
+        query = query.join(TestRun, TestRun.id == TestMetric.test_run_id).filter(*run_clauses)
+    return query
+
+
+def aggregate_metric(metric: str, component: str, aggregate: str = 'avg', group_by: str = 'device',
+                     since: Optional[datetime] = None, until: Optional[datetime] = None,
+                     filters: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+    """
+    Aggregate one metric component across test runs, in SQL.
+
+    Args:
+        metric: Metric name (see METRICS)
+        component: Component, e.g. 'p99'
+        aggregate: One of AGGREGATES
+        group_by: 'device', 'environment', 'test_config', 'run' or 'day'
+        since: Only values at or after this time
+        until: Only values before this time
+        filters: Test run filters (see :func:`metric_query`)
+
+    Returns:
+        List[Dict[str, Any]]: ``key`` (group), ``value`` (aggregate) and
+        ``samples`` (values aggregated) per group, ordered by key
+
+    Raises:
+        ValueError: If an argument is invalid
+    """
+    if aggregate not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate: {aggregate}; use one of: {', '.join(AGGREGATES)}")
+
+    groups = {
+        'device': TestRun.device_id,
+        'environment': TestRun.environment_id,
+        'test_config': TestRun.test_config_id,
+        'run': TestMetric.test_run_id,
+        'day': _day(TestMetric.timestamp)
+    }
+    if group_by not in groups:
+        raise ValueError(f"Cannot group by {group_by}; use one of: {', '.join(groups)}")
+    key = groups[group_by].label('key')
+
+    query = db.session.query(
+        key,
+        AGGREGATES[aggregate](TestMetric.value).label('value'),
+        func.count(TestMetric.id).label('samples')
+    ).filter(TestMetric.metric == metric, TestMetric.component == component)
+    if since:
+        query = query.filter(TestMetric.timestamp >= since)
+    if until:
+        query = query.filter(TestMetric.timestamp < until)
+
+    run_filters = {field: value for field, value in (filters or {}).items() if field in RUN_FILTERS and value}
+    if group_by in ('device', 'environment', 'test_config') and not run_filters:
+        query = query.join(TestRun, TestRun.id == TestMetric.test_run_id)
+    query = metric_query(run_filters, query)
+
+    return [
+        {
+            'key': row.key.isoformat() if hasattr(row.key, 'isoformat') else row.key,
+            'value': float(row.value) if row.value is not None else None,
+            'samples': row.samples
+        }
+        for row in query.group_by(key).order_by(key).all()
+    ]
@@ -0,0 +1,207 @@
+"""
+Cache of users resolved from JWT identities.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from flask import current_app
+from flask_jwt_extended import get_current_user, get_jwt, get_jwt_identity
+from sqlalchemy import inspect
+
+from api.models.user import User
+
+DEFAULT_MAX_SIZE = 1024
+DEFAULT_TTL = 60  # seconds
+
+
+class CachedUser:
+    """Read-only snapshot of a User row, safe to share between requests and threads."""
+
+    def __init__(self, user: User):
+        for attr in inspect(User).column_attrs:
+            if attr.key != 'password_hash':
+                setattr(self, attr.key, getattr(user, attr.key))
+
+    def __repr__(self):
+        return f"<CachedUser(id={self.id}, username='{self.username}')>"
+
+    def to_dict(self):
+        """Convert to dictionary (same fields as User.to_dict)."""
+        return User.to_dict(self)
+
+
+class UserCache:
+    """
+    Bounded LRU cache of users with a time-to-live.
+
+    Entries are dropped after ``ttl`` seconds and the least recently used
+    entry is evicted when the cache is full. The cache is per process:
+    ``invalidate`` only affects the process it is called in, so changes
+    made elsewhere become visible after at most ``ttl`` seconds.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE, ttl: float = DEFAULT_TTL):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached users
+            ttl: Seconds a cached user stays valid
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int, loader: Callable[[int], Optional[User]]) -> Optional[CachedUser]:
+        """
+        Get a user, loading it on a miss.
+
+        Args:
+            user_id: User ID
+            loader: Function loading the User row (or None) for an ID
+
+        Returns:
+            Optional[CachedUser]: The user, or None if it does not exist
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                user, expires = entry
+                if expires > now:
+                    self._entries.move_to_end(user_id)
+                    self.hits += 1
+                    return user
+                del self._entries[user_id]
+                self.expirations += 1
+            self.misses += 1
+
+        # Load outside the lock; a concurrent miss for the same user just loads it twice
+        row = loader(user_id)
+        if row is None:
+            return None
+        user = CachedUser(row)
+
+        with self._lock:
+            self._entries[user_id] = (user, now + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return user
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop a user from the cache."""
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop all users from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """
+        Get cache counters.
+
+        Returns:
+            Dict: Size, hits, misses, hit rate, evictions, expirations and invalidations
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+
+def init_user_cache(app) -> UserCache:
+    """
+    Create the user cache for an app.
+
+    Args:
+        app: Flask application
+
+    Returns:
+        UserCache: The app's user cache
+    """
+    cache = UserCache(
+        max_size=int(app.config.get('USER_CACHE_SIZE', DEFAULT_MAX_SIZE)),
+        ttl=float(app.config.get('USER_CACHE_TTL', DEFAULT_TTL))
+    )
+    app.extensions['user_cache'] = cache
+    return cache
+
+
+def get_user_cache(app=None) -> UserCache:
+    """Get the user cache of an app (the current app by default)."""
+    app = app or current_app
+    return app.extensions['user_cache']
+
+
+def _parse_user_id(identity) -> Optional[int]:
+    try:
+        return int(identity)
+    except (TypeError, ValueError):
+        return None
+
+
+def load_user(identity) -> Optional[CachedUser]:
+    """
+    Resolve a JWT identity to a user through the cache.
+
+    Args:
+        identity: JWT subject (user ID, usually as a string)
+
+    Returns:
+        Optional[CachedUser]: The user, or None if it does not exist
+    """
+    user_id = _parse_user_id(identity)
+    if user_id is None:
+        return None
+    return get_user_cache().get(user_id, lambda key: User.query.filter_by(id=key).one_or_none())
+
+
+def invalidate_user(user_id) -> None:
+    """Drop a user from the current app's cache after it was changed or deleted."""
+    user_id = _parse_user_id(user_id)
+    if user_id is not None:
+        get_user_cache().invalidate(user_id)
+
+
+def current_user_id() -> Optional[int]:
+    """ID of the user making the current request."""
+    return _parse_user_id(get_jwt_identity())
+
+
+def current_user_is_admin() -> bool:
+    """
+    Whether the user making the current request is an admin.
+
+    Uses the token's ``is_admin`` claim when JWT_ADMIN_CLAIM is enabled,
+    and the (cached) user otherwise.
+    """
+    if current_app.config.get('JWT_ADMIN_CLAIM'):
+        claims = get_jwt()
+        if 'is_admin' in claims:
+            return bool(claims['is_admin'])
+
+    user = get_current_user()
+    return bool(user and user.is_admin)
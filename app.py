@@ -4,11 +4,17 @@ Main application entry point for the CMS.
 
 import os
 from flask import Flask, jsonify
-from flask_jwt_extended import JWTManager
+from flask_jwt_extended import JWTManager, jwt_required
 from flask_cors import CORS
 
+from api.analytics import init_analytics_cache
+from api.dashboard_stats import init_dashboard_stats
 from api.models import db
+from api.query_guard import init_query_guard
+from api.run_events import init_run_events
+from api.user_cache import init_user_cache, load_user
 from config import config
+from database.pool import engine_options, instrument_engine
 from storage import get_storage
 
 
@@ -42,19 +48,19 @@ def create_app(config_name=None):
         # Always convert user identity to string
         return str(user) if user is not None else None
     
+    # Users are resolved through a bounded TTL cache rather than a query per request
+    init_user_cache(app)
+    
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
-        from api.models import User
-        identity = jwt_data["sub"]
-        try:
-            # Try to convert to int if it's a number in string form
-            if identity.isdigit():
-                user_id = int(identity)
-            else:
-                user_id = identity
-            return User.query.filter_by(id=user_id).one_or_none()
-        except:
-            return None
+        return load_user(jwt_data["sub"])
+    
+    if app.config.get('JWT_ADMIN_CLAIM'):
+        @jwt.additional_claims_loader
+        def add_admin_claim(identity):
+            # Lets admin checks read the token instead of loading the user
+            user = load_user(identity)
+            return {'is_admin': bool(user and user.is_admin)}
     
     # Add context processor for datetime
     @app.context_processor
@@ -62,22 +68,49 @@ def create_app(config_name=None):
         from datetime import datetime
         return {'now': datetime.now()}
     
-    # Configure the database
+    # Configure the database; explicit SQLALCHEMY_ENGINE_OPTIONS override the DB_POOL_* settings
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **engine_options(app.config),
+        **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    }
     db.init_app(app)
-    
-    # Create all database tables
     with app.app_context():
-        db.create_all()
+        for bind_key, engine in db.engines.items():
+            instrument_engine(engine, bind_key or 'default', app.config)
+    
+    # Fail requests that issue too many SQL statements (N+1 guard, on in testing)
+    init_query_guard(app)
+    
+    # Keep the dashboard's summary counts in step with test run changes
+    init_dashboard_stats()
+    
+    # Cross-run analytics results are cached per process
+    init_analytics_cache(app)
+    
+    # Test run status changes are fanned out to live status streams
+    init_run_events(app)
+    
+    # Create all database tables (in fast-start mode the schema is managed
+    # by Alembic/init_db.py instead)
+    if not app.config.get('FAST_START'):
+        with app.app_context():
+            db.create_all()
     
     # Configure storage
     # Pass all config to get_storage() which will choose relevant parameters
     storage = get_storage(
         storage_type=app.config['STORAGE_TYPE'],
         base_dir=app.config['STORAGE_BASE_DIR'],
+        x_accel_prefix=app.config.get('STORAGE_X_ACCEL_PREFIX'),
+        buffer_size=app.config.get('STORAGE_BUFFER_SIZE'),
         **{k.replace('STORAGE_S3_', '').lower(): v 
            for k, v in app.config.items() if k.startswith('STORAGE_S3_')}
     )
     
+    # Check the storage backend now unless it should connect on first use
+    if not app.config.get('FAST_START'):
+        storage.connect()
+    
     # Add storage to the app context
     app.storage = storage
     
@@ -86,6 +119,9 @@ def create_app(config_name=None):
     from api.routes.device import device_blueprint
     from api.routes.test_configuration import test_configuration_blueprint
     from api.routes.test_run import test_run_blueprint
+    from api.routes.campaign import campaign_blueprint
+    from api.routes.test_metric import test_metric_blueprint
+    from api.routes.analytics import analytics_blueprint
     from api.routes.report import report_blueprint
     from api.routes.media import media_blueprint
     from api.routes.user import user_blueprint
@@ -95,6 +131,9 @@ def create_app(config_name=None):
     app.register_blueprint(device_blueprint, url_prefix='/api/devices')
     app.register_blueprint(test_configuration_blueprint, url_prefix='/api/test-configs')
     app.register_blueprint(test_run_blueprint, url_prefix='/api/test-runs')
+    app.register_blueprint(campaign_blueprint, url_prefix='/api/campaigns')
+    app.register_blueprint(test_metric_blueprint, url_prefix='/api/test-metrics')
+    app.register_blueprint(analytics_blueprint, url_prefix='/api/analytics')
     app.register_blueprint(report_blueprint, url_prefix='/api/reports')
     app.register_blueprint(media_blueprint, url_prefix='/api/media')
     app.register_blueprint(user_blueprint, url_prefix='/api/users')
@@ -107,6 +146,10 @@ def create_app(config_name=None):
     app.register_blueprint(home_blueprint)
     app.register_blueprint(dashboard_blueprint, url_prefix='/dashboard')
     
+    # Register CLI commands
+    from api.cli import register_commands
+    register_commands(app)
+    
     # Error handlers
     @app.errorhandler(404)
     def not_found(error):
@@ -125,6 +168,28 @@ def create_app(config_name=None):
     def status():
         return jsonify({'status': 'ok'})
     
+    # Create a route for operational metrics (they expose pool, queue and
+    # per-environment state, so they need a token like the rest of the API)
+    @app.route('/api/metrics')
+    @jwt_required()
+    def metrics():
+        from integration.session_pool import get_session_pool
+        from storage import transfer_stats
+        from api.user_cache import get_user_cache
+        from api.analytics import get_analytics_cache
+        from api.controllers.run_scheduler import scheduler_stats
+        from api.run_events import get_run_events
+        from database.pool import pool_stats
+        return jsonify({
+            'db_pool': pool_stats(),
+            'bp_sessions': get_session_pool(app.config).stats(),
+            'storage_uploads': transfer_stats(),
+            'user_cache': get_user_cache(app).stats(),
+            'analytics_cache': get_analytics_cache(app).stats(),
+            'scheduler': scheduler_stats(app),
+            'run_events': get_run_events(app).stats()
+        })
+    
     return app
 
 
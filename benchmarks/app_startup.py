@@ -0,0 +1,97 @@
+"""
+Application start-up benchmark.
+
+Times each phase of bringing up a web worker, in a fresh interpreter per
+sample, with and without fast-start mode (FAST_START):
+
+- import: importing the app module
+- create_app: building the app (schema creation, storage check, blueprints)
+- first request: the first request served (GET /api/status)
+- first storage call: the first storage operation (connects lazily in fast-start mode)
+
+It also reports which heavy optional modules (boto3, magic, aiohttp, numpy, the BP
+agent ``src`` package) were loaded by the time the first request was served.
+Uses the configuration selected by FLASK_ENV, e.g.::
+
+    FLASK_ENV=testing TEST_DATABASE_URI=sqlite:////tmp/bench.db python -m benchmarks.app_startup
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PHASES = ('import', 'create_app', 'first request', 'first storage call')
+HEAVY_MODULES = ('boto3', 'magic', 'aiohttp', 'numpy', 'src')
+
+
+def run_child():
+    """Time the start-up phases in this process and print them as JSON."""
+    timings = {}
+
+    started = time.perf_counter()
+    from app import create_app
+    timings['import'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    app = create_app()
+    timings['create_app'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    app.test_client().get('/api/status')
+    timings['first request'] = time.perf_counter() - started
+
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    started = time.perf_counter()
+    app.storage.file_exists('benchmarks/app_startup')
+    timings['first storage call'] = time.perf_counter() - started
+
+    print(json.dumps({'timings': timings, 'loaded': loaded}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark application start-up.')
+    parser.add_argument('--processes', type=int, default=5, help='fresh processes per mode')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child()
+        return
+
+    results = {}
+    for mode, fast_start in (('default', 'false'), ('fast start', 'true')):
+        samples = {phase: [] for phase in PHASES}
+        loaded = set()
+        for _ in range(args.processes):
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.app_startup', '--child'],
+                check=True, capture_output=True, text=True,
+                env=dict(os.environ, FAST_START=fast_start)
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            for phase in PHASES:
+                samples[phase].append(result['timings'][phase])
+            loaded.update(result['loaded'])
+        results[mode] = (samples, loaded)
+
+    print(f"{'phase':<20}" + ''.join(f"{mode + ' ms':>18}" for mode in results))
+    for phase in PHASES + ('total',):
+        row = f"{phase:<20}"
+        for samples, _ in results.values():
+            if phase == 'total':
+                value = sum(statistics.median(samples[name]) for name in PHASES)
+            else:
+                value = statistics.median(samples[phase])
+            row += f"{value * 1000:>18.2f}"
+        print(row)
+    for mode, (_, loaded) in results.items():
+        print(f"{mode}: loaded before first request: {', '.join(sorted(loaded)) or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
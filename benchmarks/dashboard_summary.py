@@ -0,0 +1,106 @@
+"""
+Dashboard aggregates benchmark.
+
+Seeds a database with test runs spread over devices, days and statuses, then
+times the dashboard's aggregates (counts by status, pass/fail per device,
+runs per day) read from the summary tables against the same aggregates
+computed live over test_runs. Uses the configuration selected by
+FLASK_ENV; point it at an empty database, e.g.::
+
+    FLASK_ENV=testing TEST_DATABASE_URI=sqlite:////tmp/bench.db python -m benchmarks.dashboard_summary --runs 100000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import Date, cast, func, select
+
+STATUSES = ('completed', 'completed', 'completed', 'failed', 'stopped', 'running')
+
+
+def seed(db, runs, devices, days):
+    """Insert devices and test runs, then rebuild the summary tables."""
+    from api.dashboard_stats import rebuild_test_run_stats
+    from api.models import Device, Environment, TestConfiguration, TestRun
+
+    environment = Environment(name='bench', ip_address='127.0.0.1', port=443, username='bench', password='bench')
+    config = TestConfiguration(name='bench', test_type='bench', config_data={})
+    device_rows = [Device(name=f'bench-{i}', type='bench') for i in range(devices)]
+    db.session.add_all([environment, config, *device_rows])
+    db.session.commit()
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            'test_config_id': config.id,
+            'environment_id': environment.id,
+            'device_id': random.choice(device_rows).id,
+            'bp_test_id': 'bench',
+            'bp_run_id': str(i),
+            'status': random.choice(STATUSES),
+            'created_at': now - timedelta(days=random.randrange(days), seconds=random.randrange(86400))
+        }
+        for i in range(runs)
+    ]
+    # Bulk insert (bypasses the flush hook), then rebuild the summaries once
+    db.session.execute(TestRun.__table__.insert(), rows)
+    rebuild_test_run_stats()
+    db.session.commit()
+
+
+def live_summary(db, days):
+    """The dashboard aggregates computed from test_runs."""
+    from api.models import TestRun
+
+    day = func.date(TestRun.created_at) if db.engine.dialect.name == 'sqlite' else cast(TestRun.created_at, Date)
+    since = datetime.utcnow() - timedelta(days=days)
+    return (
+        db.session.execute(
+            select(TestRun.device_id, TestRun.status, func.count()).group_by(TestRun.device_id, TestRun.status)
+        ).all(),
+        db.session.execute(
+            select(day, func.count()).where(TestRun.created_at >= since).group_by(day)
+        ).all()
+    )
+
+
+def time_calls(function, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the dashboard aggregates.')
+    parser.add_argument('--runs', type=int, default=100000, help='test runs to seed')
+    parser.add_argument('--devices', type=int, default=20, help='devices to spread runs over')
+    parser.add_argument('--days', type=int, default=365, help='days of history to spread runs over')
+    parser.add_argument('--repeat', type=int, default=50, help='timed calls per variant')
+    args = parser.parse_args()
+
+    from app import create_app
+    from api.dashboard_stats import DEFAULT_DAYS, dashboard_summary
+    from api.models import TestRun, db
+
+    app = create_app()
+    with app.app_context():
+        if TestRun.query.count():
+            parser.error('the database already has test runs; use an empty one')
+        seed(db, args.runs, args.devices, args.days)
+
+        live = time_calls(lambda: live_summary(db, DEFAULT_DAYS), args.repeat)
+        summary = time_calls(dashboard_summary, args.repeat)
+
+    print(f"{args.runs} test runs on {args.devices} devices over {args.days} days")
+    print(f"{'live aggregation':<20}{live * 1000:>12.3f} ms")
+    print(f"{'summary tables':<20}{summary * 1000:>12.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
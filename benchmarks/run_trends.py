@@ -0,0 +1,113 @@
+"""
+Cross-run analytics benchmark.
+
+Seeds a database with one test configuration's completed runs on one device,
+each with a handful of metric values, then times the trends analysis
+(``api.analytics.run_trends``) over all of them: uncached, split into loading
+and computing, and cached. Uses the configuration selected by FLASK_ENV;
+point it at an empty database, e.g.::
+
+    FLASK_ENV=testing TEST_DATABASE_URI=sqlite:////tmp/bench.db python -m benchmarks.run_trends --runs 10000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+SERIES = {
+    ('throughput', 'avg'): (9400.0, 50.0),
+    ('latency', 'avg'): (0.42, 0.02),
+    ('latency', 'p99'): (1.3, 0.05),
+    ('transactions', 'failed'): (50.0, 5.0),
+    ('strikes', 'allowed'): (13.0, 1.0),
+    ('strikes', 'blocked'): (1187.0, 1.0),
+}
+
+
+def seed(db, runs):
+    """Insert a configuration, a device and ``runs`` completed runs with metrics."""
+    from api.models import Device, Environment, TestConfiguration, TestMetric, TestRun
+
+    environment = Environment(name='bench', ip_address='127.0.0.1', port=443, username='bench', password='bench')
+    config = TestConfiguration(name='bench', test_type='bench', config_data={})
+    device = Device(name='bench', type='bench')
+    db.session.add_all([environment, config, device])
+    db.session.commit()
+
+    started = datetime.utcnow() - timedelta(hours=runs)
+    db.session.execute(TestRun.__table__.insert(), [
+        {
+            'test_config_id': config.id,
+            'environment_id': environment.id,
+            'device_id': device.id,
+            'bp_test_id': 'bench',
+            'bp_run_id': str(i),
+            'status': 'completed',
+            'created_at': started + timedelta(hours=i),
+            'end_time': started + timedelta(hours=i, minutes=10)
+        }
+        for i in range(runs)
+    ])
+    run_ids = [run_id for (run_id,) in db.session.query(TestRun.id).filter_by(test_config_id=config.id)]
+    db.session.execute(TestMetric.__table__.insert(), [
+        {
+            'test_run_id': run_id,
+            'metric': metric,
+            'component': component,
+            'timestamp': started,
+            'value': random.gauss(mean, deviation)
+        }
+        for run_id in run_ids
+        for (metric, component), (mean, deviation) in SERIES.items()
+    ])
+    db.session.commit()
+    return config.id, device.id
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cross-run analytics.')
+    parser.add_argument('--runs', type=int, default=10000, help='test runs to seed and analyse')
+    parser.add_argument('--repeat', type=int, default=5, help='timed calls per variant')
+    args = parser.parse_args()
+
+    from app import create_app
+    from api.analytics import DEFAULT_BASELINE, DEFAULT_MOVING_AVERAGE, DEFAULT_SERIES, DEFAULT_THRESHOLD
+    from api.analytics import _load, compute_trends, get_analytics_cache, parse_series, run_trends
+    from api.models import TestRun, db
+
+    app = create_app()
+    with app.test_request_context():
+        if TestRun.query.count():
+            parser.error('the database already has test runs; use an empty one')
+        config_id, device_id = seed(db, args.runs)
+        series = parse_series(DEFAULT_SERIES)
+        cache = get_analytics_cache()
+
+        samples = {'load': [], 'compute': [], 'uncached total': [], 'cached total': []}
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            _, _, values = _load(config_id, device_id, args.runs, series)
+            samples['load'].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            compute_trends(values, DEFAULT_MOVING_AVERAGE, DEFAULT_BASELINE, DEFAULT_THRESHOLD)
+            samples['compute'].append(time.perf_counter() - started)
+
+            cache.clear()
+            started = time.perf_counter()
+            run_trends(config_id, device_id, runs=args.runs)
+            samples['uncached total'].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            run_trends(config_id, device_id, runs=args.runs)
+            samples['cached total'].append(time.perf_counter() - started)
+
+    print(f"{args.runs} runs x {len(series)} series")
+    for name, values in samples.items():
+        print(f"{name:<16}{statistics.median(values) * 1000:>12.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Celery task start-up benchmark.
+
+Measures how long a trivial task takes to start and run:
+
+- cold: the first task in a fresh worker process, which builds the worker app
+- warm: later tasks in the same process, which reuse it
+- per-task app: the previous behaviour of building a Flask app inside every task
+
+Tasks are called in-process through the task's ``__call__`` (what a worker
+runs for each message), so no broker or result backend is needed. Each cold
+sample runs in a new interpreter. Uses the configuration selected by
+FLASK_ENV, e.g.::
+
+    FLASK_ENV=testing TEST_DATABASE_URI=sqlite:////tmp/bench.db python -m benchmarks.task_startup
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _summary(samples):
+    return {
+        'n': len(samples),
+        'mean_ms': statistics.mean(samples) * 1000,
+        'p50_ms': _percentile(samples, 0.5) * 1000,
+        'p95_ms': _percentile(samples, 0.95) * 1000
+    }
+
+
+def run_child(warm_runs, legacy_runs):
+    """Time tasks in this process and print the samples as JSON."""
+    from sqlalchemy import text
+
+    from api.models import db
+    from api.tasks import celery
+
+    @celery.task(name='benchmarks.noop')
+    def noop():
+        db.session.execute(text('SELECT 1'))
+
+    started = time.perf_counter()
+    noop()
+    cold = time.perf_counter() - started
+
+    warm = []
+    for _ in range(warm_runs):
+        started = time.perf_counter()
+        noop()
+        warm.append(time.perf_counter() - started)
+
+    from app import create_app
+    legacy = []
+    for _ in range(legacy_runs):
+        started = time.perf_counter()
+        app = create_app()
+        with app.app_context():
+            db.session.execute(text('SELECT 1'))
+        legacy.append(time.perf_counter() - started)
+
+    print(json.dumps({'cold': cold, 'warm': warm, 'legacy': legacy}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Celery task start-up.')
+    parser.add_argument('--processes', type=int, default=5, help='fresh processes (cold samples)')
+    parser.add_argument('--warm', type=int, default=200, help='warm tasks per process')
+    parser.add_argument('--legacy', type=int, default=10, help='per-task app builds per process')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.warm, args.legacy)
+        return
+
+    cold, warm, legacy = [], [], []
+    for _ in range(args.processes):
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.task_startup', '--child',
+             '--warm', str(args.warm), '--legacy', str(args.legacy)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        samples = json.loads(output.strip().splitlines()[-1])
+        cold.append(samples['cold'])
+        warm.extend(samples['warm'])
+        legacy.extend(samples['legacy'])
+
+    print(f"{'':<14}{'n':>6}{'mean ms':>12}{'p50 ms':>12}{'p95 ms':>12}")
+    for label, samples in (('cold', cold), ('warm', warm), ('per-task app', legacy)):
+        if samples:
+            stats = _summary(samples)
+            print(f"{label:<14}{stats['n']:>6}{stats['mean_ms']:>12.2f}{stats['p50_ms']:>12.2f}{stats['p95_ms']:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
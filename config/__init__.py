@@ -15,13 +15,40 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-key-do-not-use-in-production')
     DEBUG = False
     TESTING = False
+    # Fast start: leave schema creation to Alembic/init_db.py and connect to
+    # storage on first use instead of while the app is created
+    FAST_START = os.getenv('FAST_START', 'False').lower() in ('true', '1', 't')
     
     # Database settings
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Connection pool (per process, so size it for gunicorn workers x threads
+    # plus Celery concurrency against the server's max_connections)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 30))  # seconds to wait for a connection
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))  # seconds before a connection is replaced
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'True').lower() in ('true', '1', 't')
+    DB_STATEMENT_TIMEOUT = int(os.getenv('DB_STATEMENT_TIMEOUT', 0))  # milliseconds, 0 = no limit
+    # Connecting through PgBouncer (transaction pooling): no client-side pool
+    DB_PGBOUNCER = os.getenv('DB_PGBOUNCER', 'False').lower() in ('true', '1', 't')
+    # Maximum SQL statements per request (0 = unchecked); exceeding it fails
+    # the request in testing and logs a warning otherwise
+    SQL_QUERY_LIMIT = int(os.getenv('SQL_QUERY_LIMIT', 0))
     
     # JWT settings
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', SECRET_KEY)
     JWT_ACCESS_TOKEN_EXPIRES = 3600  # 1 hour
+    # Put is_admin in access tokens so admin checks need no user lookup; a
+    # change of admin status then takes effect when the token is refreshed
+    JWT_ADMIN_CLAIM = os.getenv('JWT_ADMIN_CLAIM', 'False').lower() in ('true', '1', 't')
+    
+    # Cache of users resolved from JWT identities (per process)
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 1024))
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 60))  # seconds
+    
+    # Cross-run analytics cache (per process); results also expire when runs change
+    ANALYTICS_CACHE_SIZE = int(os.getenv('ANALYTICS_CACHE_SIZE', 128))
+    ANALYTICS_CACHE_TTL = int(os.getenv('ANALYTICS_CACHE_TTL', 300))  # seconds
     
     # Storage settings
     STORAGE_TYPE = os.getenv('STORAGE_TYPE', 'local')
@@ -31,6 +58,35 @@ class Config:
     STORAGE_S3_SECRET_KEY = os.getenv('STORAGE_S3_SECRET_KEY')
     STORAGE_S3_REGION = os.getenv('STORAGE_S3_REGION')
     STORAGE_S3_ENDPOINT = os.getenv('STORAGE_S3_ENDPOINT')
+    # Presigned direct transfers: URL lifetime in seconds, and the file size
+    # from which direct uploads are split into parts of MULTIPART_PART_SIZE bytes
+    STORAGE_S3_PRESIGN_EXPIRES = int(os.getenv('STORAGE_S3_PRESIGN_EXPIRES', 3600))
+    STORAGE_S3_MULTIPART_THRESHOLD = int(os.getenv('STORAGE_S3_MULTIPART_THRESHOLD', 100 * 1024 * 1024))
+    STORAGE_S3_MULTIPART_PART_SIZE = int(os.getenv('STORAGE_S3_MULTIPART_PART_SIZE', 16 * 1024 * 1024))
+    # Parts uploaded in parallel when the CMS itself stores a large file in S3
+    STORAGE_S3_UPLOAD_CONCURRENCY = int(os.getenv('STORAGE_S3_UPLOAD_CONCURRENCY', 4))
+    # Redirect downloads to presigned S3 URLs instead of streaming them through Flask
+    STORAGE_S3_REDIRECT_DOWNLOADS = os.getenv('STORAGE_S3_REDIRECT_DOWNLOADS', 'False').lower() in ('true', '1', 't')
+    # Internal nginx location serving STORAGE_BASE_DIR; when set, local downloads
+    # are handed to nginx via X-Accel-Redirect instead of being sent by Flask
+    STORAGE_X_ACCEL_PREFIX = os.getenv('STORAGE_X_ACCEL_PREFIX')
+    # Copy buffer in bytes for local uploads (rounded to whole memory pages by default)
+    STORAGE_BUFFER_SIZE = int(os.getenv('STORAGE_BUFFER_SIZE', 1024 * 1024))
+    # Orphaned file cleanup: files younger than ORPHAN_MIN_AGE seconds are kept
+    # (their upload may still be in flight), files are reconciled
+    # ORPHAN_BATCH_SIZE at a time, and an interrupted run resumes from the
+    # checkpoint file
+    ORPHAN_MIN_AGE = int(os.getenv('ORPHAN_MIN_AGE', 24 * 3600))
+    ORPHAN_BATCH_SIZE = int(os.getenv('ORPHAN_BATCH_SIZE', 1000))
+    ORPHAN_CHECKPOINT_FILE = os.getenv('ORPHAN_CHECKPOINT_FILE', os.path.join(os.getcwd(), 'orphan_cleanup.json'))
+    
+    # List endpoints: default and maximum page size
+    API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', 50))
+    API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', 500))
+    
+    # Celery settings
+    CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+    CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
     
     # File upload settings
     MAX_CONTENT_LENGTH = 100 * 1024 * 1024  # 100 MB
@@ -45,6 +101,53 @@ class Config:
     BP_MCP_AGENT_PORT = os.getenv('BP_MCP_AGENT_PORT', '5000')
     BP_MCP_AGENT_USERNAME = os.getenv('BP_MCP_AGENT_USERNAME', 'admin')
     BP_MCP_AGENT_PASSWORD = os.getenv('BP_MCP_AGENT_PASSWORD', 'admin')
+    # Checkout of the agent package (src.*), used in-process when importable;
+    # otherwise, or with BP_MCP_AGENT_IN_PROCESS=false, the agent HTTP API is used
+    BP_MCP_AGENT_PATH = os.getenv('BP_MCP_AGENT_PATH')
+    BP_MCP_AGENT_IN_PROCESS = os.getenv('BP_MCP_AGENT_IN_PROCESS', 'True').lower() in ('true', '1', 't')
+    
+    # Breaking Point MCP Agent HTTP client settings
+    BP_MCP_AGENT_MAX_CONNECTIONS = int(os.getenv('BP_MCP_AGENT_MAX_CONNECTIONS', '100'))
+    BP_MCP_AGENT_MAX_CONNECTIONS_PER_HOST = int(os.getenv('BP_MCP_AGENT_MAX_CONNECTIONS_PER_HOST', '10'))
+    BP_MCP_AGENT_TIMEOUT = float(os.getenv('BP_MCP_AGENT_TIMEOUT', '300'))  # seconds
+    BP_MCP_AGENT_CONNECT_TIMEOUT = float(os.getenv('BP_MCP_AGENT_CONNECT_TIMEOUT', '10'))  # seconds
+    BP_MCP_AGENT_RETRIES = int(os.getenv('BP_MCP_AGENT_RETRIES', '3'))
+    BP_CHART_FETCH_CONCURRENCY = int(os.getenv('BP_CHART_FETCH_CONCURRENCY', '4'))
+    
+    # Breaking Point session pool settings
+    BP_SESSION_POOL_MAX_SESSIONS = int(os.getenv('BP_SESSION_POOL_MAX_SESSIONS', '4'))  # per chassis
+    BP_SESSION_TTL = int(os.getenv('BP_SESSION_TTL', '900'))  # seconds before re-login
+    BP_SESSION_ACQUIRE_TIMEOUT = float(os.getenv('BP_SESSION_ACQUIRE_TIMEOUT', '30'))  # seconds
+    
+    # Test run status poller settings (seconds)
+    RUN_POLL_TICK = float(os.getenv('RUN_POLL_TICK', '1'))
+    RUN_POLL_MIN_INTERVAL = float(os.getenv('RUN_POLL_MIN_INTERVAL', '2'))
+    RUN_POLL_MAX_INTERVAL = float(os.getenv('RUN_POLL_MAX_INTERVAL', '60'))
+    RUN_POLL_DEFAULT_INTERVAL = float(os.getenv('RUN_POLL_DEFAULT_INTERVAL', '10'))
+    
+    # Test run scheduler: concurrent runs per environment (chassis) and per
+    # device unless set on the environment/device, and seconds a run may stay
+    # 'starting' before it is failed
+    SCHEDULER_ENVIRONMENT_SLOTS = int(os.getenv('SCHEDULER_ENVIRONMENT_SLOTS', '1'))
+    SCHEDULER_DEVICE_SLOTS = int(os.getenv('SCHEDULER_DEVICE_SLOTS', '1'))
+    SCHEDULER_START_TIMEOUT = float(os.getenv('SCHEDULER_START_TIMEOUT', '300'))
+    # Runs started in parallel per scheduler tick (each holds a pooled BP session)
+    SCHEDULER_DISPATCH_CONCURRENCY = int(os.getenv('SCHEDULER_DISPATCH_CONCURRENCY', '4'))
+    # Most test runs one campaign may launch
+    CAMPAIGN_MAX_RUNS = int(os.getenv('CAMPAIGN_MAX_RUNS', '10000'))
+
+    # Live test run status streams: Redis URL whose pub/sub channel carries
+    # status events between processes (unset: in-process only, fed by a
+    # database watcher), seconds between watcher checks and keepalives,
+    # seconds before a stream is closed for the client to reconnect, and
+    # streams served at once per process (each holds a server thread; keep
+    # it well below the worker's thread count)
+    RUN_EVENTS_REDIS_URL = os.getenv('RUN_EVENTS_REDIS_URL')
+    RUN_EVENTS_CHANNEL = os.getenv('RUN_EVENTS_CHANNEL', 'bp_cms:run_events')
+    RUN_EVENTS_WATCH_INTERVAL = float(os.getenv('RUN_EVENTS_WATCH_INTERVAL', '2'))
+    RUN_EVENTS_KEEPALIVE = float(os.getenv('RUN_EVENTS_KEEPALIVE', '15'))
+    RUN_EVENTS_MAX_STREAM = float(os.getenv('RUN_EVENTS_MAX_STREAM', '3600'))
+    RUN_EVENTS_MAX_STREAMS = int(os.getenv('RUN_EVENTS_MAX_STREAMS', '8'))
 
 
 class DevelopmentConfig(Config):
@@ -60,6 +163,7 @@ class TestingConfig(Config):
     """Testing configuration."""
     
     TESTING = True
+    SQL_QUERY_LIMIT = int(os.getenv('SQL_QUERY_LIMIT', 20))
     
     # Database settings
     SQLALCHEMY_DATABASE_URI = os.getenv('TEST_DATABASE_URI', 'sqlite:///bp_mcp_agent_cms_test.db')
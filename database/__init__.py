@@ -8,9 +8,13 @@ from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
-def get_engine(uri):
-    """Get a SQLAlchemy engine."""
-    return create_engine(uri)
+def get_engine(uri, config=None):
+    """Get a SQLAlchemy engine, pooled according to the DB_POOL_* settings in ``config``."""
+    from .pool import engine_options, instrument_engine
+    config = config or {}
+    engine = create_engine(uri, **engine_options(config, uri))
+    instrument_engine(engine, engine.url.render_as_string(hide_password=True), config)
+    return engine
 
 def get_session_factory(engine):
     """Get a SQLAlchemy session factory."""
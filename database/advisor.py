@@ -0,0 +1,151 @@
+"""
+Index advisor: EXPLAIN the application's hot queries and flag full table scans.
+"""
+
+import re
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import func
+
+# A sample ID for queries filtered by a foreign key
+SAMPLE_ID = 1
+
+
+def canonical_queries() -> List[Tuple[str, Callable]]:
+    """
+    The application's hot queries, as (name, query builder) pairs.
+
+    Must be called in an app context; the builders return SQLAlchemy queries.
+    """
+    from api.models import db
+    from api.models.media import Media
+    from api.models.report import Report
+    from api.models.test_metric import TestMetric
+    from api.models.test_result import TestResult
+    from api.models.test_run import TestRun
+
+    return [
+        ('dashboard: recent test runs',
+         lambda: TestRun.query.order_by(TestRun.created_at.desc()).limit(5)),
+        ('poller: running test runs',
+         lambda: TestRun.query.filter(TestRun.status == 'running')),
+        ('scheduler: queued test runs',
+         lambda: TestRun.query.filter(TestRun.status == 'scheduled').order_by(
+             TestRun.priority.desc(), TestRun.created_at, TestRun.id)),
+        ('campaign progress',
+         lambda: db.session.query(TestRun.status, func.count(TestRun.id)).filter(
+             TestRun.campaign_id == SAMPLE_ID
+         ).group_by(TestRun.status)),
+        ('poller: expected durations',
+         lambda: db.session.query(TestRun.test_config_id, func.avg(TestRun.duration)).filter(
+             TestRun.test_config_id.in_([SAMPLE_ID]),
+             TestRun.status == 'completed',
+             TestRun.duration.isnot(None)
+         ).group_by(TestRun.test_config_id)),
+        ('test runs by status',
+         lambda: TestRun.query.filter(TestRun.status == 'completed').order_by(TestRun.created_at.desc()).limit(50)),
+        ('test runs by configuration',
+         lambda: TestRun.query.filter(TestRun.test_config_id == SAMPLE_ID).order_by(TestRun.created_at.desc()).limit(50)),
+        ('test runs by environment',
+         lambda: TestRun.query.filter(TestRun.environment_id == SAMPLE_ID).order_by(TestRun.created_at.desc()).limit(50)),
+        ('test runs by device',
+         lambda: TestRun.query.filter(TestRun.device_id == SAMPLE_ID).order_by(TestRun.created_at.desc()).limit(50)),
+        ('reports of a test run',
+         lambda: Report.query.filter_by(test_run_id=SAMPLE_ID).order_by(Report.created_at.desc())),
+        ('media of a test run',
+         lambda: Media.query.filter_by(test_run_id=SAMPLE_ID).order_by(Media.created_at.desc())),
+        ('result of a test run',
+         lambda: TestResult.query.filter_by(test_run_id=SAMPLE_ID)),
+        ('metric over time',
+         lambda: TestMetric.query.filter(
+             TestMetric.metric == 'latency',
+             TestMetric.component == 'p99',
+             TestMetric.timestamp >= datetime(2000, 1, 1)
+         ).order_by(TestMetric.timestamp)),
+        ('metrics of a test run',
+         lambda: TestMetric.query.filter_by(test_run_id=SAMPLE_ID)),
+        ('orphan cleanup: referenced reports',
+         lambda: db.session.query(Report.file_path).filter(Report.file_path.in_(['reports/1/report.pdf']))),
+        ('orphan cleanup: referenced media',
+         lambda: db.session.query(Media.file_path).filter(Media.file_path.in_(['media/1/capture.mp4']))),
+    ]
+
+
+def explain(connection, query) -> List[str]:
+    """
+    Get the plan of a query.
+
+    Args:
+        connection: SQLAlchemy connection
+        query: SQLAlchemy query or select
+
+    Returns:
+        List[str]: Plan lines (for MySQL, one ``table: access type`` line per table)
+    """
+    statement = getattr(query, 'statement', query)
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+    dialect = connection.dialect.name
+
+    if dialect == 'sqlite':
+        return [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    if dialect == 'mysql':
+        rows = connection.exec_driver_sql(f"EXPLAIN {sql}").mappings()
+        return [f"{row['table']}: {row['type']} (key: {row['key']})" for row in rows]
+    return [row[0] for row in connection.exec_driver_sql(f"EXPLAIN {sql}")]
+
+
+def sequential_scans(dialect: str, plan: List[str]) -> List[str]:
+    """
+    Find the tables a plan reads in full.
+
+    Args:
+        dialect: SQLAlchemy dialect name
+        plan: Plan lines from :func:`explain`
+
+    Returns:
+        List[str]: Names of fully scanned tables
+    """
+    tables = []
+    for line in plan:
+        if dialect == 'sqlite':
+            # "SCAN test_runs" reads the table; "SCAN ... USING INDEX" and "SEARCH" do not
+            match = re.match(r'\s*SCAN (?:TABLE )?(\w+)', line)
+            if match and 'USING' not in line:
+                tables.append(match.group(1))
+        elif dialect == 'mysql':
+            match = re.match(r'(\w+): ALL\b', line)
+            if match:
+                tables.append(match.group(1))
+        else:
+            match = re.search(r'Seq Scan on (\w+)', line)
+            if match:
+                tables.append(match.group(1))
+    return tables
+
+
+def advise(connection, prefer_indexes: bool = False) -> List[Dict]:
+    """
+    EXPLAIN every canonical query.
+
+    Args:
+        connection: SQLAlchemy connection
+        prefer_indexes: On PostgreSQL, discourage sequential scans so the plan
+            shows whether a usable index exists even on a small development
+            database (where a scan is otherwise cheapest)
+
+    Returns:
+        List[Dict]: ``name``, ``plan`` and ``seq_scans`` per query
+    """
+    if prefer_indexes and connection.dialect.name == 'postgresql':
+        connection.exec_driver_sql("SET enable_seqscan = off")
+
+    results = []
+    for name, build in canonical_queries():
+        plan = explain(connection, build())
+        results.append({
+            'name': name,
+            'plan': plan,
+            'seq_scans': sequential_scans(connection.dialect.name, plan)
+        })
+    return results
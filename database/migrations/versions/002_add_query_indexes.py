@@ -0,0 +1,63 @@
+"""add indexes for hot query paths
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns, partial index condition)
+INDEXES = [
+    ('ix_test_runs_created_at', 'test_runs', ['created_at'], None),
+    ('ix_test_runs_status_created_at', 'test_runs', ['status', 'created_at'], None),
+    ('ix_test_runs_test_config_id_created_at', 'test_runs', ['test_config_id', 'created_at'], None),
+    ('ix_test_runs_environment_id_created_at', 'test_runs', ['environment_id', 'created_at'], None),
+    ('ix_test_runs_device_id_created_at', 'test_runs', ['device_id', 'created_at'], None),
+    ('ix_test_runs_running', 'test_runs', ['id'], "status = 'running'"),
+    ('ix_reports_test_run_id_created_at', 'reports', ['test_run_id', 'created_at'], None),
+    ('ix_media_test_run_id_created_at', 'media', ['test_run_id', 'created_at'], None),
+    ('ix_test_results_test_run_id', 'test_results', ['test_run_id'], None),
+]
+
+
+def _existing_indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    for name, table, columns, where in INDEXES:
+        # Tables created by db.create_all() already have the model's indexes
+        if name in _existing_indexes(table):
+            continue
+
+        kwargs = {}
+        if where:
+            if dialect not in ('postgresql', 'sqlite'):
+                # No partial indexes (e.g. MySQL); the status index covers the poller
+                continue
+            kwargs = {'postgresql_where': sa.text(where), 'sqlite_where': sa.text(where)}
+
+        if dialect == 'postgresql':
+            # Build without locking out writes to large tables
+            with op.get_context().autocommit_block():
+                op.create_index(name, table, columns, postgresql_concurrently=True, **kwargs)
+        else:
+            op.create_index(name, table, columns, **kwargs)
+
+
+def downgrade():
+    for name, table, columns, where in reversed(INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
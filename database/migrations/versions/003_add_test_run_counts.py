@@ -0,0 +1,53 @@
+"""add test run summary tables for the dashboard
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    tables = sa.inspect(bind).get_table_names()
+
+    if 'test_run_status_counts' not in tables:
+        op.create_table(
+            'test_run_status_counts',
+            sa.Column('device_id', sa.Integer(), sa.ForeignKey('devices.id', ondelete='CASCADE'), primary_key=True),
+            sa.Column('status', sa.String(20), primary_key=True),
+            sa.Column('run_count', sa.Integer(), nullable=False)
+        )
+    if 'test_run_daily_counts' not in tables:
+        op.create_table(
+            'test_run_daily_counts',
+            sa.Column('day', sa.Date(), primary_key=True),
+            sa.Column('run_count', sa.Integer(), nullable=False)
+        )
+
+    # Backfill from the existing test runs
+    day = "date(created_at)" if bind.dialect.name == 'sqlite' else "CAST(created_at AS DATE)"
+    op.execute("DELETE FROM test_run_status_counts")
+    op.execute("DELETE FROM test_run_daily_counts")
+    op.execute(
+        "INSERT INTO test_run_status_counts (device_id, status, run_count) "
+        "SELECT device_id, status, COUNT(*) FROM test_runs GROUP BY device_id, status"
+    )
+    op.execute(
+        f"INSERT INTO test_run_daily_counts (day, run_count) "
+        f"SELECT {day}, COUNT(*) FROM test_runs WHERE created_at IS NOT NULL GROUP BY {day}"
+    )
+
+
+def downgrade():
+    op.drop_table('test_run_daily_counts')
+    op.drop_table('test_run_status_counts')
@@ -0,0 +1,43 @@
+"""add test_metrics table
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18 14:00:00.000000
+
+Existing test results are ingested with ``flask backfill-test-metrics``,
+in batches, after the upgrade.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'test_metrics' in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        'test_metrics',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('test_run_id', sa.Integer(), sa.ForeignKey('test_runs.id'), nullable=False),
+        sa.Column('metric', sa.String(50), nullable=False),
+        sa.Column('component', sa.String(100), nullable=False),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False)
+    )
+    op.create_index('ix_test_metrics_metric_component_timestamp', 'test_metrics',
+                    ['metric', 'component', 'timestamp'])
+    op.create_index('ix_test_metrics_test_run_id', 'test_metrics', ['test_run_id'])
+
+
+def downgrade():
+    op.drop_index('ix_test_metrics_test_run_id', table_name='test_metrics')
+    op.drop_index('ix_test_metrics_metric_component_timestamp', table_name='test_metrics')
+    op.drop_table('test_metrics')
@@ -0,0 +1,49 @@
+"""add file_path indexes for orphaned file cleanup
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_reports_file_path', 'reports', ['file_path']),
+    ('ix_media_file_path', 'media', ['file_path']),
+]
+
+
+def _existing_indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    for name, table, columns in INDEXES:
+        # Tables created by db.create_all() already have the model's indexes
+        if name in _existing_indexes(table):
+            continue
+
+        if dialect == 'postgresql':
+            # Build without locking out writes to large tables
+            with op.get_context().autocommit_block():
+                op.create_index(name, table, columns, postgresql_concurrently=True)
+        else:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, columns in reversed(INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,72 @@
+"""add test run scheduling fields
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _existing_indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    columns = _columns('test_runs')
+
+    # Scheduled runs get their Breaking Point IDs when they start
+    with op.batch_alter_table('test_runs') as batch_op:
+        batch_op.alter_column('bp_test_id', existing_type=sa.String(50), nullable=True)
+        batch_op.alter_column('bp_run_id', existing_type=sa.String(50), nullable=True)
+        if 'priority' not in columns:
+            batch_op.add_column(sa.Column('priority', sa.Integer(), nullable=False, server_default='0'))
+        if 'scheduled_at' not in columns:
+            batch_op.add_column(sa.Column('scheduled_at', sa.DateTime(), nullable=True))
+
+    for table in ('environments', 'devices'):
+        if 'max_concurrent_runs' not in _columns(table):
+            op.add_column(table, sa.Column('max_concurrent_runs', sa.Integer(), nullable=True))
+
+    # The scheduler's queue; without partial indexes (e.g. MySQL) the
+    # status index covers it
+    if 'ix_test_runs_scheduled' not in _existing_indexes('test_runs') and dialect in ('postgresql', 'sqlite'):
+        where = sa.text("status = 'scheduled'")
+        if dialect == 'postgresql':
+            with op.get_context().autocommit_block():
+                op.create_index('ix_test_runs_scheduled', 'test_runs', ['priority', 'created_at'],
+                                postgresql_where=where, postgresql_concurrently=True)
+        else:
+            op.create_index('ix_test_runs_scheduled', 'test_runs', ['priority', 'created_at'],
+                            sqlite_where=where)
+
+
+def downgrade():
+    if 'ix_test_runs_scheduled' in _existing_indexes('test_runs'):
+        op.drop_index('ix_test_runs_scheduled', table_name='test_runs')
+
+    for table in ('devices', 'environments'):
+        if 'max_concurrent_runs' in _columns(table):
+            op.drop_column(table, 'max_concurrent_runs')
+
+    # Runs that never started have no Breaking Point IDs
+    op.execute("UPDATE test_runs SET bp_test_id = '' WHERE bp_test_id IS NULL")
+    op.execute("UPDATE test_runs SET bp_run_id = '' WHERE bp_run_id IS NULL")
+    with op.batch_alter_table('test_runs') as batch_op:
+        batch_op.drop_column('scheduled_at')
+        batch_op.drop_column('priority')
+        batch_op.alter_column('bp_test_id', existing_type=sa.String(50), nullable=False)
+        batch_op.alter_column('bp_run_id', existing_type=sa.String(50), nullable=False)
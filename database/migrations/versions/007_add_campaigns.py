@@ -0,0 +1,71 @@
+"""add campaigns
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def _tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _existing_indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if 'campaigns' not in _tables():
+        op.create_table(
+            'campaigns',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(100), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.Column('run_count', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('created_by', sa.String(100), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True)
+        )
+
+    if 'campaign_id' not in _columns('test_runs'):
+        with op.batch_alter_table('test_runs') as batch_op:
+            batch_op.add_column(sa.Column('campaign_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_test_runs_campaign_id', 'campaigns', ['campaign_id'], ['id'])
+
+    # Campaign progress: runs per status of one campaign
+    if 'ix_test_runs_campaign_id_status' not in _existing_indexes('test_runs'):
+        if dialect == 'postgresql':
+            # Build without locking out the poller's and scheduler's writes
+            with op.get_context().autocommit_block():
+                op.create_index('ix_test_runs_campaign_id_status', 'test_runs', ['campaign_id', 'status'],
+                                postgresql_concurrently=True)
+        else:
+            op.create_index('ix_test_runs_campaign_id_status', 'test_runs', ['campaign_id', 'status'])
+
+
+def downgrade():
+    if 'ix_test_runs_campaign_id_status' in _existing_indexes('test_runs'):
+        op.drop_index('ix_test_runs_campaign_id_status', table_name='test_runs')
+
+    if 'campaign_id' in _columns('test_runs'):
+        with op.batch_alter_table('test_runs') as batch_op:
+            batch_op.drop_constraint('fk_test_runs_campaign_id', type_='foreignkey')
+            batch_op.drop_column('campaign_id')
+
+    if 'campaigns' in _tables():
+        op.drop_table('campaigns')
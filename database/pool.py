@@ -0,0 +1,250 @@
+"""
+Connection pool configuration and metrics for the SQLAlchemy engines.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Defaults used when the DB_* settings are missing
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 10
+DEFAULT_POOL_TIMEOUT = 30  # seconds to wait for a connection
+DEFAULT_POOL_RECYCLE = 1800  # seconds; below typical server/proxy idle timeouts
+
+
+class PoolMetrics:
+    """Thread-safe checkout counters for one engine's pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.connects = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.waits = 0
+
+    def record_wait(self, seconds: float, overflowed: bool = False):
+        """Count the time spent getting a connection from the pool."""
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            if overflowed:
+                self.overflow_events += 1
+
+    def record_timeout(self, seconds: float):
+        """Count a checkout that gave up waiting for a connection."""
+        with self._lock:
+            self.timeouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def record_checkout(self):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def record_checkin(self):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def record_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def record_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get a snapshot of the counters.
+
+        Returns:
+            Dict[str, Any]: Counters plus average and maximum checkout wait in milliseconds
+        """
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'in_use': self.in_use,
+                'max_in_use': self.max_in_use,
+                'connects': self.connects,
+                'overflow_events': self.overflow_events,
+                'timeouts': self.timeouts,
+                'invalidations': self.invalidations,
+                'avg_wait_ms': self.wait_seconds / self.waits * 1000 if self.waits else None,
+                'max_wait_ms': self.max_wait_seconds * 1000
+            }
+
+
+class _MeteredPoolMixin:
+    """Times checkouts, including waits for a free connection and overflow."""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def connect(self):
+        started = time.perf_counter()
+        overflow = self.overflow() if isinstance(self, QueuePool) else 0
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        if self.metrics is not None:
+            overflowed = isinstance(self, QueuePool) and self.overflow() > max(overflow, 0)
+            self.metrics.record_wait(time.perf_counter() - started, overflowed)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() replaces the pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class MeteredQueuePool(_MeteredPoolMixin, QueuePool):
+    """QueuePool that records checkout wait times and overflow events."""
+
+
+class MeteredNullPool(_MeteredPoolMixin, NullPool):
+    """NullPool (one connection per checkout) that records connect times."""
+
+
+def engine_options(config: Dict[str, Any], uri: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build ``create_engine`` options from the DB_* settings.
+
+    SQLite keeps SQLAlchemy's default pool. For server databases a
+    :class:`MeteredQueuePool` is sized by DB_POOL_SIZE/DB_MAX_OVERFLOW, or,
+    with DB_PGBOUNCER, a :class:`MeteredNullPool` leaves pooling to
+    PgBouncer. DB_STATEMENT_TIMEOUT (milliseconds) is applied per connection
+    on PostgreSQL and MySQL; in PgBouncer mode it is applied per
+    transaction instead (see :func:`instrument_engine`).
+
+    Args:
+        config: Flask configuration
+        uri: Database URI (defaults to SQLALCHEMY_DATABASE_URI)
+
+    Returns:
+        Dict[str, Any]: Keyword arguments for ``create_engine``
+    """
+    url = make_url(uri or config['SQLALCHEMY_DATABASE_URI'])
+    backend = url.get_backend_name()
+    if backend == 'sqlite':
+        return {}
+
+    statement_timeout = int(config.get('DB_STATEMENT_TIMEOUT') or 0)
+    options: Dict[str, Any] = {}
+    connect_args: Dict[str, Any] = {}
+
+    if config.get('DB_PGBOUNCER'):
+        # PgBouncer does the pooling; it also rejects unknown startup
+        # parameters, so the statement timeout can't go in connect options
+        options['poolclass'] = MeteredNullPool
+    else:
+        options.update(
+            poolclass=MeteredQueuePool,
+            pool_size=int(config.get('DB_POOL_SIZE', DEFAULT_POOL_SIZE)),
+            max_overflow=int(config.get('DB_MAX_OVERFLOW', DEFAULT_MAX_OVERFLOW)),
+            pool_timeout=float(config.get('DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT)),
+            pool_recycle=int(config.get('DB_POOL_RECYCLE', DEFAULT_POOL_RECYCLE)),
+            pool_pre_ping=bool(config.get('DB_POOL_PRE_PING', True))
+        )
+        if statement_timeout and backend == 'postgresql':
+            connect_args['options'] = f"-c statement_timeout={statement_timeout}"
+        elif statement_timeout and backend == 'mysql':
+            connect_args['init_command'] = f"SET SESSION max_execution_time={statement_timeout}"
+
+    if connect_args:
+        options['connect_args'] = connect_args
+    return options
+
+
+_metrics: Dict[str, PoolMetrics] = {}
+_engines: Dict[str, Any] = {}
+_metrics_lock = threading.Lock()
+
+
+def instrument_engine(engine, name: str = 'default', config: Optional[Dict[str, Any]] = None) -> PoolMetrics:
+    """
+    Attach pool metrics (and the PgBouncer statement timeout) to an engine.
+
+    Args:
+        engine: SQLAlchemy engine
+        name: Name the engine is reported under
+        config: Flask configuration
+
+    Returns:
+        PoolMetrics: The engine's counters
+    """
+    config = config or {}
+    with _metrics_lock:
+        if _engines.get(name) is engine:
+            return _metrics[name]
+        metrics = _metrics[name] = PoolMetrics()
+        _engines[name] = engine
+
+    if isinstance(engine.pool, _MeteredPoolMixin):
+        engine.pool.metrics = metrics
+
+    event.listen(engine, 'connect', lambda dbapi_connection, record: metrics.record_connect())
+    event.listen(engine, 'checkout', lambda dbapi_connection, record, proxy: metrics.record_checkout())
+    event.listen(engine, 'checkin', lambda dbapi_connection, record: metrics.record_checkin())
+    event.listen(engine, 'invalidate', lambda dbapi_connection, record, exception: metrics.record_invalidation())
+
+    statement_timeout = int(config.get('DB_STATEMENT_TIMEOUT') or 0)
+    if statement_timeout and config.get('DB_PGBOUNCER') and engine.dialect.name == 'postgresql':
+        @event.listens_for(engine, 'begin')
+        def set_statement_timeout(connection):
+            # SET LOCAL lasts for the transaction, which is what a
+            # transaction-pooling PgBouncer pins to one server connection
+            cursor = connection.connection.cursor()
+            try:
+                cursor.execute(f"SET LOCAL statement_timeout = {statement_timeout}")
+            finally:
+                cursor.close()
+
+    return metrics
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get pool counters and current state for every instrumented engine.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Engine name to counters, pool class and
+        (for queue pools) size, checked-out connections and overflow
+    """
+    with _metrics_lock:
+        engines = dict(_engines)
+        metrics = dict(_metrics)
+
+    stats = {}
+    for name, engine in engines.items():
+        pool = engine.pool
+        entry = metrics[name].stats()
+        entry['pool'] = type(pool).__name__
+        if isinstance(pool, QueuePool):
+            entry.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=max(pool.overflow(), 0)
+            )
+        stats[name] = entry
+    return stats
@@ -0,0 +1,249 @@
+"""
+Adapter for the Breaking Point MCP Agent package.
+
+The controllers talk to Breaking Point through the agent's ``src`` package
+when it is importable in-process, and through the agent's HTTP API
+(:class:`~integration.bp_agent.BPMCPAgentClient`) otherwise. This module
+resolves which one to use once per process, on first use, so importing a
+controller or building one per request costs nothing::
+
+    agent = get_agent(current_app.config)
+    with get_session_pool(config).session(agent.BreakingPointAPI, host, username, password) as bp_api:
+        summary = agent.get_test_result_summary(bp_api, test_id, run_id)
+"""
+
+import logging
+import os
+import shutil
+import sys
+import threading
+from typing import Any, Dict, Optional
+
+from .transport import AgentHTTPError
+
+logger = logging.getLogger("BPAgent.Adapter")
+
+# Where the agent checkout lives unless BP_MCP_AGENT_PATH says otherwise
+DEFAULT_AGENT_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'BP_MCP_Agent')
+)
+
+
+class AgentError(Exception):
+    """Error reported by the agent when it is used over HTTP."""
+
+
+class AuthenticationError(AgentError):
+    """The agent rejected the credentials."""
+
+
+class ResourceNotFoundError(AgentError):
+    """The test or run does not exist."""
+
+
+class ReportError(AgentError):
+    """The agent failed to generate a report."""
+
+
+class BPAgent:
+    """
+    Breaking Point entry points resolved for this process.
+
+    Attributes:
+        in_process: Whether the agent package is used in-process (False
+            means the HTTP API is used)
+        BreakingPointAPI: Session class (or factory) for the session pool
+        get_test_result_summary, generate_report, generate_charts,
+        get_raw_test_results: Analyzer functions taking a session first
+        APIError, AuthenticationError, ResourceNotFoundError, ReportError:
+            Exception classes raised by the above
+    """
+
+    def __init__(self, in_process: bool, **entry_points: Any):
+        self.in_process = in_process
+        for name, value in entry_points.items():
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"<BPAgent(in_process={self.in_process})>"
+
+
+class HTTPBreakingPointAPI:
+    """
+    BreakingPointAPI-compatible session backed by the agent's HTTP API.
+
+    The HTTP API has no separate test objects: ``/test/run`` takes a test
+    configuration and creates and starts the test in one call, which
+    :meth:`run_config` exposes. Controllers start runs with it when
+    ``BPAgent.in_process`` is False instead of creating the test first, so
+    there is never a test to update or delete.
+    """
+
+    def __init__(self, client, host: str = None, username: str = None, password: str = None):
+        self.client = client
+
+    def login(self) -> bool:
+        # The HTTP API takes credentials with every request
+        return True
+
+    def logout(self) -> None:
+        pass
+
+    def _call(self, method, *args):
+        try:
+            return method(*args)
+        except AgentHTTPError as e:
+            if e.status == 404:
+                raise ResourceNotFoundError(str(e)) from e
+            if e.status in (401, 403):
+                raise AuthenticationError(str(e)) from e
+            raise AgentError(str(e)) from e
+
+    def create_test(self, config_data: Dict) -> Dict:
+        # Raised as the agent's error so that callers' APIError handling applies
+        raise AgentError("The agent HTTP API creates tests when they run; use run_config")
+
+    def update_test(self, test_id: str, config_data: Dict) -> Dict:
+        # Every run sends the current configuration, so there is nothing to update
+        return {}
+
+    def delete_test(self, test_id: str) -> Dict:
+        # Tests created by /test/run are not kept by the CMS
+        return {}
+
+    def run_config(self, config_data: Dict) -> Dict:
+        """Create and start a test from its configuration; returns ``testId`` and ``runId``."""
+        return self._call(self.client.run_test, config_data)
+
+    def run_test(self, test_id: str) -> Dict:
+        return self._call(self.client.run_test, {'test_id': test_id})
+
+    def stop_test(self, test_id: str, run_id: str) -> Dict:
+        return self._call(self.client.stop_test, test_id, run_id)
+
+    def get_test_status(self, test_id: str, run_id: str) -> str:
+        return self._call(self.client.get_test_status, test_id, run_id)
+
+
+def _http_get_test_result_summary(api: HTTPBreakingPointAPI, test_id: str, run_id: str) -> Dict:
+    return api._call(api.client.get_test_result_summary, test_id, run_id)
+
+
+def _http_generate_report(api: HTTPBreakingPointAPI, test_id: str, run_id: str, file_format: str,
+                          report_type: str, output_dir: str) -> str:
+    try:
+        data, ext = api._call(api.client.generate_report, test_id, run_id, report_type, file_format)
+    except AgentError as e:
+        raise ReportError(str(e)) from e
+
+    report_path = os.path.join(output_dir, f"{report_type}_report_{test_id}_{run_id}.{ext}")
+    with open(report_path, 'wb') as f:
+        f.write(data)
+    return report_path
+
+
+def _http_generate_charts(api: HTTPBreakingPointAPI, test_id: str, run_id: str, output_dir: str) -> list:
+    chart_paths = []
+    for filename, stream in api.client.iter_charts(test_id, run_id):
+        chart_path = os.path.join(output_dir, os.path.basename(filename))
+        with open(chart_path, 'wb') as f:
+            shutil.copyfileobj(stream, f)
+        chart_paths.append(chart_path)
+    return chart_paths
+
+
+def _load_package(path: Optional[str]) -> Optional[BPAgent]:
+    """Import the agent package, or return None if it is not available."""
+    agent_path = os.path.abspath(path or DEFAULT_AGENT_PATH)
+    if os.path.isdir(agent_path) and agent_path not in sys.path:
+        sys.path.append(agent_path)
+
+    try:
+        from src.api import BreakingPointAPI
+        from src.analyzer import (
+            get_test_result_summary,
+            generate_report,
+            generate_charts,
+            get_raw_test_results
+        )
+        from src import exceptions
+    except ImportError as e:
+        logger.warning(f"BP_MCP_Agent package not importable ({e}); using the agent HTTP API")
+        return None
+
+    return BPAgent(
+        True,
+        BreakingPointAPI=BreakingPointAPI,
+        get_test_result_summary=get_test_result_summary,
+        generate_report=generate_report,
+        generate_charts=generate_charts,
+        get_raw_test_results=get_raw_test_results,
+        APIError=exceptions.APIError,
+        AuthenticationError=exceptions.AuthenticationError,
+        ResourceNotFoundError=exceptions.ResourceNotFoundError,
+        ReportError=exceptions.ReportError
+    )
+
+
+def _http_agent(config: Dict[str, Any]) -> BPAgent:
+    """Entry points backed by the agent HTTP API."""
+    from .bp_agent import BPMCPAgentClient
+    client = BPMCPAgentClient.from_config(config)
+
+    def session_factory(host=None, username=None, password=None):
+        return HTTPBreakingPointAPI(client, host, username, password)
+
+    return BPAgent(
+        False,
+        BreakingPointAPI=session_factory,
+        client=client,
+        get_test_result_summary=_http_get_test_result_summary,
+        generate_report=_http_generate_report,
+        generate_charts=_http_generate_charts,
+        get_raw_test_results=_http_get_test_result_summary,
+        APIError=AgentError,
+        AuthenticationError=AuthenticationError,
+        ResourceNotFoundError=ResourceNotFoundError,
+        ReportError=ReportError
+    )
+
+
+_agent: Optional[BPAgent] = None
+_agent_lock = threading.Lock()
+
+
+def get_agent(config: Optional[Dict[str, Any]] = None) -> BPAgent:
+    """
+    Get the process-wide Breaking Point entry points, resolving them on first use.
+
+    The agent package is looked for once: on ``sys.path``, then in
+    BP_MCP_AGENT_PATH (default: a ``BP_MCP_Agent`` checkout next to the CMS).
+    If it cannot be imported, the agent HTTP API at BP_MCP_AGENT_HOST and
+    BP_MCP_AGENT_PORT is used instead.
+
+    Args:
+        config: Flask configuration used on first use
+
+    Returns:
+        BPAgent: Entry points for this process
+    """
+    global _agent
+
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                config = config or {}
+                agent = None
+                if config.get('BP_MCP_AGENT_IN_PROCESS', True):
+                    agent = _load_package(config.get('BP_MCP_AGENT_PATH'))
+                _agent = agent or _http_agent(config)
+                logger.info(f"Using {'in-process' if _agent.in_process else 'HTTP'} Breaking Point MCP Agent")
+    return _agent
+
+
+def reset_agent() -> None:
+    """Forget the resolved entry points, so the next :func:`get_agent` resolves them again."""
+    global _agent
+
+    with _agent_lock:
+        _agent = None
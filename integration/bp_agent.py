@@ -2,91 +2,134 @@
 Integration with the Breaking Point MCP Agent.
 """
 
+import asyncio
+import json
 import os
-import requests
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import tempfile
+import zipfile
+from typing import AsyncIterator, BinaryIO, Dict, Iterator, List, Optional, Any, Tuple
+
+from .transport import AgentTransport, get_transport
 
 logger = logging.getLogger("BPAgent.Integration")
 
+# Charts downloaded at once by iter_charts
+DEFAULT_CHART_CONCURRENCY = 4
 
-class BPMCPAgentClient:
-    """Client for interacting with the Breaking Point MCP Agent."""
-    
-    def __init__(self, host: str, port: int, username: str, password: str):
+# Charts (and chart listings) larger than this are spooled to disk
+CHART_SPOOL_SIZE = 1024 * 1024
+
+ZIP_MAGIC = b'PK\x03\x04'
+
+# Flask config keys -> AgentTransport options
+TRANSPORT_CONFIG_KEYS = {
+    'BP_MCP_AGENT_MAX_CONNECTIONS': ('max_connections', int),
+    'BP_MCP_AGENT_MAX_CONNECTIONS_PER_HOST': ('max_connections_per_host', int),
+    'BP_MCP_AGENT_TIMEOUT': ('timeout', float),
+    'BP_MCP_AGENT_CONNECT_TIMEOUT': ('connect_timeout', float),
+    'BP_MCP_AGENT_RETRIES': ('retries', int),
+}
+
+
+def transport_options_from_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get AgentTransport settings from a Flask configuration.
+
+    Args:
+        config: Flask configuration
+
+    Returns:
+        Dict[str, Any]: Transport keyword arguments for the keys that are set
+    """
+    return {
+        option: cast(config[key])
+        for key, (option, cast) in TRANSPORT_CONFIG_KEYS.items()
+        if config.get(key) is not None
+    }
+
+
+class AsyncBPMCPAgentClient:
+    """Asyncio client for interacting with the Breaking Point MCP Agent."""
+
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 transport: Optional[AgentTransport] = None, **transport_options):
         """
         Initialize the Breaking Point MCP Agent client.
-        
+
         Args:
             host: Breaking Point MCP Agent host
             port: Breaking Point MCP Agent port
             username: Breaking Point MCP Agent username
             password: Breaking Point MCP Agent password
+            transport: Transport to use (defaults to the shared pool for this agent)
+            **transport_options: AgentTransport settings used when creating the shared pool
         """
         self.host = host
         self.port = port
         self.username = username
-        self.password = password
         self.base_url = f"http://{host}:{port}"
-        
-    def get_test_result_summary(self, test_id: str, run_id: str) -> Dict:
+        self.transport = transport or get_transport(self.base_url, **transport_options)
+        # The agent API takes credentials in every request body
+        self._credentials = {"username": username, "password": password}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'AsyncBPMCPAgentClient':
+        """Create a client from the BP_MCP_AGENT_* Flask configuration."""
+        return cls(
+            config['BP_MCP_AGENT_HOST'],
+            config['BP_MCP_AGENT_PORT'],
+            config['BP_MCP_AGENT_USERNAME'],
+            config['BP_MCP_AGENT_PASSWORD'],
+            **transport_options_from_config(config)
+        )
+
+    async def _post(self, path: str, data: Dict, idempotent: bool = True) -> Any:
+        response = await self.transport.request("POST", path, {**data, **self._credentials}, idempotent)
+        response.raise_for_status()
+        return response
+
+    async def get_test_result_summary(self, test_id: str, run_id: str) -> Dict:
         """
         Get a summary of test results.
-        
+
         Args:
             test_id: Test ID
             run_id: Run ID
-            
+
         Returns:
             Dict: Test result summary
-            
+
         Raises:
-            Exception: If the request fails
+            AgentHTTPError: If the agent returns an error status
         """
-        url = f"{self.base_url}/analyzer/summary"
-        
-        data = {
-            "test_id": test_id,
-            "run_id": run_id,
-            "username": self.username,
-            "password": self.password
-        }
-        
-        response = requests.post(url, json=data)
-        response.raise_for_status()
-        
+        response = await self._post("/analyzer/summary", {"test_id": test_id, "run_id": run_id})
         return response.json()
-    
-    def generate_report(self, test_id: str, run_id: str, report_type: str, output_format: str) -> Tuple[bytes, str]:
+
+    async def generate_report(self, test_id: str, run_id: str, report_type: str,
+                              output_format: str) -> Tuple[bytes, str]:
         """
         Generate a report for a test run.
-        
+
         Args:
             test_id: Test ID
             run_id: Run ID
             report_type: Report type (standard, executive, detailed, compliance)
             output_format: Output format (html, pdf, csv)
-            
+
         Returns:
             Tuple[bytes, str]: Report data and file extension
-            
+
         Raises:
-            Exception: If the request fails
+            AgentHTTPError: If the agent returns an error status
         """
-        url = f"{self.base_url}/analyzer/report"
-        
-        data = {
+        response = await self._post("/analyzer/report", {
             "test_id": test_id,
             "run_id": run_id,
             "report_type": report_type,
-            "output_format": output_format,
-            "username": self.username,
-            "password": self.password
-        }
-        
-        response = requests.post(url, json=data)
-        response.raise_for_status()
-        
+            "output_format": output_format
+        })
+
         # Get the Content-Disposition header to extract the filename
         content_disposition = response.headers.get('Content-Disposition', '')
         if 'filename=' in content_disposition:
@@ -95,127 +138,330 @@ class BPMCPAgentClient:
             ext = ext.lstrip('.')
         else:
             ext = output_format
-        
+
         return response.content, ext
-    
+
+    async def iter_charts(self, test_id: str, run_id: str,
+                          max_concurrency: int = DEFAULT_CHART_CONCURRENCY) -> AsyncIterator[Tuple[str, BinaryIO]]:
+        """
+        Generate charts for test results, yielding each chart once it is downloaded.
+
+        The agent may answer with a ZIP archive of charts or with a list of
+        chart URLs; URLs are fetched concurrently, at most
+        ``max_concurrency`` at a time. Charts are spooled to temporary files
+        rather than held in memory.
+
+        Args:
+            test_id: Test ID
+            run_id: Run ID
+            max_concurrency: Maximum number of charts downloaded at once
+
+        Yields:
+            Tuple[str, BinaryIO]: Chart filename and a stream of its data;
+            the stream is closed when the next chart is requested
+
+        Raises:
+            AgentHTTPError: If the agent returns an error status
+        """
+        listing = tempfile.SpooledTemporaryFile(max_size=CHART_SPOOL_SIZE)
+        try:
+            response = await self.transport.download(
+                "POST", "/analyzer/charts", listing,
+                {"test_id": test_id, "run_id": run_id, **self._credentials}
+            )
+            response.raise_for_status()
+
+            if 'zip' in response.headers.get('Content-Type', '') or listing.read(4) == ZIP_MAGIC:
+                listing.seek(0)
+                with zipfile.ZipFile(listing) as archive:
+                    for info in archive.infolist():
+                        if info.is_dir():
+                            continue
+                        with archive.open(info) as stream:
+                            yield os.path.basename(info.filename), stream
+                return
+
+            listing.seek(0)
+            chart_urls = [chart['url'] for chart in json.load(listing)]
+        finally:
+            listing.close()
+
+        if not chart_urls:
+            return
+
+        # Workers share one URL iterator; the bounded queue keeps at most
+        # max_concurrency finished charts waiting for the consumer.
+        pending = iter(chart_urls)
+        ready = asyncio.Queue(maxsize=max_concurrency)
+
+        async def fetch():
+            for chart_url in pending:
+                spool = tempfile.SpooledTemporaryFile(max_size=CHART_SPOOL_SIZE)
+                try:
+                    chart_response = await self.transport.download("GET", chart_url, spool)
+                    chart_response.raise_for_status()
+                except Exception as e:
+                    spool.close()
+                    await ready.put(e)
+                    return
+                await ready.put((os.path.basename(chart_url), spool))
+
+        workers = [asyncio.ensure_future(fetch()) for _ in range(min(max_concurrency, len(chart_urls)))]
+        try:
+            for _ in chart_urls:
+                item = await ready.get()
+                if isinstance(item, Exception):
+                    raise item
+                filename, spool = item
+                try:
+                    yield filename, spool
+                finally:
+                    spool.close()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            while not ready.empty():
+                item = ready.get_nowait()
+                if isinstance(item, tuple):
+                    item[1].close()
+
+    async def generate_charts(self, test_id: str, run_id: str) -> List[Tuple[bytes, str]]:
+        """
+        Generate charts for test results.
+
+        Prefer :meth:`iter_charts`, which does not hold every chart in memory.
+
+        Args:
+            test_id: Test ID
+            run_id: Run ID
+
+        Returns:
+            List[Tuple[bytes, str]]: List of chart data and filenames
+
+        Raises:
+            AgentHTTPError: If the agent returns an error status
+        """
+        return [(stream.read(), filename) async for filename, stream in self.iter_charts(test_id, run_id)]
+
+    async def run_test(self, config_data: Dict) -> Dict:
+        """
+        Run a test with the given configuration.
+
+        Args:
+            config_data: Test configuration data
+
+        Returns:
+            Dict: Test run information
+
+        Raises:
+            AgentHTTPError: If the agent returns an error status
+        """
+        # Starting a test is not idempotent: only retry if the request never got out
+        response = await self._post("/test/run", config_data, idempotent=False)
+        return response.json()
+
+    async def stop_test(self, test_id: str, run_id: str) -> Dict:
+        """
+        Stop a running test.
+
+        Args:
+            test_id: Test ID
+            run_id: Run ID
+
+        Returns:
+            Dict: Result of the stop operation
+
+        Raises:
+            AgentHTTPError: If the agent returns an error status
+        """
+        response = await self._post("/test/stop", {"test_id": test_id, "run_id": run_id})
+        return response.json()
+
+    async def get_test_status(self, test_id: str, run_id: str) -> str:
+        """
+        Get the status of a test run.
+
+        Args:
+            test_id: Test ID
+            run_id: Run ID
+
+        Returns:
+            str: Test status
+
+        Raises:
+            AgentHTTPError: If the agent returns an error status
+        """
+        response = await self._post("/test/status", {"test_id": test_id, "run_id": run_id})
+        return response.json().get("status", "unknown")
+
+
+class BPMCPAgentClient:
+    """Client for interacting with the Breaking Point MCP Agent.
+
+    Blocking wrapper around :class:`AsyncBPMCPAgentClient`; both share the
+    same keep-alive connection pool.
+    """
+
+    def __init__(self, host: str, port: int, username: str, password: str,
+                 transport: Optional[AgentTransport] = None, **transport_options):
+        """
+        Initialize the Breaking Point MCP Agent client.
+
+        Args:
+            host: Breaking Point MCP Agent host
+            port: Breaking Point MCP Agent port
+            username: Breaking Point MCP Agent username
+            password: Breaking Point MCP Agent password
+            transport: Transport to use (defaults to the shared pool for this agent)
+            **transport_options: AgentTransport settings used when creating the shared pool
+        """
+        self.aio = AsyncBPMCPAgentClient(host, port, username, password, transport, **transport_options)
+        self.host = host
+        self.port = port
+        self.username = username
+        self.base_url = self.aio.base_url
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'BPMCPAgentClient':
+        """Create a client from the BP_MCP_AGENT_* Flask configuration."""
+        return cls(
+            config['BP_MCP_AGENT_HOST'],
+            config['BP_MCP_AGENT_PORT'],
+            config['BP_MCP_AGENT_USERNAME'],
+            config['BP_MCP_AGENT_PASSWORD'],
+            **transport_options_from_config(config)
+        )
+
+    def _run(self, coro) -> Any:
+        return self.aio.transport.run_sync(coro)
+
+    def get_test_result_summary(self, test_id: str, run_id: str) -> Dict:
+        """
+        Get a summary of test results.
+
+        Args:
+            test_id: Test ID
+            run_id: Run ID
+
+        Returns:
+            Dict: Test result summary
+
+        Raises:
+            Exception: If the request fails
+        """
+        return self._run(self.aio.get_test_result_summary(test_id, run_id))
+
+    def generate_report(self, test_id: str, run_id: str, report_type: str, output_format: str) -> Tuple[bytes, str]:
+        """
+        Generate a report for a test run.
+
+        Args:
+            test_id: Test ID
+            run_id: Run ID
+            report_type: Report type (standard, executive, detailed, compliance)
+            output_format: Output format (html, pdf, csv)
+
+        Returns:
+            Tuple[bytes, str]: Report data and file extension
+
+        Raises:
+            Exception: If the request fails
+        """
+        return self._run(self.aio.generate_report(test_id, run_id, report_type, output_format))
+
+    def iter_charts(self, test_id: str, run_id: str,
+                    max_concurrency: int = DEFAULT_CHART_CONCURRENCY) -> Iterator[Tuple[str, BinaryIO]]:
+        """
+        Generate charts for test results, yielding each chart once it is downloaded.
+
+        Args:
+            test_id: Test ID
+            run_id: Run ID
+            max_concurrency: Maximum number of charts downloaded at once
+
+        Yields:
+            Tuple[str, BinaryIO]: Chart filename and a stream of its data;
+            the stream is closed when the next chart is requested
+
+        Raises:
+            Exception: If the request fails
+        """
+        charts = self.aio.iter_charts(test_id, run_id, max_concurrency)
+
+        async def next_chart():
+            return await charts.__anext__()
+
+        try:
+            while True:
+                try:
+                    chart = self._run(next_chart())
+                except StopAsyncIteration:
+                    return
+                yield chart
+        finally:
+            self._run(charts.aclose())
+
     def generate_charts(self, test_id: str, run_id: str) -> List[Tuple[bytes, str]]:
         """
         Generate charts for test results.
-        
+
+        Prefer :meth:`iter_charts`, which does not hold every chart in memory.
+
         Args:
             test_id: Test ID
             run_id: Run ID
-            
+
         Returns:
             List[Tuple[bytes, str]]: List of chart data and filenames
-            
+
         Raises:
             Exception: If the request fails
         """
-        url = f"{self.base_url}/analyzer/charts"
-        
-        data = {
-            "test_id": test_id,
-            "run_id": run_id,
-            "username": self.username,
-            "password": self.password
-        }
-        
-        response = requests.post(url, json=data)
-        response.raise_for_status()
-        
-        # The response should be a ZIP file containing the charts
-        # For now, we'll assume the agent returns a list of charts in the response
-        charts = response.json()
-        
-        result = []
-        for chart in charts:
-            chart_url = chart['url']
-            chart_response = requests.get(chart_url)
-            chart_response.raise_for_status()
-            
-            filename = os.path.basename(chart_url)
-            result.append((chart_response.content, filename))
-        
-        return result
-    
+        return self._run(self.aio.generate_charts(test_id, run_id))
+
     def run_test(self, config_data: Dict) -> Dict:
         """
         Run a test with the given configuration.
-        
+
         Args:
             config_data: Test configuration data
-            
+
         Returns:
             Dict: Test run information
-            
+
         Raises:
             Exception: If the request fails
         """
-        url = f"{self.base_url}/test/run"
-        
-        # Add credentials to the configuration
-        data = config_data.copy()
-        data["username"] = self.username
-        data["password"] = self.password
-        
-        response = requests.post(url, json=data)
-        response.raise_for_status()
-        
-        return response.json()
-    
+        return self._run(self.aio.run_test(config_data))
+
     def stop_test(self, test_id: str, run_id: str) -> Dict:
         """
         Stop a running test.
-        
+
         Args:
             test_id: Test ID
             run_id: Run ID
-            
+
         Returns:
             Dict: Result of the stop operation
-            
+
         Raises:
             Exception: If the request fails
         """
-        url = f"{self.base_url}/test/stop"
-        
-        data = {
-            "test_id": test_id,
-            "run_id": run_id,
-            "username": self.username,
-            "password": self.password
-        }
-        
-        response = requests.post(url, json=data)
-        response.raise_for_status()
-        
-        return response.json()
-    
+        return self._run(self.aio.stop_test(test_id, run_id))
+
     def get_test_status(self, test_id: str, run_id: str) -> str:
         """
         Get the status of a test run.
-        
+
         Args:
             test_id: Test ID
             run_id: Run ID
-            
+
         Returns:
             str: Test status
-            
+
         Raises:
             Exception: If the request fails
         """
-        url = f"{self.base_url}/test/status"
-        
-        data = {
-            "test_id": test_id,
-            "run_id": run_id,
-            "username": self.username,
-            "password": self.password
-        }
-        
-        response = requests.post(url, json=data)
-        response.raise_for_status()
-        
-        return response.json().get("status", "unknown")
+        return self._run(self.aio.get_test_status(test_id, run_id))
@@ -0,0 +1,268 @@
+"""
+Process-wide pool of authenticated Breaking Point API sessions.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger("BPAgent.SessionPool")
+
+# Defaults used when the pool is created without explicit settings
+DEFAULT_MAX_SESSIONS = 4
+DEFAULT_SESSION_TTL = 900  # seconds
+DEFAULT_ACQUIRE_TIMEOUT = 30  # seconds
+
+
+class SessionPoolExhausted(Exception):
+    """Raised when no session slot for a chassis frees up in time."""
+
+
+class _PooledSession:
+    """An authenticated API object plus its bookkeeping."""
+
+    __slots__ = ('api', 'logged_in_at', 'last_used')
+
+    def __init__(self, api: Any):
+        self.api = api
+        self.logged_in_at = time.monotonic()
+        self.last_used = self.logged_in_at
+
+
+class _ChassisPool:
+    """Idle sessions and the concurrency cap for one (host, username) key."""
+
+    def __init__(self, max_sessions: int):
+        self.idle = deque()
+        self.slots = threading.BoundedSemaphore(max_sessions)
+        self.in_use = 0
+
+
+class BPSessionPool:
+    """
+    Pool of logged-in BreakingPointAPI sessions keyed by (host, username).
+
+    Sessions are leased with :meth:`session` and returned to the pool when the
+    ``with`` block exits, so consecutive calls reuse one login instead of
+    paying for ``login()``/``logout()`` around every request. Sessions older
+    than ``session_ttl`` are re-authenticated before being handed out, and at
+    most ``max_sessions`` sessions per chassis are leased at any one time.
+    """
+
+    def __init__(self, max_sessions: int = DEFAULT_MAX_SESSIONS,
+                 session_ttl: int = DEFAULT_SESSION_TTL,
+                 acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT):
+        """
+        Initialize the session pool.
+
+        Args:
+            max_sessions: Maximum concurrent sessions per (host, username)
+            session_ttl: Seconds after which a session is re-authenticated
+            acquire_timeout: Seconds to wait for a free session slot
+        """
+        self.max_sessions = max_sessions
+        self.session_ttl = session_ttl
+        self.acquire_timeout = acquire_timeout
+        self._pools: Dict[Tuple[str, str], _ChassisPool] = {}
+        self._leased: Dict[int, Tuple[_PooledSession, _ChassisPool]] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'relogins': 0,
+            'discarded': 0,
+            'timeouts': 0,
+        }
+
+    def _get_chassis_pool(self, key: Tuple[str, str]) -> _ChassisPool:
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = _ChassisPool(self.max_sessions)
+                self._pools[key] = pool
+            return pool
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _login(self, api: Any) -> None:
+        # Some BreakingPointAPI versions return False instead of raising
+        if api.login() is False:
+            raise Exception("Failed to log in to Breaking Point")
+
+    def _checkout(self, pool: _ChassisPool, factory: Callable[[], Any]) -> _PooledSession:
+        with self._lock:
+            pooled = pool.idle.pop() if pool.idle else None
+
+        if pooled is None:
+            self._count('misses')
+            pooled = _PooledSession(factory())
+            self._login(pooled.api)
+            return pooled
+
+        self._count('hits')
+        if time.monotonic() - pooled.logged_in_at > self.session_ttl:
+            # The chassis expires idle sessions, so log in again before use
+            self._count('relogins')
+            self._login(pooled.api)
+            pooled.logged_in_at = time.monotonic()
+        return pooled
+
+    def acquire(self, api_class: Callable[..., Any], host: str, username: str, password: str) -> Any:
+        """
+        Lease an authenticated session for a chassis.
+
+        Every successful call must be paired with :meth:`release`; prefer the
+        :meth:`session` context manager where the lease fits in one block.
+
+        Args:
+            api_class: BreakingPointAPI class (or compatible factory)
+            host: Breaking Point host
+            username: Breaking Point username
+            password: Breaking Point password
+
+        Returns:
+            BreakingPointAPI: Authenticated API instance
+
+        Raises:
+            SessionPoolExhausted: If no session slot frees up in time
+        """
+        pool = self._get_chassis_pool((host, username))
+
+        if not pool.slots.acquire(timeout=self.acquire_timeout):
+            self._count('timeouts')
+            raise SessionPoolExhausted(
+                f"No Breaking Point session available for {username}@{host} "
+                f"after {self.acquire_timeout}s"
+            )
+
+        try:
+            pooled = self._checkout(pool, lambda: api_class(host=host, username=username, password=password))
+        except Exception:
+            pool.slots.release()
+            raise
+
+        with self._lock:
+            pool.in_use += 1
+            self._leased[id(pooled.api)] = (pooled, pool)
+        return pooled.api
+
+    def release(self, api: Any, discard: bool = False) -> None:
+        """
+        Return a leased session to the pool.
+
+        Args:
+            api: API instance obtained from :meth:`acquire`
+            discard: Log the session out instead of keeping it warm, e.g.
+                because the call using it failed and it may be half-broken
+        """
+        with self._lock:
+            pooled, pool = self._leased.pop(id(api))
+            pool.in_use -= 1
+
+        try:
+            if discard:
+                self._discard(pooled)
+            else:
+                pooled.last_used = time.monotonic()
+                with self._lock:
+                    pool.idle.append(pooled)
+        finally:
+            pool.slots.release()
+
+    @contextmanager
+    def session(self, api_class: Callable[..., Any], host: str, username: str, password: str):
+        """
+        Lease an authenticated session for the duration of a ``with`` block.
+
+        Args:
+            api_class: BreakingPointAPI class (or compatible factory)
+            host: Breaking Point host
+            username: Breaking Point username
+            password: Breaking Point password
+
+        Yields:
+            BreakingPointAPI: Authenticated API instance
+        """
+        api = self.acquire(api_class, host, username, password)
+        try:
+            yield api
+        except Exception:
+            # The session may be half-broken (expired token, dropped
+            # connection); don't hand it to the next caller.
+            self.release(api, discard=True)
+            raise
+        else:
+            self.release(api)
+
+    def _discard(self, pooled: _PooledSession) -> None:
+        self._count('discarded')
+        try:
+            pooled.api.logout()
+        except Exception as e:
+            logger.debug(f"Ignoring logout failure for discarded session: {e}")
+
+    def close(self) -> None:
+        """Log out every idle session and forget all chassis pools."""
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools = {}
+
+        for pool in pools:
+            while pool.idle:
+                pooled = pool.idle.pop()
+                try:
+                    pooled.api.logout()
+                except Exception as e:
+                    logger.debug(f"Ignoring logout failure on close: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get pool counters.
+
+        Returns:
+            Dict[str, Any]: Hit/miss/re-login counters and per-chassis usage
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['max_sessions'] = self.max_sessions
+            stats['session_ttl'] = self.session_ttl
+            stats['chassis'] = {
+                f"{username}@{host}": {'idle': len(pool.idle), 'in_use': pool.in_use}
+                for (host, username), pool in self._pools.items()
+            }
+        return stats
+
+
+_session_pool: Optional[BPSessionPool] = None
+_session_pool_lock = threading.Lock()
+
+
+def get_session_pool(config: Optional[Dict[str, Any]] = None) -> BPSessionPool:
+    """
+    Get the process-wide session pool, creating it on first use.
+
+    Args:
+        config: Flask configuration used to size the pool on first use
+
+    Returns:
+        BPSessionPool: The shared session pool
+    """
+    global _session_pool
+
+    if _session_pool is None:
+        with _session_pool_lock:
+            if _session_pool is None:
+                config = config or {}
+                _session_pool = BPSessionPool(
+                    max_sessions=int(config.get('BP_SESSION_POOL_MAX_SESSIONS', DEFAULT_MAX_SESSIONS)),
+                    session_ttl=int(config.get('BP_SESSION_TTL', DEFAULT_SESSION_TTL)),
+                    acquire_timeout=float(config.get('BP_SESSION_ACQUIRE_TIMEOUT', DEFAULT_ACQUIRE_TIMEOUT)),
+                )
+                atexit.register(_session_pool.close)
+    return _session_pool
@@ -0,0 +1,214 @@
+"""
+Local stub of the Breaking Point MCP Agent HTTP API.
+
+Serves canned responses for the endpoints used by ``BPMCPAgentClient`` so
+the clients can be exercised without a chassis::
+
+    python -m integration.stub_agent --port 5001
+
+or, from Python (e.g. a test fixture)::
+
+    base_url, stop = start_stub_agent()
+    ...
+    stop()
+
+``fail_first`` makes each endpoint answer 503 a number of times before it
+succeeds, to exercise the clients' retries, and ``zip_charts`` serves charts
+as one ZIP archive instead of a list of chart URLs.
+"""
+
+import argparse
+import asyncio
+import io
+import itertools
+import threading
+import zipfile
+from collections import Counter
+from typing import Callable, Dict, Tuple
+
+from aiohttp import web
+
+CHART_NAMES = ['throughput.png', 'latency.png', 'strikes.png']
+
+# Smallest valid PNG: 1x1 transparent pixel
+PNG_PIXEL = bytes.fromhex(
+    '89504e470d0a1a0a0000000d4948445200000001000000010806000000'
+    '1f15c4890000000d49444154789c6360000002000001e221bc330000000049454e44ae426082'
+)
+
+
+def create_stub_app(run_duration: float = 5.0, fail_first: int = 0,
+                    zip_charts: bool = False) -> web.Application:
+    """
+    Create the stub agent application.
+
+    Args:
+        run_duration: Seconds after which a started run reports 'completed'
+        fail_first: Requests to each path answered with 503 before it succeeds
+        zip_charts: Serve charts as a ZIP archive instead of a list of URLs
+
+    Returns:
+        web.Application: The aiohttp application; ``app['requests']``
+        counts the requests received per path
+    """
+    run_ids = itertools.count(1)
+    runs: Dict[str, Dict] = {}
+    requests: Counter = Counter()
+
+    @web.middleware
+    async def unavailable(request, handler):
+        requests[request.path] += 1
+        if requests[request.path] <= fail_first:
+            raise web.HTTPServiceUnavailable(text='Agent busy')
+        return await handler(request)
+
+    def now() -> float:
+        return asyncio.get_running_loop().time()
+
+    async def require_credentials(request: web.Request) -> Dict:
+        data = await request.json()
+        if not data.get('username') or not data.get('password'):
+            raise web.HTTPUnauthorized(text='Missing credentials')
+        return data
+
+    async def summary(request):
+        data = await require_credentials(request)
+        return web.json_response({
+            'test_id': data.get('test_id'),
+            'run_id': data.get('run_id'),
+            'metrics': {
+                'throughput': {'avg': 9400.0, 'max': 9870.0, 'min': 8100.0},
+                'latency': {'avg': 0.42, 'p95': 0.9, 'p99': 1.3},
+                'strikes': {'total': 1200, 'blocked': 1187, 'allowed': 13},
+                'transactions': {'attempted': 50000, 'successful': 49950, 'failed': 50},
+            }
+        })
+
+    async def report(request):
+        data = await require_credentials(request)
+        output_format = data.get('output_format', 'html')
+        body = f"<html><body>{data.get('report_type', 'standard')} report</body></html>".encode()
+        return web.Response(body=body, headers={
+            'Content-Disposition': f'attachment; filename="report_{data.get("run_id")}.{output_format}"'
+        })
+
+    async def charts(request):
+        await require_credentials(request)
+        if zip_charts:
+            archive = io.BytesIO()
+            with zipfile.ZipFile(archive, 'w') as zip_file:
+                for name in CHART_NAMES:
+                    zip_file.writestr(f'charts/{name}', PNG_PIXEL)
+            return web.Response(body=archive.getvalue(), content_type='application/zip')
+        return web.json_response([
+            {'url': f"{request.scheme}://{request.host}/charts/{name}"}
+            for name in CHART_NAMES
+        ])
+
+    async def chart(request):
+        if request.match_info['name'] not in CHART_NAMES:
+            raise web.HTTPNotFound()
+        return web.Response(body=PNG_PIXEL, content_type='image/png')
+
+    async def run(request):
+        data = await require_credentials(request)
+        run_id = str(next(run_ids))
+        runs[run_id] = {'test_id': data.get('test_id'), 'started': now(), 'stopped': False}
+        return web.json_response({'testId': data.get('test_id'), 'runId': run_id})
+
+    async def stop(request):
+        data = await require_credentials(request)
+        state = runs.get(str(data.get('run_id')))
+        if state is None:
+            raise web.HTTPNotFound(text='Unknown run')
+        state['stopped'] = True
+        return web.json_response({'result': 'stopped'})
+
+    async def status(request):
+        data = await require_credentials(request)
+        state = runs.get(str(data.get('run_id')))
+        if state is None:
+            return web.json_response({'status': 'unknown'})
+        if state['stopped']:
+            return web.json_response({'status': 'stopped'})
+        if now() - state['started'] >= run_duration:
+            return web.json_response({'status': 'completed'})
+        return web.json_response({'status': 'running'})
+
+    app = web.Application(middlewares=[unavailable])
+    app['requests'] = requests
+    app.add_routes([
+        web.post('/analyzer/summary', summary),
+        web.post('/analyzer/report', report),
+        web.post('/analyzer/charts', charts),
+        web.get('/charts/{name}', chart),
+        web.post('/test/run', run),
+        web.post('/test/stop', stop),
+        web.post('/test/status', status),
+    ])
+    return app
+
+
+def start_stub_agent(host: str = '127.0.0.1', port: int = 0, run_duration: float = 5.0,
+                     **options) -> Tuple[str, Callable[[], None]]:
+    """
+    Run the stub agent on a background thread.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        run_duration: Seconds after which a started run reports 'completed'
+        **options: Further :func:`create_stub_app` settings
+
+    Returns:
+        Tuple[str, Callable[[], None]]: Base URL and a function that stops the server
+    """
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    state = {}
+
+    async def _start():
+        runner = web.AppRunner(create_stub_app(run_duration, **options))
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        state['runner'] = runner
+        state['port'] = runner.addresses[0][1]
+
+    def _serve():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(_start())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=_serve, name='bp-agent-stub', daemon=True)
+    thread.start()
+    started.wait()
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(state['runner'].cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    return f"http://{host}:{state['port']}", stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a stub Breaking Point MCP Agent.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--run-duration', type=float, default=5.0,
+                        help='seconds after which started runs report completed')
+    parser.add_argument('--fail-first', type=int, default=0,
+                        help='requests to each path answered with 503 before it succeeds')
+    parser.add_argument('--zip-charts', action='store_true',
+                        help='serve charts as a ZIP archive instead of a list of URLs')
+    args = parser.parse_args()
+
+    web.run_app(create_stub_app(args.run_duration, args.fail_first, args.zip_charts),
+                host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""
+Pooled keep-alive HTTP transport for the Breaking Point MCP Agent.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import threading
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+logger = logging.getLogger("BPAgent.Transport")
+
+# Defaults used when a transport is created without explicit settings
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_CONNECTIONS_PER_HOST = 10
+DEFAULT_TIMEOUT = 300  # seconds, whole request (reports can take a while)
+DEFAULT_CONNECT_TIMEOUT = 10  # seconds
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.5  # seconds
+DEFAULT_BACKOFF_MAX = 10  # seconds
+
+# Read size when streaming response bodies to a file
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Responses worth retrying: the agent or a proxy in front of it is overloaded
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class AgentHTTPError(Exception):
+    """Raised when the agent answers with an error status."""
+
+    def __init__(self, status: int, message: str, url: str):
+        super().__init__(f"{status} Error: {message} for url: {url}")
+        self.status = status
+        self.url = url
+
+
+class AgentResponse:
+    """A response from the agent; the body is in ``content`` unless it was streamed to a file."""
+
+    def __init__(self, url: str, status: int, reason: str, headers: Dict[str, str], content: bytes):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+
+    def json(self) -> Any:
+        """Decode the body as JSON."""
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        """Raise AgentHTTPError for 4xx/5xx responses."""
+        if self.status >= 400:
+            raise AgentHTTPError(self.status, self.reason, self.url)
+
+
+class AgentTransport:
+    """
+    Keep-alive connection pool shared by the sync and async agent clients.
+
+    All I/O runs on one event loop owned by the transport (started on a
+    daemon thread on first use), so a single ``aiohttp`` connection pool can
+    serve coroutines from any event loop as well as plain blocking callers.
+    """
+
+    def __init__(self, base_url: str,
+                 max_connections: int = DEFAULT_MAX_CONNECTIONS,
+                 max_connections_per_host: int = DEFAULT_MAX_CONNECTIONS_PER_HOST,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES,
+                 backoff_base: float = DEFAULT_BACKOFF_BASE,
+                 backoff_max: float = DEFAULT_BACKOFF_MAX):
+        """
+        Initialize the transport.
+
+        Args:
+            base_url: Agent base URL, e.g. ``http://localhost:5000``
+            max_connections: Total connection limit
+            max_connections_per_host: Connection limit per host
+            timeout: Total timeout per request in seconds
+            connect_timeout: Connection timeout in seconds
+            retries: Retries after the first attempt for retryable failures
+            backoff_base: First retry delay in seconds (doubles per retry)
+            backoff_max: Upper bound for a single retry delay in seconds
+        """
+        self.base_url = base_url.rstrip('/')
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # aiohttp is imported with the first session, not when the CMS starts
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever,
+                    name=f"bp-agent-transport-{self.base_url}",
+                    daemon=True
+                )
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def _get_session(self):
+        # Only called on the transport loop, so no locking is needed
+        if self._session is None or self._session.closed:
+            import aiohttp
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host
+            )
+            timeout = aiohttp.ClientTimeout(total=self.timeout, connect=self.connect_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    def _on_transport_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Delay before a retry, using exponential backoff with full jitter.
+
+        Args:
+            attempt: Zero-based number of the failed attempt
+
+        Returns:
+            float: Seconds to wait
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _request(self, method: str, url: str, json_data: Optional[Dict] = None,
+                       idempotent: bool = True, sink: Optional[BinaryIO] = None) -> AgentResponse:
+        import aiohttp
+        session = self._get_session()
+        attempt = 0
+
+        while True:
+            try:
+                async with session.request(method, url, json=json_data) as response:
+                    if sink is not None and response.status < 400:
+                        # Start from scratch in case an earlier attempt wrote part of the body
+                        sink.seek(0)
+                        sink.truncate()
+                        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                            sink.write(chunk)
+                        sink.seek(0)
+                        content = b''
+                    else:
+                        content = await response.read()
+                    result = AgentResponse(
+                        str(response.url), response.status, response.reason or '',
+                        dict(response.headers), content
+                    )
+                if result.status not in RETRY_STATUSES or not idempotent or attempt >= self.retries:
+                    return result
+                reason = f"HTTP {result.status}"
+            except aiohttp.ClientConnectorError as e:
+                # The request never reached the agent, so it is always safe to retry
+                if attempt >= self.retries:
+                    raise
+                reason = str(e)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not idempotent or attempt >= self.retries:
+                    raise
+                reason = str(e) or type(e).__name__
+
+            delay = self.backoff(attempt)
+            attempt += 1
+            logger.warning(f"{method} {url} failed ({reason}); retry {attempt}/{self.retries} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def _dispatch(self, coro) -> Any:
+        # aiohttp sessions are bound to the loop that created them, so run
+        # every request on the transport loop and await it from the caller's
+        if self._on_transport_loop():
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()))
+
+    def url(self, path: str) -> str:
+        """Resolve a path against the agent base URL; absolute URLs pass through."""
+        if path.startswith(('http://', 'https://')):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    async def request(self, method: str, path: str, json_data: Optional[Dict] = None,
+                      idempotent: bool = True) -> AgentResponse:
+        """
+        Send a request from any event loop.
+
+        Args:
+            method: HTTP method
+            path: Path relative to the agent base URL, or an absolute URL
+            json_data: JSON body
+            idempotent: Whether failures after the request was sent may be retried
+
+        Returns:
+            AgentResponse: The response
+        """
+        coro = self._request(method, self.url(path), json_data, idempotent)
+        return await self._dispatch(coro)
+
+    async def download(self, method: str, path: str, sink: BinaryIO, json_data: Optional[Dict] = None,
+                       idempotent: bool = True) -> AgentResponse:
+        """
+        Send a request from any event loop, streaming a successful body into a file.
+
+        Args:
+            method: HTTP method
+            path: Path relative to the agent base URL, or an absolute URL
+            sink: Writable, seekable file object; rewound to the start once
+                the body has been written
+            json_data: JSON body
+            idempotent: Whether failures after the request was sent may be retried
+
+        Returns:
+            AgentResponse: The response; ``content`` is empty unless the
+            request failed
+        """
+        coro = self._request(method, self.url(path), json_data, idempotent, sink)
+        return await self._dispatch(coro)
+
+    def run_sync(self, coro) -> Any:
+        """
+        Run a coroutine on the transport loop and wait for its result.
+
+        Args:
+            coro: Coroutine to run
+
+        Returns:
+            Any: The coroutine's result
+        """
+        if self._on_transport_loop():
+            raise RuntimeError("run_sync() cannot be called from the transport event loop")
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def close(self) -> None:
+        """Close pooled connections and stop the transport loop."""
+        with self._lock:
+            loop, thread, self._loop, self._thread = self._loop, self._thread, None, None
+        if loop is None:
+            return
+
+        async def _close():
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+
+        asyncio.run_coroutine_threadsafe(_close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+_transports: Dict[Tuple[str, Tuple], AgentTransport] = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(base_url: str, **options) -> AgentTransport:
+    """
+    Get the process-wide transport for an agent, creating it on first use.
+
+    Clients for the same agent and options share one connection pool.
+
+    Args:
+        base_url: Agent base URL
+        **options: AgentTransport settings
+
+    Returns:
+        AgentTransport: The shared transport
+    """
+    key = (base_url.rstrip('/'), tuple(sorted(options.items())))
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            transport = AgentTransport(base_url, **options)
+            _transports[key] = transport
+        return transport
@@ -5,9 +5,25 @@ Storage module for the CMS.
 import os
 from typing import Optional
 
-from .storage import StorageInterface
+from .storage import FileInfo, StorageInterface
 from .local import LocalStorage
-from .s3 import S3Storage
+from .transfer import COPY_BUFFER_SIZE, UploadResult, transfer_stats
+
+# Names served from storage.s3, which is only imported (with boto3) when used
+_S3_EXPORTS = (
+    'S3Storage',
+    'DEFAULT_PRESIGN_EXPIRES',
+    'DEFAULT_MULTIPART_THRESHOLD',
+    'DEFAULT_MULTIPART_PART_SIZE',
+    'DEFAULT_UPLOAD_CONCURRENCY'
+)
+
+
+def __getattr__(name):
+    if name in _S3_EXPORTS:
+        from . import s3
+        return getattr(s3, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_storage(storage_type: str = 'local', **kwargs) -> StorageInterface:
@@ -26,18 +42,37 @@ def get_storage(storage_type: str = 'local', **kwargs) -> StorageInterface:
     """
     if storage_type.lower() == 'local':
         base_dir = kwargs.get('base_dir', os.path.join(os.getcwd(), 'storage_files'))
-        return LocalStorage(base_dir)
+        return LocalStorage(
+            base_dir,
+            x_accel_prefix=kwargs.get('x_accel_prefix'),
+            buffer_size=int(kwargs.get('buffer_size') or COPY_BUFFER_SIZE)
+        )
     elif storage_type.lower() == 's3':
-        bucket_name = kwargs.get('bucket_name')
+        from .s3 import (
+            S3Storage,
+            DEFAULT_PRESIGN_EXPIRES,
+            DEFAULT_MULTIPART_THRESHOLD,
+            DEFAULT_MULTIPART_PART_SIZE,
+            DEFAULT_UPLOAD_CONCURRENCY
+        )
+        
+        # Accept both boto3-style names and the STORAGE_S3_* config suffixes
+        # (bucket, access_key, ...) that create_app passes through
+        bucket_name = kwargs.get('bucket_name') or kwargs.get('bucket')
         if not bucket_name:
             raise ValueError("Bucket name is required for S3 storage")
         
         return S3Storage(
             bucket_name=bucket_name,
-            aws_access_key_id=kwargs.get('aws_access_key_id'),
-            aws_secret_access_key=kwargs.get('aws_secret_access_key'),
-            region_name=kwargs.get('region_name'),
-            endpoint_url=kwargs.get('endpoint_url')
+            aws_access_key_id=kwargs.get('aws_access_key_id') or kwargs.get('access_key'),
+            aws_secret_access_key=kwargs.get('aws_secret_access_key') or kwargs.get('secret_key'),
+            region_name=kwargs.get('region_name') or kwargs.get('region'),
+            endpoint_url=kwargs.get('endpoint_url') or kwargs.get('endpoint'),
+            presign_expires=int(kwargs.get('presign_expires') or DEFAULT_PRESIGN_EXPIRES),
+            multipart_threshold=int(kwargs.get('multipart_threshold') or DEFAULT_MULTIPART_THRESHOLD),
+            multipart_part_size=int(kwargs.get('multipart_part_size') or DEFAULT_MULTIPART_PART_SIZE),
+            redirect_downloads=bool(kwargs.get('redirect_downloads', False)),
+            upload_concurrency=int(kwargs.get('upload_concurrency') or DEFAULT_UPLOAD_CONCURRENCY)
         )
     else:
         raise ValueError(f"Unsupported storage type: {storage_type}")
@@ -2,26 +2,52 @@
 Local file storage implementation for the CMS.
 """
 
+import json
 import os
 import shutil
 import tempfile
-from typing import BinaryIO, List, Optional, Tuple
-import magic
-
-from .storage import StorageInterface
+import time
+import uuid
+from typing import BinaryIO, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from .storage import FileInfo, StorageInterface
+from .transfer import (
+    COPY_BUFFER_SIZE,
+    SNIFF_SIZE,
+    ChecksumReader,
+    UploadResult,
+    detect_content_type,
+    get_transfer_metrics,
+    guess_content_type
+)
+
+# Suffix of files still being written; hidden from listings
+PARTIAL_SUFFIX = '.part'
+
+# Directory under base_dir holding per-file metadata sidecars (content type,
+# size, SHA-256); hidden from listings
+META_DIR = '.meta'
 
 
 class LocalStorage(StorageInterface):
     """Local file storage implementation."""
 
-    def __init__(self, base_dir: str):
+    def __init__(self, base_dir: str, x_accel_prefix: Optional[str] = None,
+                 buffer_size: int = COPY_BUFFER_SIZE):
         """
         Initialize local storage.
 
         Args:
             base_dir: Base directory for file storage
+            x_accel_prefix: Internal location under which a fronting nginx
+                serves ``base_dir``; when set, downloads are handed off to
+                nginx with an ``X-Accel-Redirect`` header (optional)
+            buffer_size: Copy buffer size in bytes for uploads
         """
         self.base_dir = os.path.abspath(base_dir)
+        self.x_accel_prefix = x_accel_prefix.rstrip('/') + '/' if x_accel_prefix else None
+        self.buffer_size = buffer_size
         os.makedirs(self.base_dir, exist_ok=True)
 
     def _get_full_path(self, file_path: str) -> str:
@@ -38,25 +64,123 @@ class LocalStorage(StorageInterface):
         clean_path = os.path.normpath(file_path).lstrip(os.path.sep)
         return os.path.join(self.base_dir, clean_path)
 
-    def save_file(self, file_data: BinaryIO, file_path: str) -> str:
+    def _meta_path(self, full_path: str) -> str:
+        rel_path = os.path.relpath(full_path, self.base_dir)
+        return os.path.join(self.base_dir, META_DIR, rel_path + '.json')
+
+    def _read_meta(self, full_path: str) -> dict:
+        """Read a file's sidecar metadata; empty if it has none."""
+        try:
+            with open(self._meta_path(full_path)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, full_path: str, meta: dict) -> None:
+        """Atomically write a file's sidecar metadata."""
+        meta_path = self._meta_path(full_path)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        partial_path = f"{meta_path}.{uuid.uuid4().hex}{PARTIAL_SUFFIX}"
+        with open(partial_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(partial_path, meta_path)
+
+    def _content_type(self, full_path: str) -> str:
+        """Stored content type of a file, or a guess from its extension for files saved without one."""
+        return self._read_meta(full_path).get('content_type') or guess_content_type(full_path)
+
+    def backfill_content_type(self, file_path: str, force: bool = False) -> Optional[str]:
+        """
+        Detect and store the content type of a file saved without one.
+
+        Args:
+            file_path: Path to the file
+            force: Re-detect even if a content type is already stored
+
+        Returns:
+            Optional[str]: The stored content type, or None if the file
+            already had one
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        full_path = self._get_full_path(file_path)
+
+        if not os.path.isfile(full_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        meta = self._read_meta(full_path)
+        if meta.get('content_type') and not force:
+            return None
+
+        with open(full_path, 'rb') as f:
+            meta['content_type'] = detect_content_type(f.read(SNIFF_SIZE), file_path)
+        meta['size'] = os.path.getsize(full_path)
+        self._write_meta(full_path, meta)
+        return meta['content_type']
+
+    def upload(self, file_data: BinaryIO, file_path: str, resume: bool = False,
+               content_type: Optional[str] = None) -> UploadResult:
         """
         Save a file to local storage.
 
+        The file is copied through a page-aligned buffer into a hidden
+        partial file next to its destination, which is renamed into place
+        once complete, so readers never see a half-written file. Its content
+        type, size and SHA-256 are then written to a sidecar under
+        ``.meta/``.
+
         Args:
             file_data: File data as a file-like object
             file_path: Path to save the file to
+            resume: Ignored; local copies are not resumable
+            content_type: Content type to store (detected from the first bytes if omitted)
 
         Returns:
-            str: Full path to the saved file
+            UploadResult: Stored path, size, SHA-256 and timing of the upload
         """
+        metrics = get_transfer_metrics('local')
+        started = time.monotonic()
         full_path = self._get_full_path(file_path)
-        os.makedirs(os.path.dirname(full_path), exist_ok=True)
-
-        # Write the file
-        with open(full_path, 'wb') as f:
-            shutil.copyfileobj(file_data, f)
-
-        return file_path
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+
+        reader = ChecksumReader(file_data)
+        buffer = bytearray(self.buffer_size)
+        view = memoryview(buffer)
+
+        # Created like open(..., 'wb') would, so the umask applies as before
+        partial_path = os.path.join(
+            directory, f".{os.path.basename(full_path)}.{uuid.uuid4().hex}{PARTIAL_SUFFIX}"
+        )
+        fd = os.open(partial_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        try:
+            with open(fd, 'wb') as f:
+                while True:
+                    size = reader.readinto(buffer)
+                    if not size:
+                        break
+                    if content_type is None:
+                        content_type = detect_content_type(view[:size], file_path)
+                    f.write(view[:size])
+            os.replace(partial_path, full_path)
+        except BaseException:
+            metrics.record_failure()
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+
+        result = UploadResult(
+            file_path, reader.bytes_read, reader.hexdigest(), time.monotonic() - started,
+            content_type=content_type or detect_content_type(b'', file_path)
+        )
+        self._write_meta(full_path, {
+            'content_type': result.content_type,
+            'size': result.size,
+            'sha256': result.sha256
+        })
+        metrics.record(result)
+        return result
 
     def get_file(self, file_path: str) -> Tuple[BinaryIO, str]:
         """
@@ -82,10 +206,82 @@ class LocalStorage(StorageInterface):
             shutil.copyfileobj(f, temp_file)
         temp_file.seek(0)
 
-        # Detect the content type
-        content_type = magic.from_file(full_path, mime=True)
+        return temp_file, self._content_type(full_path)
+
+    def open_stream(self, file_path: str) -> Tuple[BinaryIO, str]:
+        """
+        Open a file in local storage for reading without copying it.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            Tuple[BinaryIO, str]: Open file (the caller must close it) and content type
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        full_path = self._get_full_path(file_path)
+
+        if not os.path.isfile(full_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        return open(full_path, 'rb'), self._content_type(full_path)
+
+    def send(self, file_path: str, download_name: Optional[str] = None,
+             as_attachment: bool = False, mimetype: Optional[str] = None):
+        """
+        Build a Flask response that sends a file from local storage.
+
+        The file is served from its real path, so the WSGI server can use
+        sendfile, and ``Range``/conditional requests are honoured; with
+        ``x_accel_prefix`` set, nginx serves it (and handles both) instead.
+
+        Args:
+            file_path: Path to the file
+            download_name: File name for the Content-Disposition header
+            as_attachment: Whether the browser should download rather than display the file
+            mimetype: Content type to send (the stored one if omitted)
+
+        Returns:
+            flask.Response: Response sending the file
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        from flask import current_app, send_file
+
+        full_path = self._get_full_path(file_path)
+
+        if not os.path.isfile(full_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
 
-        return temp_file, content_type
+        mimetype = mimetype or self._content_type(full_path)
+        download_name = download_name or os.path.basename(full_path)
+
+        if self.x_accel_prefix:
+            rel_path = os.path.relpath(full_path, self.base_dir).replace(os.path.sep, '/')
+            response = current_app.response_class(mimetype=mimetype)
+            response.headers['X-Accel-Redirect'] = quote(self.x_accel_prefix + rel_path)
+            response.headers.set(
+                'Content-Disposition',
+                'attachment' if as_attachment else 'inline',
+                filename=download_name
+            )
+            return response
+
+        # conditional=True answers Range requests with 206 and
+        # If-None-Match/If-Modified-Since with 304, using an ETag and
+        # Last-Modified derived from the file's size and mtime
+        return send_file(
+            full_path,
+            mimetype=mimetype,
+            as_attachment=as_attachment,
+            download_name=download_name,
+            conditional=True,
+            etag=True,
+            last_modified=os.path.getmtime(full_path)
+        )
 
     def delete_file(self, file_path: str) -> bool:
         """
@@ -104,33 +300,77 @@ class LocalStorage(StorageInterface):
 
         try:
             os.remove(full_path)
-            return True
         except OSError:
             return False
 
-    def list_files(self, directory_path: str) -> List[str]:
+        try:
+            os.remove(self._meta_path(full_path))
+        except OSError:
+            pass
+        return True
+
+    def iter_files(self, prefix: str = '', start_after: Optional[str] = None,
+                   delimiter: Optional[str] = None) -> Iterator[FileInfo]:
         """
-        List files in a directory.
+        Iterate over the files in a directory, in path order.
+
+        Walks the tree with ``os.scandir``, one directory at a time, so
+        sizes and modification times come from the same pass and subtrees
+        entirely before ``start_after`` are skipped without being read.
+        Paths use ``/`` as separator, as in S3.
 
         Args:
-            directory_path: Path to the directory
+            prefix: Path of the directory ('' for all files)
+            start_after: Only yield entries whose path sorts after this one
+            delimiter: ``'/'`` to list one level only (subdirectories as
+                ``is_dir`` entries ending with ``/``)
 
         Returns:
-            List[str]: List of file paths
-        """
-        full_path = self._get_full_path(directory_path)
+            Iterator[FileInfo]: The entries, ordered by path
 
-        if not os.path.exists(full_path) or not os.path.isdir(full_path):
-            return []
-
-        files = []
-        for root, _, filenames in os.walk(full_path):
-            for filename in filenames:
-                file_path = os.path.join(root, filename)
-                rel_path = os.path.relpath(file_path, self.base_dir)
-                files.append(rel_path)
-
-        return files
+        Raises:
+            ValueError: If the delimiter is not ``'/'``
+            OSError: If a directory cannot be read
+        """
+        if delimiter not in (None, '/'):
+            raise ValueError("Local storage only supports '/' as delimiter")
+
+        full_path = self._get_full_path(prefix)
+        if not os.path.isdir(full_path):
+            return
+        rel_path = os.path.relpath(full_path, self.base_dir).replace(os.sep, '/')
+        yield from self._scan(full_path, '' if rel_path == '.' else rel_path + '/', start_after,
+                              recursive=delimiter is None)
+
+    def _scan(self, directory: str, rel_prefix: str, start_after: Optional[str],
+              recursive: bool = True) -> Iterator[FileInfo]:
+        """Yield the entries of ``directory`` (relative path ``rel_prefix``) in path order."""
+        with os.scandir(directory) as it:
+            entries = [
+                (rel_prefix + entry.name + ('/' if entry.is_dir() else ''), entry)
+                for entry in it
+            ]
+        # Sorting directories as 'name/' orders them exactly as the full
+        # paths of their files sort ('a-b' < 'a/x' < 'a0')
+        entries.sort(key=lambda item: item[0])
+
+        for rel_path, entry in entries:
+            if rel_path.endswith('/'):
+                if rel_path == META_DIR + '/':
+                    continue
+                if not recursive:
+                    if start_after is None or rel_path > start_after:
+                        yield FileInfo(rel_path, is_dir=True)
+                    continue
+                # Every path in the subtree sorts before rel_path[:-1] + '0'
+                if start_after is not None and start_after >= rel_path[:-1] + '0':
+                    continue
+                yield from self._scan(entry.path, rel_path, start_after)
+            elif not entry.name.endswith(PARTIAL_SUFFIX):
+                if start_after is not None and rel_path <= start_after:
+                    continue
+                stat = entry.stat()
+                yield FileInfo(rel_path, stat.st_size, stat.st_mtime)
 
     def file_exists(self, file_path: str) -> bool:
         """
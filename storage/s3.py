@@ -2,22 +2,56 @@
 S3-compatible storage implementation for the CMS.
 """
 
+import hashlib
+import heapq
 import os
 import tempfile
-from typing import BinaryIO, List, Optional, Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote
 import boto3
-import magic
 from botocore.exceptions import ClientError
+from werkzeug.http import http_date, quote_etag
 
-from .storage import StorageInterface
+from .storage import FileInfo, StorageInterface, stream_response
+from .transfer import (
+    GENERIC_CONTENT_TYPES,
+    SNIFF_SIZE,
+    ChecksumReader,
+    UploadResult,
+    detect_content_type,
+    get_transfer_metrics,
+    guess_content_type
+)
+
+# Direct (presigned) transfer defaults
+DEFAULT_PRESIGN_EXPIRES = 3600  # seconds
+DEFAULT_MULTIPART_THRESHOLD = 100 * 1024 * 1024
+DEFAULT_MULTIPART_PART_SIZE = 16 * 1024 * 1024
+DEFAULT_UPLOAD_CONCURRENCY = 4
+
+# S3 multipart limits
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+
+# Most keys one DeleteObjects request may delete
+DELETE_BATCH_SIZE = 1000
 
 
 class S3Storage(StorageInterface):
     """S3-compatible storage implementation."""
 
+    supports_direct_transfer = True
+
     def __init__(self, bucket_name: str, aws_access_key_id: Optional[str] = None,
                 aws_secret_access_key: Optional[str] = None, region_name: Optional[str] = None,
-                endpoint_url: Optional[str] = None):
+                endpoint_url: Optional[str] = None, presign_expires: int = DEFAULT_PRESIGN_EXPIRES,
+                multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD,
+                multipart_part_size: int = DEFAULT_MULTIPART_PART_SIZE,
+                redirect_downloads: bool = False,
+                upload_concurrency: int = DEFAULT_UPLOAD_CONCURRENCY):
         """
         Initialize S3 storage.
 
@@ -27,44 +61,222 @@ class S3Storage(StorageInterface):
             aws_secret_access_key: AWS secret access key (optional if using instance profile)
             region_name: AWS region name (optional)
             endpoint_url: S3-compatible endpoint URL (optional, for non-AWS S3)
+            presign_expires: Lifetime of presigned URLs in seconds
+            multipart_threshold: Size in bytes from which direct uploads are split into parts
+            multipart_part_size: Part size in bytes for multipart uploads, both
+                direct and through :meth:`upload`
+            redirect_downloads: Whether :meth:`send` redirects to a presigned
+                URL instead of streaming the object through the application
+            upload_concurrency: Parts uploaded in parallel by :meth:`upload`
         """
         self.bucket_name = bucket_name
-        self.s3 = boto3.client(
-            's3',
-            aws_access_key_id=aws_access_key_id,
-            aws_secret_access_key=aws_secret_access_key,
-            region_name=region_name,
-            endpoint_url=endpoint_url
-        )
-
-        # Ensure the bucket exists
-        try:
-            self.s3.head_bucket(Bucket=bucket_name)
-        except ClientError as e:
-            # If the bucket doesn't exist, create it
-            if e.response['Error']['Code'] == '404':
-                self.s3.create_bucket(Bucket=bucket_name)
-            else:
-                raise
+        self.presign_expires = presign_expires
+        self.multipart_threshold = multipart_threshold
+        self.multipart_part_size = max(MIN_PART_SIZE, multipart_part_size)
+        self.redirect_downloads = redirect_downloads
+        self.upload_concurrency = max(1, upload_concurrency)
+        self._client_kwargs = {
+            'aws_access_key_id': aws_access_key_id,
+            'aws_secret_access_key': aws_secret_access_key,
+            'region_name': region_name,
+            'endpoint_url': endpoint_url
+        }
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def s3(self):
+        """boto3 S3 client, created (and the bucket checked) on first use."""
+        if self._client is None:
+            self.connect()
+        return self._client
+
+    def connect(self) -> None:
+        """
+        Create the S3 client and make sure the bucket exists.
 
-    def save_file(self, file_data: BinaryIO, file_path: str) -> str:
+        Called on first use; call it directly to fail fast on a bad
+        configuration. The bucket is created if it does not exist.
+        """
+        with self._client_lock:
+            if self._client is not None:
+                return
+            client = boto3.client('s3', **self._client_kwargs)
+
+            # Ensure the bucket exists
+            try:
+                client.head_bucket(Bucket=self.bucket_name)
+            except ClientError as e:
+                # If the bucket doesn't exist, create it
+                if e.response['Error']['Code'] == '404':
+                    client.create_bucket(Bucket=self.bucket_name)
+                else:
+                    raise
+            self._client = client
+
+    def upload(self, file_data: BinaryIO, file_path: str, resume: bool = False,
+               content_type: Optional[str] = None) -> UploadResult:
         """
         Save a file to S3 storage.
 
+        The file is read sequentially in parts of ``multipart_part_size``
+        bytes, hashing as it goes. A file that fits in one part is stored
+        with a single PutObject; larger files become a multipart upload with
+        up to ``upload_concurrency`` parts in flight, so memory use stays
+        bounded whatever the file size.
+
+        With ``resume``, an unfinished multipart upload to the same key is
+        picked up where it stopped: parts S3 already holds are skipped when
+        their size and MD5 match the re-read data, and the multipart upload
+        is kept (rather than aborted) on failure so a later attempt, e.g.
+        after a worker restart, can continue it.
+
+        The content type is detected from the first part (unless given) and
+        stored as the object's ``ContentType``.
+
         Args:
             file_data: File data as a file-like object
             file_path: Path to save the file to
+            resume: Whether to continue an interrupted upload of the same file
+            content_type: Content type to store (detected from the first bytes if omitted)
 
         Returns:
-            str: Full path to the saved file
+            UploadResult: Stored path, size, SHA-256 and timing of the upload
         """
+        metrics = get_transfer_metrics('s3')
+        started = time.monotonic()
+
         # Clean the file path to prevent issues
         clean_path = file_path.lstrip('/')
+        reader = ChecksumReader(file_data)
+
+        try:
+            first_part = reader.read_exactly(self.multipart_part_size)
+            content_type = content_type or detect_content_type(first_part, clean_path)
+            if len(first_part) < self.multipart_part_size:
+                self.s3.put_object(
+                    Bucket=self.bucket_name, Key=clean_path, Body=first_part, ContentType=content_type
+                )
+                parts, resumed_parts = 1, 0
+            else:
+                parts, resumed_parts = self._upload_multipart(
+                    reader, clean_path, first_part, resume, content_type
+                )
+        except BaseException:
+            metrics.record_failure()
+            raise
+
+        result = UploadResult(
+            clean_path, reader.bytes_read, reader.hexdigest(), time.monotonic() - started,
+            parts, resumed_parts, content_type
+        )
+        metrics.record(result)
+        return result
 
-        # Upload the file
-        self.s3.upload_fileobj(file_data, self.bucket_name, clean_path)
+    def _find_multipart_upload(self, key: str) -> Tuple[Optional[str], Dict[int, Tuple[str, int]]]:
+        """
+        Find the most recent unfinished multipart upload to a key.
+
+        Returns:
+            Tuple: Upload ID (or None) and part number -> (ETag, size) of the
+            parts it holds
+        """
+        uploads = []
+        paginator = self.s3.get_paginator('list_multipart_uploads')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=key):
+            uploads.extend(upload for upload in page.get('Uploads', []) if upload['Key'] == key)
+        if not uploads:
+            return None, {}
+
+        upload_id = max(uploads, key=lambda upload: upload['Initiated'])['UploadId']
+        parts = {}
+        paginator = self.s3.get_paginator('list_parts')
+        for page in paginator.paginate(Bucket=self.bucket_name, Key=key, UploadId=upload_id):
+            for part in page.get('Parts', []):
+                parts[part['PartNumber']] = (part['ETag'], part['Size'])
+        return upload_id, parts
+
+    def _upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        response = self.s3.upload_part(
+            Bucket=self.bucket_name, Key=key, UploadId=upload_id, PartNumber=part_number, Body=data
+        )
+        return response['ETag']
 
-        return clean_path
+    def _upload_multipart(self, reader: ChecksumReader, key: str, first_part: bytes,
+                          resume: bool, content_type: str) -> Tuple[int, int]:
+        """
+        Upload the rest of a stream as a multipart upload.
+
+        Returns:
+            Tuple[int, int]: Number of parts, and how many of them were
+            already uploaded by an earlier attempt
+        """
+        upload_id, existing = self._find_multipart_upload(key) if resume else (None, {})
+        if upload_id is None:
+            upload_id = self.s3.create_multipart_upload(
+                Bucket=self.bucket_name, Key=key, ContentType=content_type
+            )['UploadId']
+
+        etags: Dict[int, str] = {}
+        futures = []
+        errors = []
+        resumed_parts = 0
+        # Parts read but not yet uploaded, bounding memory use
+        in_flight = threading.BoundedSemaphore(self.upload_concurrency)
+
+        def _done(future):
+            in_flight.release()
+            if future.exception() is not None:
+                errors.append(future.exception())
+
+        executor = ThreadPoolExecutor(max_workers=self.upload_concurrency, thread_name_prefix='s3-upload')
+        try:
+            part_number, data = 1, first_part
+            while data:
+                if part_number > MAX_PARTS:
+                    raise ValueError(
+                        f"File exceeds {MAX_PARTS} parts of {self.multipart_part_size} bytes"
+                    )
+
+                known = existing.get(part_number)
+                if known and known[1] == len(data) and \
+                        known[0].strip('"') == hashlib.md5(data, usedforsecurity=False).hexdigest():
+                    etags[part_number] = known[0]
+                    resumed_parts += 1
+                else:
+                    in_flight.acquire()
+                    if errors:
+                        in_flight.release()
+                        raise errors[0]
+                    future = executor.submit(self._upload_part, key, upload_id, part_number, data)
+                    future.add_done_callback(_done)
+                    futures.append((part_number, future))
+
+                part_number += 1
+                data = reader.read_exactly(self.multipart_part_size)
+
+            for number, future in futures:
+                etags[number] = future.result()
+
+            self.s3.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': [
+                    {'PartNumber': number, 'ETag': etag} for number, etag in sorted(etags.items())
+                ]}
+            )
+        except BaseException:
+            for _, future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+            if not resume:
+                self.abort_upload(key, upload_id)
+            raise
+        finally:
+            executor.shutdown(wait=True)
+
+        return len(etags), resumed_parts
 
     def get_file(self, file_path: str) -> Tuple[BinaryIO, str]:
         """
@@ -91,29 +303,393 @@ class S3Storage(StorageInterface):
             else:
                 raise
 
-        # Get the content type from head or detect it after downloading
-        content_type = head.get('ContentType', 'application/octet-stream')
-
         # Download the file to a temporary file
         temp_file = tempfile.TemporaryFile()
         self.s3.download_fileobj(self.bucket_name, clean_path, temp_file)
         temp_file.seek(0)
 
-        # If content type is generic, try to detect it
-        if content_type == 'application/octet-stream':
-            # Create another temporary file for magic to use
-            with tempfile.NamedTemporaryFile(delete=False) as named_temp:
-                temp_file.seek(0)
-                named_temp.write(temp_file.read())
-                named_temp.close()
-                
-                try:
-                    content_type = magic.from_file(named_temp.name, mime=True)
-                finally:
-                    os.unlink(named_temp.name)
-                    temp_file.seek(0)
-
-        return temp_file, content_type
+        return temp_file, self._content_type(head, clean_path)
+
+    def _content_type(self, obj: dict, file_path: str) -> str:
+        """Stored content type of an object, or a guess from its name for objects saved without one."""
+        content_type = obj.get('ContentType')
+        if not content_type or content_type in GENERIC_CONTENT_TYPES:
+            return guess_content_type(file_path)
+        return content_type
+
+    def _get_object(self, file_path: str, **kwargs) -> dict:
+        """
+        Start a GetObject request.
+
+        Args:
+            file_path: Path to the file
+            **kwargs: Extra GetObject parameters
+
+        Returns:
+            dict: GetObject response; ``Body`` streams the object
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        try:
+            return self.s3.get_object(Bucket=self.bucket_name, Key=file_path.lstrip('/'), **kwargs)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                raise FileNotFoundError(f"File not found: {file_path}")
+            raise
+
+    def _open_object(self, file_path: str, **kwargs) -> Tuple[BinaryIO, str, dict]:
+        obj = self._get_object(file_path, **kwargs)
+        return obj['Body'], self._content_type(obj, file_path), obj
+
+    def open_stream(self, file_path: str) -> Tuple[BinaryIO, str]:
+        """
+        Open a file in S3 storage for reading without downloading it first.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            Tuple[BinaryIO, str]: Stream over the object body (the caller
+            must close it) and content type
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        body, content_type, _ = self._open_object(file_path)
+        return body, content_type
+
+    def _request_conditions(self, request) -> Tuple[dict, bool]:
+        """
+        Translate the conditional and Range headers of a request into GetObject parameters.
+
+        Args:
+            request: Flask request
+
+        Returns:
+            Tuple[dict, bool]: GetObject parameters, and whether the range
+            only applies if the object still matches ``If-Range``
+        """
+        params = {}
+        # If-None-Match takes precedence over If-Modified-Since (RFC 7232, section 6)
+        if request.headers.get('If-None-Match'):
+            params['IfNoneMatch'] = request.headers['If-None-Match']
+        elif request.if_modified_since:
+            params['IfModifiedSince'] = request.if_modified_since
+
+        # S3 serves a single byte range; multi-range requests get the whole object
+        if request.range is None or len(request.range.ranges) != 1:
+            return params, False
+        params['Range'] = request.range.to_header()
+
+        if_range = request.if_range
+        if if_range.etag:
+            params['IfMatch'] = quote_etag(if_range.etag)
+        elif if_range.date:
+            params['IfUnmodifiedSince'] = if_range.date
+        else:
+            return params, False
+        return params, True
+
+    def send(self, file_path: str, download_name: Optional[str] = None,
+             as_attachment: bool = False, mimetype: Optional[str] = None):
+        """
+        Build a Flask response that streams a file from S3 storage in chunks.
+
+        ``Range``, ``If-Range``, ``If-None-Match`` and ``If-Modified-Since``
+        headers of the current request are passed through to GetObject, so
+        S3 evaluates them and only the requested bytes are transferred:
+        unchanged objects get 304, single byte ranges 206 and unsatisfiable
+        ranges 416. With ``redirect_downloads`` the client is redirected to a
+        presigned URL instead and S3 serves the bytes itself.
+
+        Args:
+            file_path: Path to the file
+            download_name: File name for the Content-Disposition header
+            as_attachment: Whether the browser should download rather than display the file
+            mimetype: Content type to send (taken from the object if omitted)
+
+        Returns:
+            flask.Response: Streaming response
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        from flask import redirect, request
+
+        if self.redirect_downloads:
+            return redirect(self.download_url(file_path, download_name, as_attachment, mimetype))
+
+        params, if_range = self._request_conditions(request)
+
+        try:
+            try:
+                body, content_type, obj = self._open_object(file_path, **params)
+            except ClientError as e:
+                if not if_range or e.response['Error']['Code'] not in ('412', 'PreconditionFailed'):
+                    raise
+                # If-Range did not match: the object changed, so send all of it
+                for key in ('Range', 'IfMatch', 'IfUnmodifiedSince'):
+                    params.pop(key, None)
+                body, content_type, obj = self._open_object(file_path, **params)
+        except ClientError as e:
+            code = e.response['Error']['Code']
+            headers = e.response.get('ResponseMetadata', {}).get('HTTPHeaders', {})
+            if code in ('304', 'NotModified'):
+                return self._empty_response(304, {
+                    'ETag': headers.get('etag'),
+                    'Last-Modified': headers.get('last-modified')
+                })
+            if code == 'InvalidRange':
+                size = self.s3.head_object(Bucket=self.bucket_name, Key=file_path.lstrip('/'))['ContentLength']
+                return self._empty_response(416, {'Content-Range': f'bytes */{size}'})
+            raise
+
+        response_headers = {'Accept-Ranges': 'bytes'}
+        if obj.get('ETag'):
+            response_headers['ETag'] = obj['ETag']
+        if obj.get('LastModified'):
+            response_headers['Last-Modified'] = http_date(obj['LastModified'])
+        if obj.get('ContentRange'):
+            response_headers['Content-Range'] = obj['ContentRange']
+
+        return stream_response(
+            body,
+            mimetype or content_type,
+            download_name or os.path.basename(file_path),
+            as_attachment,
+            obj.get('ContentLength'),
+            status=206 if obj.get('ContentRange') else 200,
+            headers=response_headers
+        )
+
+    def _empty_response(self, status: int, headers: dict):
+        from flask import current_app
+
+        response = current_app.response_class(status=status)
+        response.headers.update({key: value for key, value in headers.items() if value})
+        response.headers['Accept-Ranges'] = 'bytes'
+        return response
+
+    def _presign(self, client_method: str, expires_in: Optional[int] = None, **params) -> str:
+        return self.s3.generate_presigned_url(
+            client_method,
+            Params={'Bucket': self.bucket_name, **params},
+            ExpiresIn=expires_in or self.presign_expires
+        )
+
+    def create_upload(self, file_path: str, content_type: Optional[str] = None,
+                      size: Optional[int] = None) -> Dict:
+        """
+        Start a direct upload to S3 using presigned URLs.
+
+        Files of ``multipart_threshold`` bytes or more become a multipart
+        upload with one presigned ``UploadPart`` URL per part; smaller ones
+        get a single presigned ``PutObject`` URL. When ``content_type`` is
+        given it is part of the signature, so the client must send the same
+        ``Content-Type`` header (single uploads only).
+
+        Args:
+            file_path: Path to upload the file to
+            content_type: Content type the client will send
+            size: File size in bytes
+
+        Returns:
+            Dict: Upload instructions
+        """
+        clean_path = file_path.lstrip('/')
+
+        if size is None or size < self.multipart_threshold:
+            params = {'Key': clean_path}
+            headers = {}
+            if content_type:
+                params['ContentType'] = content_type
+                headers['Content-Type'] = content_type
+            return {
+                'file_path': clean_path,
+                'method': 'PUT',
+                'url': self._presign('put_object', **params),
+                'headers': headers,
+                'expires_in': self.presign_expires
+            }
+
+        # Grow the parts if the file would otherwise need more than S3 allows
+        part_size = max(self.multipart_part_size, -(-size // MAX_PARTS))
+        part_count = max(1, -(-size // part_size))
+
+        kwargs = {'Bucket': self.bucket_name, 'Key': clean_path}
+        if content_type:
+            kwargs['ContentType'] = content_type
+        upload_id = self.s3.create_multipart_upload(**kwargs)['UploadId']
+
+        return {
+            'file_path': clean_path,
+            'method': 'PUT',
+            'upload_id': upload_id,
+            'part_size': part_size,
+            'parts': [
+                {
+                    'part_number': part_number,
+                    'url': self._presign(
+                        'upload_part', Key=clean_path, UploadId=upload_id, PartNumber=part_number
+                    )
+                }
+                for part_number in range(1, part_count + 1)
+            ],
+            'expires_in': self.presign_expires
+        }
+
+    def complete_upload(self, file_path: str, upload_id: Optional[str] = None) -> Dict:
+        """
+        Finish a direct upload to S3.
+
+        Multipart uploads are assembled from the parts S3 has received, so
+        clients do not need to report part ETags.
+
+        Args:
+            file_path: Path the file was uploaded to
+            upload_id: Multipart upload ID, if the upload was split into parts
+
+        Returns:
+            Dict: ``size`` and ``content_type`` of the stored object
+
+        Raises:
+            FileNotFoundError: If nothing was uploaded
+        """
+        clean_path = file_path.lstrip('/')
+
+        if upload_id:
+            parts = []
+            paginator = self.s3.get_paginator('list_parts')
+            try:
+                for page in paginator.paginate(Bucket=self.bucket_name, Key=clean_path, UploadId=upload_id):
+                    parts.extend(
+                        {'PartNumber': part['PartNumber'], 'ETag': part['ETag']}
+                        for part in page.get('Parts', [])
+                    )
+            except ClientError as e:
+                if e.response['Error']['Code'] in ('404', 'NoSuchUpload'):
+                    raise FileNotFoundError(f"Upload not found: {upload_id}")
+                raise
+            if not parts:
+                raise FileNotFoundError(f"No parts uploaded for: {file_path}")
+
+            self.s3.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=clean_path,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+
+        try:
+            head = self.s3.head_object(Bucket=self.bucket_name, Key=clean_path)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                raise FileNotFoundError(f"File not found: {file_path}")
+            raise
+
+        content_type = head.get('ContentType')
+        if not content_type or content_type in GENERIC_CONTENT_TYPES:
+            # The client sent no type: detect it once and store it on the object
+            content_type = self._store_detected_type(clean_path, head)
+
+        return {'size': head['ContentLength'], 'content_type': content_type}
+
+    def _store_detected_type(self, key: str, head: dict) -> str:
+        """Detect an object's content type from its first bytes and store it as its ContentType."""
+        obj = self._get_object(key, Range=f'bytes=0-{SNIFF_SIZE - 1}')
+        with obj['Body'] as body:
+            content_type = detect_content_type(body.read(), key)
+
+        # Objects cannot be modified in place: copy the object onto itself
+        # with replaced metadata (the managed copy handles objects over 5 GB)
+        extra_args = {
+            'MetadataDirective': 'REPLACE',
+            'ContentType': content_type,
+            'Metadata': head.get('Metadata', {})
+        }
+        for field in ('CacheControl', 'ContentDisposition', 'ContentEncoding', 'ContentLanguage'):
+            if head.get(field):
+                extra_args[field] = head[field]
+        self.s3.copy(
+            {'Bucket': self.bucket_name, 'Key': key},
+            self.bucket_name,
+            key,
+            ExtraArgs=extra_args
+        )
+        return content_type
+
+    def backfill_content_type(self, file_path: str, force: bool = False) -> Optional[str]:
+        """
+        Detect and store the content type of an object saved without one.
+
+        Args:
+            file_path: Path to the file
+            force: Re-detect even if a specific content type is already stored
+
+        Returns:
+            Optional[str]: The stored content type, or None if the object
+            already had one
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        clean_path = file_path.lstrip('/')
+
+        try:
+            head = self.s3.head_object(Bucket=self.bucket_name, Key=clean_path)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                raise FileNotFoundError(f"File not found: {file_path}")
+            raise
+
+        content_type = head.get('ContentType')
+        if content_type and content_type not in GENERIC_CONTENT_TYPES and not force:
+            return None
+
+        return self._store_detected_type(clean_path, head)
+
+    def abort_upload(self, file_path: str, upload_id: str) -> None:
+        """
+        Abandon a multipart direct upload and discard its parts.
+
+        Args:
+            file_path: Path the file was being uploaded to
+            upload_id: Multipart upload ID
+        """
+        try:
+            self.s3.abort_multipart_upload(
+                Bucket=self.bucket_name, Key=file_path.lstrip('/'), UploadId=upload_id
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] not in ('404', 'NoSuchUpload'):
+                raise
+
+    def download_url(self, file_path: str, download_name: Optional[str] = None,
+                     as_attachment: bool = False, mimetype: Optional[str] = None) -> Optional[str]:
+        """
+        Get a presigned GetObject URL for a file.
+
+        Args:
+            file_path: Path to the file
+            download_name: File name for the Content-Disposition header
+            as_attachment: Whether the browser should download rather than display the file
+            mimetype: Content type S3 should send
+
+        Returns:
+            Optional[str]: Presigned URL, valid for ``presign_expires`` seconds
+        """
+        params = {'Key': file_path.lstrip('/')}
+
+        download_name = download_name or os.path.basename(file_path)
+        disposition = 'attachment' if as_attachment else 'inline'
+        params['ResponseContentDisposition'] = (
+            f"{disposition}; filename*=UTF-8''{quote(download_name)}"
+        )
+        if mimetype:
+            params['ResponseContentType'] = mimetype
+
+        return self._presign('get_object', **params)
 
     def delete_file(self, file_path: str) -> bool:
         """
@@ -134,32 +710,81 @@ class S3Storage(StorageInterface):
         except ClientError:
             return False
 
-    def list_files(self, directory_path: str) -> List[str]:
+    def delete_files(self, file_paths: Iterable[str]) -> List[str]:
         """
-        List files in a directory.
+        Delete several files from S3 storage.
+
+        Uses one ``DeleteObjects`` request per 1000 files.
 
         Args:
-            directory_path: Path to the directory
+            file_paths: Paths of the files
 
         Returns:
-            List[str]: List of file paths
+            List[str]: Paths that could not be deleted
         """
-        # Clean the directory path
-        clean_path = directory_path.lstrip('/').rstrip('/') + '/' if directory_path else ''
-
+        failed = []
+        batch = {}
+        for file_path in file_paths:
+            batch[file_path.lstrip('/')] = file_path
+            if len(batch) == DELETE_BATCH_SIZE:
+                failed.extend(self._delete_objects(batch))
+                batch = {}
+        if batch:
+            failed.extend(self._delete_objects(batch))
+        return failed
+
+    def _delete_objects(self, batch: Dict[str, str]) -> List[str]:
+        """Delete the keys of ``batch`` (key -> path) in one request; return the paths not deleted."""
         try:
-            paginator = self.s3.get_paginator('list_objects_v2')
-            pages = paginator.paginate(Bucket=self.bucket_name, Prefix=clean_path)
+            response = self.s3.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+            )
+        except ClientError:
+            return list(batch.values())
+        return [batch[error['Key']] for error in response.get('Errors', []) if error['Key'] in batch]
 
-            files = []
-            for page in pages:
-                if 'Contents' in page:
-                    for obj in page['Contents']:
-                        files.append(obj['Key'])
+    def iter_files(self, prefix: str = '', start_after: Optional[str] = None,
+                   delimiter: Optional[str] = None) -> Iterator[FileInfo]:
+        """
+        Iterate over the files in a directory, in key order.
 
-            return files
-        except ClientError:
-            return []
+        Pages of ``ListObjectsV2`` are fetched as the iteration reaches
+        them, with sizes and modification times from the listing; with a
+        delimiter, its ``CommonPrefixes`` become the directory entries.
+
+        Args:
+            prefix: Path of the directory ('' for all files)
+            start_after: Only yield entries whose key sorts after this one
+            delimiter: List one level only, e.g. ``'/'``
+
+        Returns:
+            Iterator[FileInfo]: The entries, ordered by key
+
+        Raises:
+            ClientError: If listing fails
+        """
+        clean_path = prefix.lstrip('/').rstrip('/') + '/' if prefix else ''
+        params = {'Bucket': self.bucket_name, 'Prefix': clean_path}
+        if start_after:
+            start_after = start_after.lstrip('/')
+            params['StartAfter'] = start_after
+        if delimiter:
+            params['Delimiter'] = delimiter
+
+        paginator = self.s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(**params):
+            files = (
+                FileInfo(obj['Key'], obj['Size'], obj['LastModified'].timestamp())
+                for obj in page.get('Contents', [])
+            )
+            # A prefix can come back although start_after is (or sorts after) it
+            directories = (
+                FileInfo(common['Prefix'], is_dir=True)
+                for common in page.get('CommonPrefixes', [])
+                if not start_after or common['Prefix'] > start_after
+            )
+            yield from heapq.merge(files, directories, key=lambda info: info.file_path)
 
     def file_exists(self, file_path: str) -> bool:
         """
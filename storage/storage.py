@@ -4,24 +4,187 @@ Storage interface for the CMS.
 
 import os
 from abc import ABC, abstractmethod
-from typing import BinaryIO, List, Optional, Tuple
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .transfer import UploadResult
+
+# Read size when streaming files to a client
+STREAM_CHUNK_SIZE = 256 * 1024
+
+
+def iter_chunks(stream: BinaryIO, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Read a stream in chunks, closing it when done.
+
+    Args:
+        stream: File-like object to read
+        chunk_size: Maximum chunk size in bytes
+
+    Yields:
+        bytes: File data
+    """
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        stream.close()
+
+
+def stream_response(stream: BinaryIO, mimetype: str, download_name: Optional[str] = None,
+                    as_attachment: bool = False, content_length: Optional[int] = None,
+                    status: int = 200, headers: Optional[Dict[str, str]] = None):
+    """
+    Build a Flask response that streams a file-like object to the client.
+
+    Args:
+        stream: File-like object to send; closed once the response is sent
+        mimetype: Content type of the response
+        download_name: File name for the Content-Disposition header
+        as_attachment: Whether the browser should download rather than display the file
+        content_length: Length of the body in bytes, if known
+        status: HTTP status code (e.g. 206 for a partial response)
+        headers: Extra headers such as ETag, Last-Modified or Content-Range
+
+    Returns:
+        flask.Response: Streaming response
+    """
+    from flask import current_app
+
+    response = current_app.response_class(
+        iter_chunks(stream),
+        status=status,
+        mimetype=mimetype,
+        direct_passthrough=True
+    )
+    # HEAD requests never iterate the body, so close the stream explicitly too
+    response.call_on_close(stream.close)
+    if content_length is not None:
+        response.content_length = content_length
+    if headers:
+        response.headers.update(headers)
+    set_content_disposition(response, download_name, as_attachment)
+    return response
+
+
+def set_content_disposition(response, download_name: Optional[str] = None, as_attachment: bool = False):
+    """
+    Set the Content-Disposition header of a response.
+
+    Args:
+        response: Flask response
+        download_name: File name to suggest to the browser
+        as_attachment: Whether the browser should download rather than display the file
+    """
+    if as_attachment or download_name:
+        disposition = 'attachment' if as_attachment else 'inline'
+        if download_name:
+            response.headers.set('Content-Disposition', disposition, filename=download_name)
+        else:
+            response.headers.set('Content-Disposition', disposition)
+
+
+class FileInfo:
+    """A stored file or directory, as listed by :meth:`StorageInterface.iter_files`."""
+
+    def __init__(self, file_path: str, size: Optional[int] = None, modified: Optional[float] = None,
+                 is_dir: bool = False):
+        """
+        Initialize the file info.
+
+        Args:
+            file_path: Path of the file; directories end with the delimiter
+            size: Size in bytes (None for directories, or if the backend
+                does not know it)
+            modified: Last modification time as a Unix timestamp (None for
+                directories, or if the backend does not know it)
+            is_dir: Whether this is a directory of a delimited listing
+        """
+        self.file_path = file_path
+        self.size = size
+        self.modified = modified
+        self.is_dir = is_dir
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary."""
+        return {
+            'file_path': self.file_path,
+            'size': self.size,
+            'modified': self.modified,
+            'is_dir': self.is_dir
+        }
 
 
 class StorageInterface(ABC):
     """Interface for storage backends."""
 
-    @abstractmethod
-    def save_file(self, file_data: BinaryIO, file_path: str) -> str:
+    #: Whether clients can transfer file bytes directly to and from the
+    #: backend through :meth:`create_upload` and :meth:`download_url`
+    supports_direct_transfer = False
+
+    def connect(self) -> None:
+        """
+        Connect to the backend and check it is usable.
+
+        Backends connect lazily on first use; this does it up front so a bad
+        configuration fails at start-up. The default does nothing.
+        """
+
+    def save_file(self, file_data: BinaryIO, file_path: str, content_type: Optional[str] = None) -> str:
         """
         Save a file to storage.
 
         Args:
             file_data: File data as a file-like object
             file_path: Path to save the file to
+            content_type: Content type to store with the file (detected from
+                its first bytes if omitted)
 
         Returns:
             str: Full path to the saved file
         """
+        return self.upload(file_data, file_path, content_type=content_type).file_path
+
+    @abstractmethod
+    def upload(self, file_data: BinaryIO, file_path: str, resume: bool = False,
+               content_type: Optional[str] = None) -> UploadResult:
+        """
+        Save a file to storage, reading it once in sequential chunks.
+
+        The content type is detected from the first bytes read (unless
+        given) and stored with the file, so reads never have to sniff it.
+
+        Args:
+            file_data: File data as a file-like object, read from its current position
+            file_path: Path to save the file to
+            resume: Whether to continue an interrupted earlier upload of the
+                same file to the same path instead of starting over (backends
+                without resumable uploads start over)
+            content_type: Content type to store with the file
+
+        Returns:
+            UploadResult: Stored path, size, SHA-256, content type and timing of the upload
+        """
+        pass
+
+    @abstractmethod
+    def backfill_content_type(self, file_path: str, force: bool = False) -> Optional[str]:
+        """
+        Detect and store the content type of a file saved without one.
+
+        Args:
+            file_path: Path to the file
+            force: Re-detect even if a specific content type is already stored
+
+        Returns:
+            Optional[str]: The stored content type, or None if the file
+            already had one
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
         pass
 
     @abstractmethod
@@ -37,6 +200,113 @@ class StorageInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def open_stream(self, file_path: str) -> Tuple[BinaryIO, str]:
+        """
+        Open a file in storage for reading without copying it.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            Tuple[BinaryIO, str]: Readable stream positioned at the start of
+            the file (the caller must close it) and content type
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        pass
+
+    def send(self, file_path: str, download_name: Optional[str] = None,
+             as_attachment: bool = False, mimetype: Optional[str] = None):
+        """
+        Build a Flask response that sends a file to the client.
+
+        Backends override this to use a faster path (e.g. sendfile) and to
+        answer ``Range`` and conditional requests where they can; the
+        default streams the whole of :meth:`open_stream` in chunks.
+
+        Args:
+            file_path: Path to the file
+            download_name: File name for the Content-Disposition header
+            as_attachment: Whether the browser should download rather than display the file
+            mimetype: Content type to send (detected by the backend if omitted)
+
+        Returns:
+            flask.Response: Response sending the file
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        stream, content_type = self.open_stream(file_path)
+        return stream_response(stream, mimetype or content_type, download_name, as_attachment)
+
+    def create_upload(self, file_path: str, content_type: Optional[str] = None,
+                      size: Optional[int] = None) -> Dict:
+        """
+        Start a direct upload that bypasses the application server.
+
+        Args:
+            file_path: Path to upload the file to
+            content_type: Content type the client will send
+            size: File size in bytes; large files are split into parts
+
+        Returns:
+            Dict: Upload instructions with ``file_path``, ``method`` and
+            either ``url`` (single request) or ``upload_id`` and ``parts``
+            (one URL per part)
+
+        Raises:
+            NotImplementedError: If the backend does not support direct transfers
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support direct uploads")
+
+    def complete_upload(self, file_path: str, upload_id: Optional[str] = None) -> Dict:
+        """
+        Finish a direct upload started with :meth:`create_upload`.
+
+        Args:
+            file_path: Path the file was uploaded to
+            upload_id: Multipart upload ID, if the upload was split into parts
+
+        Returns:
+            Dict: ``size`` and ``content_type`` of the stored file
+
+        Raises:
+            FileNotFoundError: If nothing was uploaded
+            NotImplementedError: If the backend does not support direct transfers
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support direct uploads")
+
+    def abort_upload(self, file_path: str, upload_id: str) -> None:
+        """
+        Abandon a multipart direct upload and discard its parts.
+
+        Args:
+            file_path: Path the file was being uploaded to
+            upload_id: Multipart upload ID
+
+        Raises:
+            NotImplementedError: If the backend does not support direct transfers
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support direct uploads")
+
+    def download_url(self, file_path: str, download_name: Optional[str] = None,
+                     as_attachment: bool = False, mimetype: Optional[str] = None) -> Optional[str]:
+        """
+        Get a temporary URL from which clients can download a file directly.
+
+        Args:
+            file_path: Path to the file
+            download_name: File name for the Content-Disposition header
+            as_attachment: Whether the browser should download rather than display the file
+            mimetype: Content type to send
+
+        Returns:
+            Optional[str]: The URL, or None if the backend cannot serve files directly
+        """
+        return None
+
     @abstractmethod
     def delete_file(self, file_path: str) -> bool:
         """
@@ -50,16 +320,58 @@ class StorageInterface(ABC):
         """
         pass
 
-    @abstractmethod
+    def delete_files(self, file_paths: Iterable[str]) -> List[str]:
+        """
+        Delete several files from storage.
+
+        The default deletes them one at a time; backends with a bulk delete
+        override it.
+
+        Args:
+            file_paths: Paths of the files
+
+        Returns:
+            List[str]: Paths that could not be deleted
+        """
+        return [file_path for file_path in file_paths if not self.delete_file(file_path)]
+
     def list_files(self, directory_path: str) -> List[str]:
         """
-        List files in a directory.
+        List files in a directory, recursively.
+
+        Holds the whole listing in memory; use :meth:`iter_files` for large
+        directories.
 
         Args:
             directory_path: Path to the directory
 
         Returns:
-            List[str]: List of file paths
+            List[str]: List of file paths, in path order
+        """
+        return [info.file_path for info in self.iter_files(directory_path)]
+
+    @abstractmethod
+    def iter_files(self, prefix: str = '', start_after: Optional[str] = None,
+                   delimiter: Optional[str] = None) -> Iterator[FileInfo]:
+        """
+        Iterate over the files in a directory, in path order.
+
+        Entries are yielded as the backend lists them, so a whole bucket can
+        be scanned in constant memory. The path of the last entry is a
+        resume token: passing it as ``start_after`` continues the listing
+        after it, e.g. for the next page or after an interruption. Listing
+        errors are raised, never taken for an empty directory.
+
+        Args:
+            prefix: Path of the directory ('' for all files)
+            start_after: Only yield entries whose path sorts after this one
+            delimiter: List one level only: files directly in the directory,
+                and each subdirectory once, as an entry whose path ends with
+                the delimiter (``is_dir``). Without it, all files below the
+                directory are listed.
+
+        Returns:
+            Iterator[FileInfo]: The entries, ordered by path
         """
         pass
 
@@ -0,0 +1,225 @@
+"""
+Upload pipeline helpers shared by the storage backends.
+"""
+
+import hashlib
+import mimetypes
+import mmap
+import threading
+from typing import BinaryIO, Dict, Optional
+
+# Copy buffer for local writes: a whole number of memory pages, large enough
+# that multi-GB captures are copied in few system calls
+COPY_BUFFER_SIZE = (1024 * 1024 // mmap.PAGESIZE) * mmap.PAGESIZE
+
+# Bytes from the start of a file used to detect its content type
+SNIFF_SIZE = 2048
+
+DEFAULT_CONTENT_TYPE = 'application/octet-stream'
+
+# Content types that say nothing about the file (S3 reports the latter for
+# objects uploaded without one)
+GENERIC_CONTENT_TYPES = ('application/octet-stream', 'binary/octet-stream')
+
+
+def guess_content_type(file_path: str) -> str:
+    """
+    Guess a content type from a file name, without reading the file.
+
+    Args:
+        file_path: Path or name of the file
+
+    Returns:
+        str: Content type, or the generic binary type if the extension is unknown
+    """
+    return mimetypes.guess_type(file_path)[0] or DEFAULT_CONTENT_TYPE
+
+
+def detect_content_type(head: bytes, file_path: Optional[str] = None) -> str:
+    """
+    Detect a content type from the first bytes of a file.
+
+    Args:
+        head: Leading bytes of the file (only the first SNIFF_SIZE are used)
+        file_path: File name, used when the bytes are not recognised
+
+    Returns:
+        str: Content type
+    """
+    content_type = None
+    if head:
+        # libmagic is only loaded when a write actually needs sniffing
+        import magic
+        content_type = magic.from_buffer(bytes(head[:SNIFF_SIZE]), mime=True)
+    if (not content_type or content_type in GENERIC_CONTENT_TYPES) and file_path:
+        return guess_content_type(file_path)
+    return content_type or DEFAULT_CONTENT_TYPE
+
+
+class UploadResult:
+    """Outcome of storing a file."""
+
+    def __init__(self, file_path: str, size: int, sha256: str, seconds: float,
+                 parts: int = 1, resumed_parts: int = 0, content_type: str = DEFAULT_CONTENT_TYPE):
+        """
+        Initialize the result.
+
+        Args:
+            file_path: Path the file was stored under
+            size: Bytes stored
+            sha256: Hex SHA-256 of the stored bytes, computed while copying
+            seconds: Wall-clock duration of the upload
+            parts: Number of parts the file was stored in
+            resumed_parts: Parts found already uploaded by an earlier attempt
+            content_type: Content type stored with the file
+        """
+        self.file_path = file_path
+        self.size = size
+        self.sha256 = sha256
+        self.seconds = seconds
+        self.parts = parts
+        self.resumed_parts = resumed_parts
+        self.content_type = content_type
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary."""
+        return {
+            'file_path': self.file_path,
+            'size': self.size,
+            'sha256': self.sha256,
+            'seconds': self.seconds,
+            'parts': self.parts,
+            'resumed_parts': self.resumed_parts,
+            'content_type': self.content_type
+        }
+
+
+class ChecksumReader:
+    """
+    Read-only wrapper that hashes and counts bytes as they are read.
+
+    Reads must be sequential: the digest covers the bytes in the order the
+    caller consumed them.
+    """
+
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+        self._hash = hashlib.sha256()
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._stream.read(size)
+        self._hash.update(data)
+        self.bytes_read += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        readinto = getattr(self._stream, 'readinto', None)
+        if readinto is None:
+            data = self._stream.read(len(buffer))
+            size = len(data)
+            buffer[:size] = data
+        else:
+            size = readinto(buffer) or 0
+        self._hash.update(memoryview(buffer)[:size])
+        self.bytes_read += size
+        return size
+
+    def read_exactly(self, size: int) -> bytes:
+        """Read ``size`` bytes, or fewer only at the end of the stream."""
+        chunks = []
+        remaining = size
+        while remaining > 0:
+            data = self.read(remaining)
+            if not data:
+                break
+            chunks.append(data)
+            remaining -= len(data)
+        return b''.join(chunks)
+
+    def hexdigest(self) -> str:
+        """Hex SHA-256 of everything read so far."""
+        return self._hash.hexdigest()
+
+
+class TransferMetrics:
+    """Thread-safe upload counters for one storage backend."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.uploads = 0
+        self.failures = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.parts = 0
+        self.resumed_parts = 0
+        self.last_throughput = None
+
+    def record(self, result: UploadResult):
+        """Count a finished upload."""
+        with self._lock:
+            self.uploads += 1
+            self.bytes += result.size
+            self.seconds += result.seconds
+            self.parts += result.parts
+            self.resumed_parts += result.resumed_parts
+            if result.seconds > 0:
+                self.last_throughput = result.size / result.seconds
+
+    def record_failure(self):
+        """Count a failed upload."""
+        with self._lock:
+            self.failures += 1
+
+    def stats(self) -> Dict:
+        """
+        Get a snapshot of the counters.
+
+        Returns:
+            Dict: Counters plus average and last throughput in bytes per second
+        """
+        with self._lock:
+            return {
+                'uploads': self.uploads,
+                'failures': self.failures,
+                'bytes': self.bytes,
+                'seconds': round(self.seconds, 3),
+                'parts': self.parts,
+                'resumed_parts': self.resumed_parts,
+                'avg_bytes_per_second': self.bytes / self.seconds if self.seconds > 0 else None,
+                'last_bytes_per_second': self.last_throughput
+            }
+
+
+_metrics: Dict[str, TransferMetrics] = {}
+_metrics_lock = threading.Lock()
+
+
+def get_transfer_metrics(backend: str) -> TransferMetrics:
+    """
+    Get the upload counters for a backend, creating them on first use.
+
+    Args:
+        backend: Backend name, e.g. 'local' or 's3'
+
+    Returns:
+        TransferMetrics: The backend's counters
+    """
+    with _metrics_lock:
+        metrics = _metrics.get(backend)
+        if metrics is None:
+            metrics = _metrics[backend] = TransferMetrics()
+        return metrics
+
+
+def transfer_stats() -> Dict[str, Dict]:
+    """
+    Get upload counters for every backend that has stored a file.
+
+    Returns:
+        Dict[str, Dict]: Backend name to counter snapshot
+    """
+    with _metrics_lock:
+        backends = dict(_metrics)
+    return {backend: metrics.stats() for backend, metrics in backends.items()}
+
@@ -0,0 +1,31 @@
+"""
+Shared fixtures: an app on a throwaway SQLite database with foreign keys
+enforced, as PostgreSQL does.
+"""
+
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import event
+
+os.environ.setdefault('TEST_DATABASE_URI', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+
+from app import create_app
+from api.models import db
+
+
+def _enable_foreign_keys(dbapi_connection, connection_record):
+    dbapi_connection.execute('PRAGMA foreign_keys=ON')
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        event.listen(db.engine, 'connect', _enable_foreign_keys)
+        db.engine.dispose()
+        yield app
+        db.session.remove()
+        db.drop_all()
+        event.remove(db.engine, 'connect', _enable_foreign_keys)
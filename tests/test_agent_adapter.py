@@ -0,0 +1,48 @@
+"""
+Tests for the Breaking Point agent adapter used over HTTP (integration.agent_adapter).
+"""
+
+import pytest
+
+# Test* classes are used through their modules so that pytest does not collect them
+from api import models
+from api.controllers import test_controller
+from api.models import db
+from integration.agent_adapter import (
+    AgentError, HTTPBreakingPointAPI, ResourceNotFoundError, get_agent, reset_agent
+)
+
+
+@pytest.fixture
+def http_agent(app):
+    app.config['BP_MCP_AGENT_IN_PROCESS'] = False
+    reset_agent()
+    agent = get_agent(app.config)
+    assert not agent.in_process
+    yield agent
+    reset_agent()
+
+
+def test_create_test_raises_the_agent_error(http_agent):
+    bp_api = http_agent.BreakingPointAPI()
+    with pytest.raises(http_agent.APIError):
+        bp_api.create_test({'name': 'config'})
+    assert http_agent.APIError is AgentError
+
+
+def test_update_of_a_missing_test_does_not_create_it(http_agent, monkeypatch):
+    def not_found(self, test_id, config_data):
+        raise ResourceNotFoundError(test_id)
+
+    def create_test(self, config_data):
+        pytest.fail('create_test called over HTTP')
+
+    monkeypatch.setattr(HTTPBreakingPointAPI, 'update_test', not_found)
+    monkeypatch.setattr(HTTPBreakingPointAPI, 'create_test', create_test)
+
+    test_config = models.TestConfiguration(name='config', test_type='x', config_data={}, bp_test_id='gone')
+    db.session.add(test_config)
+    db.session.commit()
+
+    assert test_controller.TestController().update_test(test_config) is True
+    assert test_config.bp_test_id == 'gone'
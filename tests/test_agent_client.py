@@ -0,0 +1,70 @@
+"""
+Tests for the agent HTTP clients (integration.bp_agent) against the stub agent.
+"""
+
+import asyncio
+from urllib.parse import urlsplit
+
+import pytest
+
+from integration.bp_agent import AsyncBPMCPAgentClient, BPMCPAgentClient
+from integration.stub_agent import CHART_NAMES, PNG_PIXEL, start_stub_agent
+from integration.transport import AgentHTTPError, AgentTransport
+
+
+@pytest.fixture
+def stub_agent():
+    """Start stub agents with the given options; returns (client, async client) pairs."""
+    started = []
+
+    def start(retries=3, **options):
+        base_url, stop = start_stub_agent(**options)
+        transport = AgentTransport(base_url, retries=retries, backoff_base=0.01)
+        started.append((stop, transport))
+        url = urlsplit(base_url)
+        return (
+            BPMCPAgentClient(url.hostname, url.port, 'admin', 'admin', transport),
+            AsyncBPMCPAgentClient(url.hostname, url.port, 'admin', 'admin', transport)
+        )
+
+    yield start
+    for stop, transport in started:
+        transport.close()
+        stop()
+
+
+def _charts(client):
+    return sorted((filename, stream.read()) for filename, stream in client.iter_charts('1', '1'))
+
+
+def test_retries_503(stub_agent):
+    client, aio = stub_agent(fail_first=2)
+    assert client.get_test_status('1', '1') == 'unknown'
+    assert asyncio.run(aio.get_test_result_summary('1', '1'))['metrics']
+
+
+def test_gives_up_after_the_retries(stub_agent):
+    client, _ = stub_agent(retries=1, fail_first=2)
+    with pytest.raises(AgentHTTPError) as error:
+        client.get_test_status('1', '1')
+    assert error.value.status == 503
+
+
+def test_does_not_retry_starting_a_test(stub_agent):
+    client, _ = stub_agent(fail_first=1)
+    with pytest.raises(AgentHTTPError):
+        client.run_test({'test_id': 'config'})
+    assert client.run_test({'test_id': 'config'})['runId'] == '1'
+
+
+def test_iter_charts_from_urls(stub_agent):
+    client, _ = stub_agent(fail_first=1)
+    assert _charts(client) == sorted((name, PNG_PIXEL) for name in CHART_NAMES)
+
+
+def test_iter_charts_from_zip(stub_agent):
+    client, aio = stub_agent(zip_charts=True)
+    assert _charts(client) == sorted((name, PNG_PIXEL) for name in CHART_NAMES)
+
+    charts = asyncio.run(aio.generate_charts('1', '1'))
+    assert sorted(filename for _, filename in charts) == sorted(CHART_NAMES)
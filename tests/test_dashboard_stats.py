@@ -0,0 +1,78 @@
+"""
+Tests for the dashboard summary tables (api.dashboard_stats).
+"""
+
+# Models are used through the module so that pytest does not collect the Test* classes
+from api import models
+from api.dashboard_stats import dashboard_summary, rebuild_test_run_stats
+from api.models import db, Device, Environment
+
+
+def _add_run(status='completed'):
+    test_config = models.TestConfiguration.query.first() or models.TestConfiguration(
+        name='config', test_type='x', config_data={}
+    )
+    environment = Environment.query.first() or Environment(
+        name='env', ip_address='10.0.0.1', port=443, username='u', password='p'
+    )
+    device = Device.query.first() or Device(name='device', type='firewall')
+    db.session.add_all([test_config, environment, device])
+    db.session.flush()
+    test_run = models.TestRun(
+        test_config_id=test_config.id, environment_id=environment.id, device_id=device.id, status=status
+    )
+    db.session.add(test_run)
+    db.session.commit()
+    return test_run
+
+
+def test_counts_follow_status_changes(app):
+    test_run = _add_run(status='running')
+    test_run.status = 'completed'
+    db.session.commit()
+
+    rows = {(row.status, row.run_count) for row in models.TestRunStatusCount.query}
+    assert rows == {('completed', 1)}
+    assert dashboard_summary()['by_status'] == {'completed': 1}
+
+
+def test_empty_rows_are_deleted(app):
+    test_run = _add_run()
+    db.session.delete(test_run)
+    db.session.commit()
+
+    assert models.TestRunStatusCount.query.count() == 0
+    assert models.TestRunDailyCount.query.count() == 0
+
+
+def test_device_without_runs_can_be_deleted(app):
+    test_run = _add_run()
+    device = test_run.device
+    db.session.delete(test_run)
+    db.session.commit()
+
+    db.session.delete(device)
+    db.session.commit()
+    assert Device.query.count() == 0
+
+
+def test_summary_rows_go_with_their_device(app):
+    test_run = _add_run()
+    device_id = test_run.device_id
+    # A stale count (e.g. runs removed with raw SQL) must not block the device
+    db.session.execute(models.TestRun.__table__.delete())
+    db.session.commit()
+
+    db.session.delete(Device.query.get(device_id))
+    db.session.commit()
+    assert models.TestRunStatusCount.query.count() == 0
+
+
+def test_rebuild_writes_only_non_empty_rows(app):
+    _add_run()
+    _add_run(status='failed')
+    assert rebuild_test_run_stats() == 3
+    db.session.commit()
+
+    rows = {(row.status, row.run_count) for row in models.TestRunStatusCount.query}
+    assert rows == {('completed', 1), ('failed', 1)}
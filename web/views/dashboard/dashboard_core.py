@@ -7,6 +7,8 @@ from api.models.test_configuration import TestConfiguration
 from api.models.environment import Environment
 from api.models.device import Device
 from api.models.user import User
+from api.queries import test_runs_with
+from api.dashboard_stats import dashboard_summary
 from datetime import datetime
 
 from . import dashboard_blueprint
@@ -15,23 +17,27 @@ from . import dashboard_blueprint
 def index():
     """Dashboard home page."""
     # Get test runs
-    test_runs = TestRun.query.order_by(TestRun.created_at.desc()).limit(5).all()
+    test_runs = test_runs_with(['test_configuration']).order_by(TestRun.created_at.desc()).limit(5).all()
     
     # Get test configs
     test_configs = TestConfiguration.query.order_by(TestConfiguration.created_at.desc()).limit(5).all()
     
-    # Get environments
-    environments = Environment.query.all()
+    # Run counts by status, device and day come from the summary table
+    summary = dashboard_summary()
     
-    # Get devices
-    devices = Device.query.all()
+    counts = {
+        'test_runs': summary['total'],
+        'test_configs': TestConfiguration.query.count(),
+        'environments': Environment.query.count(),
+        'devices': Device.query.count()
+    }
     
     return render_template(
         'dashboard/index.html',
         test_runs=test_runs,
         test_configs=test_configs,
-        environments=environments,
-        devices=devices
+        counts=counts,
+        summary=summary
     )
 
 @dashboard_blueprint.route('/profile')
@@ -2,11 +2,11 @@
 Media views.
 """
 import os
-import tempfile
-from flask import render_template, redirect, url_for, request, flash, current_app, send_file, jsonify
+from flask import render_template, redirect, url_for, request, flash, current_app, jsonify
 from api.models import db
 from api.models.media import Media
 from api.models.test_run import TestRun
+from api.queries import media_with_test_run, test_runs_with
 from datetime import datetime
 
 from .utils import get_current_user, normalize_user_id
@@ -16,10 +16,10 @@ from . import dashboard_blueprint
 def media():
     """Media page."""
     # Get media
-    media_files = Media.query.order_by(Media.created_at.desc()).all()
+    media_files = media_with_test_run().order_by(Media.created_at.desc()).all()
     
-    # Get test runs for the upload form
-    test_runs = TestRun.query.order_by(TestRun.created_at.desc()).all()
+    # Get test runs for the upload form (the form shows their configuration)
+    test_runs = test_runs_with(['test_configuration']).order_by(TestRun.created_at.desc()).all()
     
     return render_template(
         'dashboard/media.html',
@@ -77,7 +77,7 @@ def upload_media():
         file_path = f"media/{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{file.filename}"
         
         # Save the file to storage
-        stored_path = storage.save_file(file, file_path)
+        stored_path = storage.save_file(file, file_path, content_type=content_type)
         
         # Create the media record
         media = Media(
@@ -107,28 +107,16 @@ def view_media(id):
     media = Media.query.get_or_404(id)
     
     try:
-        # Get the file from storage
+        # Stream the file straight from storage for viewing
         storage = current_app.storage
-        file_data, content_type = storage.get_file(media.file_path)
-        
-        # Create a temporary file for viewing
-        temp_file = tempfile.NamedTemporaryFile(delete=False)
-        temp_file.write(file_data.read())
-        temp_file.close()
-        
-        # Return the file for viewing
-        return send_file(
-            temp_file.name,
-            mimetype=content_type,
-            as_attachment=False
+        return storage.send(
+            media.file_path,
+            as_attachment=False,
+            mimetype=media.content_type
         )
     except Exception as e:
         flash(f'Error viewing media: {str(e)}', 'error')
         return redirect(url_for('dashboard.media'))
-    finally:
-        # Clean up the temporary file
-        if 'temp_file' in locals():
-            os.unlink(temp_file.name)
 
 @dashboard_blueprint.route('/media/<int:id>/download')
 def download_media(id):
@@ -136,29 +124,17 @@ def download_media(id):
     media = Media.query.get_or_404(id)
     
     try:
-        # Get the file from storage
+        # Stream the file straight from storage for download
         storage = current_app.storage
-        file_data, content_type = storage.get_file(media.file_path)
-        
-        # Create a temporary file for download
-        temp_file = tempfile.NamedTemporaryFile(delete=False)
-        temp_file.write(file_data.read())
-        temp_file.close()
-        
-        # Return the file for download
-        return send_file(
-            temp_file.name,
-            mimetype=content_type,
+        return storage.send(
+            media.file_path,
+            download_name=os.path.basename(media.file_path),
             as_attachment=True,
-            download_name=os.path.basename(media.file_path)
+            mimetype=media.content_type
         )
     except Exception as e:
         flash(f'Error downloading media: {str(e)}', 'error')
         return redirect(url_for('dashboard.media'))
-    finally:
-        # Clean up the temporary file
-        if 'temp_file' in locals():
-            os.unlink(temp_file.name)
 
 @dashboard_blueprint.route('/media/<int:id>/delete', methods=['POST'])
 def delete_media(id):
@@ -8,7 +8,9 @@ from api.models.test_configuration import TestConfiguration
 from api.models.environment import Environment
 from api.models.device import Device
 from api.models.report import Report
-from api.models.media import Media
+from api.queries import reports_with_test_run, test_run_detail_query, test_runs_with_details
+from api.controllers.run_scheduler import schedule_test_run
+from api.run_events import StreamLimitError, run_snapshot, stream_run_events
 from datetime import datetime
 
 from .utils import get_current_user, normalize_user_id
@@ -18,7 +20,7 @@ from . import dashboard_blueprint
 def test_runs():
     """Test runs page."""
     # Get test runs
-    test_runs = TestRun.query.order_by(TestRun.created_at.desc()).all()
+    test_runs = test_runs_with_details().order_by(TestRun.created_at.desc()).all()
     
     return render_template(
         'dashboard/test_runs.html',
@@ -29,13 +31,11 @@ def test_runs():
 def test_run_detail(id):
     """Test run detail page."""
     # Get test run
-    test_run = TestRun.query.get_or_404(id)
+    test_run = test_run_detail_query().get_or_404(id)
     
-    # Get reports
-    reports = Report.query.filter_by(test_run_id=id).all()
-    
-    # Get media
-    media_files = Media.query.filter_by(test_run_id=id).all()
+    # Get reports and media (loaded with the test run)
+    reports = test_run.reports
+    media_files = test_run.media
     
     return render_template(
         'dashboard/test_run_detail.html',
@@ -44,6 +44,24 @@ def test_run_detail(id):
         media_files=media_files
     )
 
+@dashboard_blueprint.route('/test-runs/<int:id>/events')
+def test_run_events(id):
+    """Live status of a test run (Server-Sent Events)."""
+    TestRun.query.get_or_404(id)
+    try:
+        return stream_run_events([id])
+    except StreamLimitError as e:
+        # The page falls back to polling test_run_status
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '30'}
+
+@dashboard_blueprint.route('/test-runs/<int:id>/status')
+def test_run_status(id):
+    """Stored status of a test run, polled when no stream is available."""
+    snapshot = run_snapshot([id])
+    if not snapshot:
+        return jsonify({'error': 'Not found'}), 404
+    return jsonify(snapshot[0])
+
 @dashboard_blueprint.route('/test-runs/create', methods=['POST'])
 def run_test():
     """Create a new test run from a test configuration."""
@@ -61,26 +79,35 @@ def run_test():
                 return jsonify({'error': 'Missing required fields'}), 400
             return redirect(url_for('dashboard.test_configs'))
         
+        # Optional queue priority and earliest start (UTC)
+        try:
+            priority = int(request.form.get('priority') or 0)
+            scheduled_at = request.form.get('scheduled_at')
+            scheduled_at = datetime.fromisoformat(scheduled_at) if scheduled_at else None
+        except ValueError:
+            flash('Invalid priority or start time', 'error')
+            if request.is_json:
+                return jsonify({'error': 'Invalid priority or start time'}), 400
+            return redirect(url_for('dashboard.test_configs'))
+        
         # Get test configuration, environment, and device
         test_config = TestConfiguration.query.get_or_404(test_config_id)
         environment = Environment.query.get_or_404(environment_id)
         device = Device.query.get_or_404(device_id)
         
-        # Create test run
-        test_run = TestRun(
-            test_config_id=test_config.id,
-            environment_id=environment.id,
-            device_id=device.id,
-            status='scheduled',
-            created_by=normalize_user_id(current_user)
+        # Queue the test run; the scheduler starts it when the environment
+        # and device have capacity (see api.controllers.run_scheduler)
+        test_run = schedule_test_run(
+            test_config,
+            environment,
+            device,
+            created_by=normalize_user_id(current_user),
+            priority=priority,
+            scheduled_at=scheduled_at
         )
-        
-        db.session.add(test_run)
         db.session.commit()
         
-        # TODO: Implement actual test execution logic
-        
-        flash('Test run created successfully', 'success')
+        flash('Test run queued successfully', 'success')
         
         if request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return jsonify({
@@ -141,7 +168,7 @@ def stop_test_run(id):
 def reports():
     """Reports page."""
     # Get reports
-    reports = Report.query.order_by(Report.created_at.desc()).all()
+    reports = reports_with_test_run().order_by(Report.created_at.desc()).all()
     
     return render_template(
         'dashboard/reports.html',